@@ -118,11 +118,9 @@ class FIL_interface:
             color (str): La couleur de surbrillance.
         """
         if self.running:
-            for item in self.ui_front.scrollable_frame.winfo_children():
-                values = self.ui_front.treeview.item(item, "values")
-                if values[1] == casque_numero:
-                    self.ui_front.treeview.tag_configure(casque_numero, background=color)
-                    self.ui_front.treeview.item(item, tags=(casque_numero,))
+            row = self.ui_front.widget_cache.get(casque_numero)
+            if row is not None:
+                row.set_background(color)
 
     def update_status(self, casque_numero, status):
         """
@@ -133,10 +131,9 @@ class FIL_interface:
             status (str): Le nouveau statut à afficher.
         """
         if self.running:
-            for item in self.ui_front.scrollable_frame.winfo_children():
-                values = self.ui_front.treeview.item(item, "values")
-                if values[1] == casque_numero:
-                    self.ui_front.treeview.set(item, column="Solutions", value=status)
+            row = self.ui_front.widget_cache.get(casque_numero)
+            if row is not None:
+                row.set("solutions_installees", text=status)
 
 if __name__ == "__main__":
     root = tk.Tk()
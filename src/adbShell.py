@@ -0,0 +1,186 @@
+import queue
+import subprocess
+import threading
+import time
+import uuid
+
+class AdbShell:
+    """
+    Session `adb shell` persistante vers un casque.
+
+    Un seul processus `adb shell` reste ouvert par casque : chaque commande y est écrite,
+    suivie d'une sentinelle qui marque la fin de sa sortie et transporte son code de retour.
+    La session est relancée automatiquement si elle a été coupée.
+    """
+
+    def __init__(self, adb_exe_path, serial):
+        """
+        Initialise la session, le processus n'étant lancé qu'à la première commande.
+
+        Args:
+            adb_exe_path (str): Le chemin vers l'exécutable ADB.
+            serial (str): Le numéro de série du casque.
+        """
+        self.adb_exe_path = adb_exe_path
+        self.serial = serial
+        self.process = None
+        self.output = None
+        self.buffer = b""
+        self.lock = threading.Lock()
+
+    def is_alive(self):
+        """
+        Indique si le processus `adb shell` est toujours en cours d'exécution.
+
+        Returns:
+            bool: True si la session est ouverte.
+        """
+        return self.process is not None and self.process.poll() is None
+
+    def _start(self):
+        """
+        Lance le processus `adb shell` et le thread qui lit sa sortie.
+        """
+        self.process = subprocess.Popen([self.adb_exe_path, "-s", self.serial, "shell"],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        creationflags=subprocess.CREATE_NO_WINDOW)
+        self.output = queue.Queue()
+        self.buffer = b""
+        threading.Thread(target=self._read_output, args=(self.process, self.output), daemon=True).start()
+
+    @staticmethod
+    def _read_output(process, output):
+        """
+        Transfère la sortie du processus dans une file, None signalant la fin de la session.
+
+        Args:
+            process (subprocess.Popen): Le processus `adb shell`.
+            output (queue.Queue): La file recevant les blocs lus.
+        """
+        try:
+            while True:
+                chunk = process.stdout.read1(65536)
+                if not chunk:
+                    break
+                output.put(chunk)
+        except (OSError, ValueError):
+            pass
+        output.put(None)
+
+    def close(self):
+        """
+        Ferme la session.
+        """
+        if self.process is not None:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+        self.process = None
+
+    def run(self, command, check=True, timeout=60):
+        """
+        Exécute une commande dans la session et retourne sa sortie.
+
+        Args:
+            command (str): La commande shell à exécuter sur le casque.
+            check (bool): Lève une exception si la commande retourne un code non nul.
+            timeout (float): Le délai maximal d'exécution en secondes.
+
+        Returns:
+            str: La sortie standard de la commande.
+
+        Raises:
+            subprocess.CalledProcessError: Si check est vrai et que la commande échoue, ou si la session ne peut être rétablie.
+            subprocess.TimeoutExpired: Si la commande dépasse le délai.
+        """
+        with self.lock:
+            for attempt in range(2):
+                if not self.is_alive():
+                    self._start()
+                sentinel = f"__FIL_FIN_{uuid.uuid4().hex}__"
+                try:
+                    # La sentinelle est précédée d'un saut de ligne pour les sorties qui n'en ont pas
+                    self.process.stdin.write(f"{command}\nprintf '\\n{sentinel} %d\\n' $?\n".encode('utf-8'))
+                    self.process.stdin.flush()
+                except OSError:
+                    self.close()
+                    continue
+
+                result = self._read_until(sentinel, timeout, command)
+                if result is not None:
+                    output, returncode = result
+                    break
+                # La session a été coupée (casque débranché, serveur ADB redémarré) : on la relance
+                self.close()
+            else:
+                raise subprocess.CalledProcessError(255, command, output=b"")
+
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command, output=output.encode('utf-8'))
+        return output
+
+    def _read_until(self, sentinel, timeout, command):
+        """
+        Lit la sortie de la session jusqu'à la sentinelle de la commande en cours.
+
+        Args:
+            sentinel (str): La sentinelle de fin de commande.
+            timeout (float): Le délai maximal d'attente en secondes, pour l'ensemble de la sortie.
+            command (str): La commande en cours, pour les messages d'erreur.
+
+        Returns:
+            tuple: (sortie, code de retour), ou None si la session s'est terminée.
+        """
+        marker = b"\n" + sentinel.encode('utf-8') + b" "
+        deadline = time.monotonic() + timeout
+        while True:
+            position = self.buffer.find(marker)
+            if position >= 0:
+                end = self.buffer.find(b"\n", position + len(marker))
+                if end >= 0:
+                    output = self.buffer[:position].replace(b"\r\n", b"\n").decode('utf-8', errors='replace')
+                    returncode = int(self.buffer[position + len(marker):end].strip() or 255)
+                    self.buffer = self.buffer[end + 1:]
+                    return output, returncode
+            try:
+                chunk = self.output.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.close()
+                raise subprocess.TimeoutExpired(command, timeout)
+            if chunk is None:
+                return None
+            self.buffer += chunk
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_shell(adb_exe_path, serial):
+    """
+    Retourne la session persistante d'un casque, en la créant si nécessaire.
+
+    Args:
+        adb_exe_path (str): Le chemin vers l'exécutable ADB.
+        serial (str): Le numéro de série du casque.
+
+    Returns:
+        AdbShell: La session du casque.
+    """
+    with _sessions_lock:
+        session = _sessions.get(serial)
+        if session is None:
+            session = _sessions[serial] = AdbShell(adb_exe_path, serial)
+        return session
+
+def close_shell(serial):
+    """
+    Ferme la session persistante d'un casque débranché.
+
+    Args:
+        serial (str): Le numéro de série du casque.
+    """
+    with _sessions_lock:
+        session = _sessions.pop(serial, None)
+    if session is not None:
+        session.close()
@@ -1,6 +1,10 @@
 import os
+import re
+import shlex
 import subprocess
 
+import adbShell
+
 def check_file_exists(filepath):
     """
     Vérifie si un fichier existe à un chemin spécifié.
@@ -32,6 +36,31 @@ def check_adb_connection(platform_tools_path):
         return False
     return True
 
+def run_shell(adb_exe_path, numero, command, check=True, timeout=60):
+    """
+    Exécute une commande shell sur l'appareil via sa session `adb shell` persistante.
+
+    Un dépassement du délai est signalé comme un échec de la commande, pour que les appelants n'aient
+    qu'une seule exception à traiter.
+
+    Args:
+        adb_exe_path (str): Le chemin vers l'exécutable ADB.
+        numero (str): Le numéro de série de l'appareil.
+        command (str): La commande shell à exécuter.
+        check (bool): Lève une exception si la commande retourne un code non nul.
+        timeout (float): Le délai maximal d'exécution en secondes.
+
+    Returns:
+        str: La sortie standard de la commande.
+
+    Raises:
+        subprocess.CalledProcessError: Si check est vrai et que la commande échoue, ou si elle dépasse le délai.
+    """
+    try:
+        return adbShell.get_shell(adb_exe_path, numero).run(command, check=check, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        raise subprocess.CalledProcessError(124, command, output=b"") from e
+
 def is_permission_granted(adb_exe_path, numero, package_name, permission):
     """
     Vérifie si une permission spécifique est accordée à une application.
@@ -46,10 +75,7 @@ def is_permission_granted(adb_exe_path, numero, package_name, permission):
         bool: True si la permission est accordée, False sinon.
     """
     try:
-        check_command = [
-            adb_exe_path, "-s", numero, "shell", "dumpsys", "package", package_name
-        ]
-        output = subprocess.check_output(check_command, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode("utf-8")
+        output = run_shell(adb_exe_path, numero, f"dumpsys package {shlex.quote(package_name)}")
         return f"grantedPermissions: {permission}" in output
     except subprocess.CalledProcessError as e:
         print(f"Erreur lors de la vérification de la permission {permission} : {e}")
@@ -71,9 +97,8 @@ def grant_permissions(adb_exe_path, numero, package_name):
     ]
     for permission in permissions:
         if not is_permission_granted(adb_exe_path, numero, package_name, permission):
-            full_command = [adb_exe_path, "-s", numero, "shell", "pm", "grant", package_name, permission]
             try:
-                subprocess.run(full_command, check=True, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW)
+                run_shell(adb_exe_path, numero, f"pm grant {shlex.quote(package_name)} {permission}")
             except subprocess.CalledProcessError as e:
                 pass
 
@@ -89,8 +114,7 @@ def is_device_awake(adb_exe_path, numero):
         bool: True si l'appareil est éveillé, False sinon.
     """
     try:
-        command = [adb_exe_path, "-s", numero, "shell", "dumpsys power | grep 'Display Power'"]
-        output = subprocess.check_output(command, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode('utf-8')
+        output = run_shell(adb_exe_path, numero, "dumpsys power | grep 'Display Power'")
         if 'state=ON' in output:
             return True
     except subprocess.CalledProcessError as e:
@@ -106,11 +130,20 @@ def wake_up_device(adb_exe_path, numero):
         numero (str): Le numéro de série de l'appareil.
     """
     if not is_device_awake(adb_exe_path, numero):
-        command = [adb_exe_path, "-s", numero, "shell", "input", "keyevent", "KEYCODE_POWER"]
-        try:
-            subprocess.run(command, check=True, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW)
-        except subprocess.CalledProcessError as e:
-            print(f"Erreur lors de l'exécution de la commande POWER : {e}")
+        press_power_key(adb_exe_path, numero)
+
+def press_power_key(adb_exe_path, numero):
+    """
+    Envoie l'appui sur la touche POWER à l'appareil, sans vérifier son état.
+
+    Args:
+        adb_exe_path (str): Le chemin vers l'exécutable ADB.
+        numero (str): Le numéro de série de l'appareil.
+    """
+    try:
+        run_shell(adb_exe_path, numero, "input keyevent KEYCODE_POWER")
+    except subprocess.CalledProcessError as e:
+        print(f"Erreur lors de l'exécution de la commande POWER : {e}")
 
 def start_application(adb_exe_path, numero, package_name):
     """
@@ -123,20 +156,13 @@ def start_application(adb_exe_path, numero, package_name):
     """
     try:
         # Obtenir le nom complet de l'activité principale
-        activity_output = subprocess.check_output(
-            [adb_exe_path, "-s", numero, "shell", "cmd", "package", "resolve-activity", "--brief", package_name],
-            stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW
-        ).decode("utf-8").strip()
+        activity_output = run_shell(adb_exe_path, numero, f"cmd package resolve-activity --brief {shlex.quote(package_name)}").strip()
 
         # Extraire le nom de l'activité (dernière ligne normalement)
         activity_name = activity_output.split('\n')[-1].strip()
 
         # Démarrer l'application avec le nom complet de l'activité
-        start_command = [
-            adb_exe_path, "-s", numero, "shell", "am", "start",
-            "-n", activity_name
-        ]
-        subprocess.run(start_command, check=True, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW)
+        run_shell(adb_exe_path, numero, f"am start -n {shlex.quote(activity_name)}")
     except subprocess.CalledProcessError as e:
         print(f"Erreur lors de l'obtention ou du démarrage de l'activité principale : {e}")
 
@@ -150,8 +176,7 @@ def stop_application(adb_exe_path, numero, package_name):
         package_name (str): Le nom du package de l'application.
     """
     try:
-        stop_command = [adb_exe_path, "-s", numero, "shell", "am", "force-stop", package_name]
-        subprocess.run(stop_command, check=True, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW)
+        run_shell(adb_exe_path, numero, f"am force-stop {shlex.quote(package_name)}")
     except subprocess.CalledProcessError as e:
         print(f"Erreur lors de l'arrêt de l'application {package_name} : {e}")
 
@@ -168,8 +193,7 @@ def is_application_running(adb_exe_path, numero, package_name):
         bool: True si l'application est en cours d'exécution, False sinon.
     """
     try:
-        check_command = [adb_exe_path, "-s", numero, "shell", "pidof", package_name]
-        output = subprocess.check_output(check_command, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode("utf-8").strip()
+        output = run_shell(adb_exe_path, numero, f"pidof {shlex.quote(package_name)}").strip()
         if output:
             return True
     except subprocess.CalledProcessError:
@@ -217,8 +241,7 @@ def check_battery_level(adb_exe_path, device_serial):
         int: Le niveau de batterie en pourcentage, ou -1 en cas d'erreur.
     """
     try:
-        battery_info_command = [adb_exe_path, "-s", device_serial, "shell", "dumpsys", "battery"]
-        output = subprocess.check_output(battery_info_command, stderr=subprocess.STDOUT, creationflags=subprocess.CREATE_NO_WINDOW).decode("utf-8")
+        output = run_shell(adb_exe_path, device_serial, "dumpsys battery 2>&1")
 
         for line in output.split('\n'):
             if 'level' in line:
@@ -230,3 +253,136 @@ def check_battery_level(adb_exe_path, device_serial):
         print(f"Erreur inattendue lors de la vérification du niveau de batterie : {e}")
 
     return -1
+
+# Commandes exécutées par probe_device, une section par information du casque.
+PROBE_SECTIONS = {
+    "manufacturer": "getprop ro.product.manufacturer",
+    "model": "getprop ro.product.model",
+    "battery": "dumpsys battery | grep level",
+    "version_apk": "dumpsys package {package_name} | grep versionName",
+    "ppv1": "pm list packages {package_old_name}",
+    "screen": "dumpsys power | grep 'Display Power'",
+    "json": "stat -c '%s %Y' {json_file_path} 2>/dev/null",
+    "wifi": "dumpsys wifi | grep mWifiInfo",
+}
+
+PROBE_MARKER = "@@FIL_PROBE:"
+
+def build_probe_script(package_name, package_old_name, json_file_path, sections=None):
+    """
+    Construit le script shell composite qui interroge toutes les sections demandées en un seul appel.
+
+    Args:
+        package_name (str): Le nom du package de l'application.
+        package_old_name (str): Le nom du package de l'ancienne application (PPV1).
+        json_file_path (str): Le chemin du fichier hardware.json sur le casque.
+        sections (list, optional): Les sections à interroger, toutes par défaut.
+
+    Returns:
+        str: Le script à passer à `adb shell`.
+    """
+    if sections is None:
+        sections = PROBE_SECTIONS.keys()
+    commands = []
+    for section in sections:
+        command = PROBE_SECTIONS[section].format(
+            package_name=package_name,
+            package_old_name=package_old_name,
+            json_file_path=json_file_path,
+        )
+        commands.append(f"echo '{PROBE_MARKER}{section}'; {command}")
+    return "; ".join(commands)
+
+def parse_probe_output(output, package_old_name):
+    """
+    Analyse la sortie du script de probe_device et la transforme en enregistrement structuré.
+
+    Seules les sections présentes dans la sortie apparaissent dans le résultat.
+
+    Args:
+        output (str): La sortie brute du script.
+        package_old_name (str): Le nom du package de l'ancienne application (PPV1).
+
+    Returns:
+        dict: Les informations du casque, par exemple manufacturer, model, battery_level,
+        version_apk, old_apk_installed, screen_on, json_size, json_mtime, wifi_connected et wifi_ssid.
+    """
+    raw_sections = {}
+    current = None
+    for line in output.replace("\r", "").split("\n"):
+        if line.startswith(PROBE_MARKER):
+            current = line[len(PROBE_MARKER):].strip()
+            raw_sections[current] = []
+        elif current is not None and line.strip():
+            raw_sections[current].append(line.strip())
+
+    snapshot = {}
+    if "manufacturer" in raw_sections:
+        snapshot["manufacturer"] = raw_sections["manufacturer"][0] if raw_sections["manufacturer"] else "Inconnu"
+    if "model" in raw_sections:
+        snapshot["model"] = raw_sections["model"][0] if raw_sections["model"] else "Inconnu"
+    if "battery" in raw_sections:
+        snapshot["battery_level"] = -1
+        for line in raw_sections["battery"]:
+            if 'level' in line:
+                try:
+                    snapshot["battery_level"] = int(line.split(':')[1].strip())
+                except (IndexError, ValueError):
+                    pass
+                break
+    if "version_apk" in raw_sections:
+        snapshot["version_apk"] = "X"
+        for line in raw_sections["version_apk"]:
+            version_match = re.search(r'versionName=(\S+)', line)
+            if version_match:
+                snapshot["version_apk"] = version_match.group(1)
+                break
+    if "ppv1" in raw_sections:
+        snapshot["old_apk_installed"] = any(package_old_name in line for line in raw_sections["ppv1"])
+    if "screen" in raw_sections:
+        snapshot["screen_on"] = any('state=ON' in line for line in raw_sections["screen"])
+    if "json" in raw_sections:
+        snapshot["json_size"] = -1
+        snapshot["json_mtime"] = -1
+        if raw_sections["json"]:
+            parts = raw_sections["json"][0].split()
+            try:
+                snapshot["json_size"] = int(parts[0])
+                snapshot["json_mtime"] = int(parts[1])
+            except (IndexError, ValueError):
+                pass
+    if "wifi" in raw_sections:
+        snapshot["wifi_connected"] = False
+        snapshot["wifi_ssid"] = "not connected"
+        wifi_info = next((line for line in raw_sections["wifi"] if "SSID: " in line), None)
+        if wifi_info:
+            ssid_info = wifi_info.split("SSID: ")[1].split(",")[0].strip()
+            if ssid_info != "<unknown ssid>":
+                snapshot["wifi_connected"] = True
+                snapshot["wifi_ssid"] = ssid_info
+    return snapshot
+
+def probe_device(device, package_name, package_old_name, json_file_path, sections=None, timeout=None):
+    """
+    Récupère l'état complet d'un casque en un seul aller-retour ADB.
+
+    Toutes les commandes sont regroupées dans un script shell exécuté sur une seule
+    connexion ppadb, au lieu d'un processus `adb` par information.
+
+    Args:
+        device (ppadb.device.Device): L'appareil à interroger.
+        package_name (str): Le nom du package de l'application.
+        package_old_name (str): Le nom du package de l'ancienne application (PPV1).
+        json_file_path (str): Le chemin du fichier hardware.json sur le casque.
+        sections (list, optional): Les sections à interroger, toutes par défaut.
+        timeout (float, optional): Le délai maximal de la connexion en secondes.
+
+    Returns:
+        dict: L'enregistrement retourné par parse_probe_output.
+
+    Raises:
+        RuntimeError: Si l'appareil est non autorisé ou hors ligne.
+    """
+    script = build_probe_script(package_name, package_old_name, json_file_path, sections)
+    output = device.shell(script, timeout=timeout)
+    return parse_probe_output(output, package_old_name)
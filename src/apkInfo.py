@@ -0,0 +1,112 @@
+import hashlib
+import os
+import struct
+import threading
+import zipfile
+
+# Identifiant de ressource de l'attribut android:versionCode
+VERSION_CODE_RESOURCE_ID = 0x0101021b
+
+# Types de blocs du format XML binaire d'Android
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+RES_XML_START_ELEMENT_TYPE = 0x0102
+
+# Types de valeurs entières
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def _cached(kind, path, compute):
+    """
+    Retourne une information sur un fichier APK, calculée une seule fois tant que sa taille et sa date ne changent pas.
+
+    Args:
+        kind (str): Le nom de l'information.
+        path (str): Le chemin du fichier APK.
+        compute (callable): Calcule l'information à partir du chemin.
+
+    Returns:
+        L'information calculée.
+    """
+    stat = os.stat(path)
+    key = (kind, path, stat.st_size, int(stat.st_mtime))
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+    value = compute(path)
+    with _cache_lock:
+        _cache[key] = value
+    return value
+
+def sha256(path):
+    """
+    Calcule l'empreinte sha256 d'un fichier APK.
+
+    Args:
+        path (str): Le chemin du fichier APK.
+
+    Returns:
+        str: L'empreinte en hexadécimal.
+    """
+    def compute(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    return _cached("sha256", path, compute)
+
+def version_code(path):
+    """
+    Lit le versionCode déclaré dans le manifeste (XML binaire) d'un fichier APK.
+
+    Args:
+        path (str): Le chemin du fichier APK.
+
+    Returns:
+        int: Le versionCode, ou None s'il est introuvable.
+    """
+    def compute(path):
+        try:
+            with zipfile.ZipFile(path) as apk:
+                manifest = apk.read("AndroidManifest.xml")
+            return parse_version_code(manifest)
+        except (OSError, KeyError, zipfile.BadZipFile, struct.error) as e:
+            print(f"Impossible de lire le versionCode de {path} : {e}")
+            return None
+    return _cached("version_code", path, compute)
+
+def parse_version_code(manifest):
+    """
+    Extrait le versionCode de la balise <manifest> d'un manifeste Android au format XML binaire.
+
+    Args:
+        manifest (bytes): Le contenu de AndroidManifest.xml.
+
+    Returns:
+        int: Le versionCode, ou None s'il est absent ou n'est pas un entier.
+    """
+    resource_ids = []
+    # En-tête du document : type, taille de l'en-tête, taille totale
+    _, header_size, _ = struct.unpack_from("<HHI", manifest, 0)
+    offset = header_size
+    while offset + 8 <= len(manifest):
+        chunk_type, chunk_header_size, chunk_size = struct.unpack_from("<HHI", manifest, offset)
+        if chunk_size < 8:
+            return None
+        if chunk_type == RES_XML_RESOURCE_MAP_TYPE:
+            count = (chunk_size - chunk_header_size) // 4
+            resource_ids = list(struct.unpack_from(f"<{count}I", manifest, offset + chunk_header_size))
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            # La première balise est <manifest>
+            attribute_start, attribute_size, attribute_count = struct.unpack_from("<HHH", manifest, offset + chunk_header_size + 8)
+            for index in range(attribute_count):
+                attribute = offset + chunk_header_size + attribute_start + index * attribute_size
+                _, name, _, _, _, data_type, data = struct.unpack_from("<IIIHBBI", manifest, attribute)
+                if name < len(resource_ids) and resource_ids[name] == VERSION_CODE_RESOURCE_ID:
+                    return data if data_type in (TYPE_INT_DEC, TYPE_INT_HEX) else None
+            return None
+        offset += chunk_size
+    return None
@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+import threading
+
+class BiblioIndex:
+    """
+    Index persistant (SQLite) des fichiers de la bibliothèque de solutions.
+
+    Pour chaque solution, l'index retient la date de modification de son dossier et de ses
+    sous-dossiers de médias, ainsi que la taille et la date de chaque fichier. Tant que ces dates
+    n'ont pas changé, la solution est relue depuis l'index sans parcourir ses fichiers.
+
+    Note:
+        La date d'un dossier ne change qu'à l'ajout, la suppression ou le renommage d'un fichier :
+        un fichier réécrit sur place sous le même nom n'est pas détecté.
+    """
+
+    SUBDIRS = ["image", "image360", "sound", "srt", "video"]
+
+    def __init__(self, path):
+        """
+        Ouvre (ou crée) l'index.
+
+        Args:
+            path (str): Le chemin du fichier SQLite.
+        """
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions (nom TEXT PRIMARY KEY, dir_mtimes TEXT NOT NULL)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (solution TEXT NOT NULL, subdir TEXT NOT NULL, name TEXT NOT NULL, "
+                "size INTEGER NOT NULL, mtime INTEGER NOT NULL, PRIMARY KEY (solution, subdir, name))")
+
+    def dir_mtimes(self, solution_dir):
+        """
+        Relève la date de modification du dossier d'une solution et de ses sous-dossiers de médias.
+
+        Args:
+            solution_dir (str): Le chemin du dossier de la solution.
+
+        Returns:
+            str: Les dates relevées, sérialisées pour être comparées à celles de l'index.
+        """
+        mtimes = {}
+        for subdir in [""] + self.SUBDIRS:
+            try:
+                mtimes[subdir] = os.stat(os.path.join(solution_dir, subdir)).st_mtime_ns
+            except OSError:
+                pass
+        return json.dumps(mtimes, sort_keys=True)
+
+    def is_up_to_date(self, nom, solution_dir):
+        """
+        Indique si l'index d'une solution est à jour, d'après les seules dates de ses dossiers.
+
+        Args:
+            nom (str): Le nom de la solution.
+            solution_dir (str): Le chemin du dossier de la solution.
+
+        Returns:
+            bool: True si aucun dossier de la solution n'a changé depuis sa dernière indexation.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT dir_mtimes FROM solutions WHERE nom = ?", (nom,)).fetchone()
+        return row is not None and row[0] == self.dir_mtimes(solution_dir)
+
+    def get_solution_files(self, nom, solution_dir, force=False):
+        """
+        Retourne les fichiers d'une solution, en ne parcourant son dossier que s'il a changé.
+
+        Args:
+            nom (str): Le nom de la solution.
+            solution_dir (str): Le chemin du dossier de la solution.
+            force (bool): Parcourt le dossier même si ses dates n'ont pas changé (fichier réécrit sur place).
+
+        Returns:
+            dict: Pour chaque sous-dossier de médias, la liste des tuples (nom du fichier, taille).
+        """
+        dir_mtimes = self.dir_mtimes(solution_dir)
+        with self.lock:
+            row = self.connection.execute("SELECT dir_mtimes FROM solutions WHERE nom = ?", (nom,)).fetchone()
+            if not force and row is not None and row[0] == dir_mtimes:
+                files = {subdir: [] for subdir in self.SUBDIRS}
+                for subdir, name, size in self.connection.execute(
+                        "SELECT subdir, name, size FROM files WHERE solution = ? ORDER BY rowid", (nom,)):
+                    files.setdefault(subdir, []).append((name, size))
+                return files
+
+        files, rows = self.scan_solution(nom, solution_dir)
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM files WHERE solution = ?", (nom,))
+            self.connection.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?)", rows)
+            self.connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?)", (nom, dir_mtimes))
+        return files
+
+    def scan_solution(self, nom, solution_dir):
+        """
+        Parcourt les sous-dossiers de médias d'une solution.
+
+        Args:
+            nom (str): Le nom de la solution.
+            solution_dir (str): Le chemin du dossier de la solution.
+
+        Returns:
+            tuple: Les fichiers par sous-dossier (nom du fichier, taille) et les lignes à enregistrer dans l'index.
+        """
+        files = {subdir: [] for subdir in self.SUBDIRS}
+        rows = []
+        for subdir in self.SUBDIRS:
+            target_dir = os.path.join(solution_dir, subdir)
+            if not os.path.isdir(target_dir):
+                continue
+            with os.scandir(target_dir) as entries:
+                for entry in entries:
+                    stat = entry.stat()
+                    files[subdir].append((entry.name, stat.st_size))
+                    rows.append((nom, subdir, entry.name, stat.st_size, int(stat.st_mtime)))
+        return files, rows
+
+    def forget_missing(self, noms):
+        """
+        Retire de l'index les solutions qui ne sont plus dans la bibliothèque.
+
+        Args:
+            noms (set): Les noms des solutions encore présentes.
+        """
+        with self.lock, self.connection:
+            indexed = {row[0] for row in self.connection.execute("SELECT nom FROM solutions")}
+            for nom in indexed - set(noms):
+                self.connection.execute("DELETE FROM files WHERE solution = ?", (nom,))
+                self.connection.execute("DELETE FROM solutions WHERE nom = ?", (nom,))
@@ -1,9 +1,17 @@
+import json
+import threading
 import traceback
 from config import Config
 from singletonMeta import SingletonMeta
 from solutionBiblio import SolutionBiblio
+from biblioIndex import BiblioIndex
+from blobStore import BlobStore
+import biblioWatcher
 import os
 
+# Fichier de description d'un dossier de solution : nom et version d'origine
+META_FILE = "solution.json"
+
 class BiblioManager(metaclass=SingletonMeta):
 
     def __init__(self):
@@ -13,6 +21,12 @@ class BiblioManager(metaclass=SingletonMeta):
         """
         self.config = Config()
         self.liste_solutions = []
+        self.index = BiblioIndex(self.config.biblio_index_path)
+        self.blobs = BlobStore(self.config.Bibliothèque_de_solution_path)
+        self.lock = threading.Lock()
+        self.solutions_par_dossier = {}
+        self.solutions_par_nom = {}
+        self.solutions_par_version = {}
         self.get_sols_bibli()
 
     def print(self):
@@ -24,6 +38,62 @@ class BiblioManager(metaclass=SingletonMeta):
             sol.print()
             print("-" * 20)
 
+    def set_solutions(self, solutions):
+        """
+        Remplace la liste des solutions de la bibliothèque et reconstruit ses index de recherche.
+
+        Args:
+            solutions (list): Les objets SolutionBiblio de la bibliothèque.
+        """
+        with self.lock:
+            self._set_solutions(solutions)
+
+    def _set_solutions(self, solutions):
+        """
+        Remplace la liste des solutions et ses index, le verrou étant tenu.
+
+        Args:
+            solutions (list): Les objets SolutionBiblio de la bibliothèque.
+        """
+        self.liste_solutions = solutions
+        self.solutions_par_dossier = {sol.dossier: sol for sol in solutions}
+        self.solutions_par_nom = {}
+        for sol in solutions:
+            self.solutions_par_nom.setdefault(sol.nom, []).append(sol)
+        self.solutions_par_version = {(sol.nom, sol.version): sol for sol in solutions if sol.version}
+
+    @staticmethod
+    def is_solution_folder(name, path):
+        """
+        Indique si un élément de la bibliothèque est un dossier de solution.
+
+        Args:
+            name (str): Le nom de l'élément.
+            path (str): Son chemin.
+
+        Returns:
+            bool: True pour un dossier, hors dossiers cachés (comme le magasin de médias .blobs).
+        """
+        return not name.startswith(".") and os.path.isdir(path)
+
+    def deduplicate(self):
+        """
+        Range les médias de toutes les solutions dans le magasin partagé, puis supprime les médias inutilisés.
+
+        Seuls les fichiers pas encore liés au magasin sont relus ; les passages suivants sont donc rapides.
+        """
+        try:
+            solution_base_path = self.config.Bibliothèque_de_solution_path
+            linked = 0
+            for sol in list(self.liste_solutions):
+                linked += self.blobs.add_folder(os.path.join(solution_base_path, sol.dossier), BiblioIndex.SUBDIRS)
+            removed = self.blobs.prune()
+            if removed:
+                print(f"Magasin de médias : {removed} média(s) inutilisé(s) supprimé(s).")
+        except Exception as e:
+            print(f"Erreur lors de la déduplication de la bibliothèque : {e}")
+            traceback.print_exc()
+
     def get_sols_bibli(self):
         """
         Récupère toutes les solutions disponibles dans la bibliothèque des solutions et
@@ -32,56 +102,56 @@ class BiblioManager(metaclass=SingletonMeta):
         Returns:
             list: La liste des solutions disponibles dans la bibliothèque.
         """
-        self.liste_solutions.clear()  # Vide la liste avant de la rafraîchir
+        solutions = []
         solution_base_dir = self.config.Bibliothèque_de_solution_path
 
         # Parcours de chaque dossier de solution dans la bibliothèque
-        for solution_name in os.listdir(solution_base_dir):
+        solution_names = os.listdir(solution_base_dir)
+        for solution_name in solution_names:
             solution_dir = os.path.join(solution_base_dir, solution_name)
 
-            # Vérifie si c'est un dossier
-            if os.path.isdir(solution_dir):
+            # Vérifie si c'est un dossier de solution
+            if self.is_solution_folder(solution_name, solution_dir):
                 nouvelle_solution = self.get_sol_bibli(solution_name, solution_dir)
                 if nouvelle_solution is not None:
-                    self.liste_solutions.append(nouvelle_solution)
-        
+                    solutions.append(nouvelle_solution)
+
+        self.set_solutions(solutions)
+        self.index.forget_missing(set(solution_names))
         return self.liste_solutions  # Retourner la liste des solutions
 
-    def get_sol_bibli(self, solution_name, solution_dir):
+    def get_sol_bibli(self, solution_name, solution_dir, force=False):
         """
         Récupère une solution unique depuis la bibliothèque des solutions, remplit l'objet solution
-        avec les noms des fichiers de médias, et calcule sa taille totale.
+        avec les noms des fichiers de médias, et calcule sa taille totale à partir de l'index.
+
+        Le nom et la version de la solution sont lus dans son fichier de description (solution.json)
+        s'il existe ; sinon le nom du dossier sert de nom et la version reste inconnue.
 
         Args:
-            solution_name (str): Le nom de la solution.
+            solution_name (str): Le nom du dossier de la solution.
             solution_dir (str): Le chemin vers le dossier de la solution.
+            force (bool): Relit le dossier même si l'index le considère à jour.
 
         Returns:
             SolutionBiblio: L'objet SolutionBiblio initialisé ou None en cas d'erreur.
         """
-        subdirs = ["image", "image360", "sound", "srt", "video"]
         try:
             nouvelle_solution = SolutionBiblio()
+            nouvelle_solution.dossier = solution_name
             nouvelle_solution.nom = solution_name
+            meta = self.read_meta(solution_dir)
+            if meta:
+                nouvelle_solution.nom = self.config.safe_string(meta.get("name", "")) or solution_name
+                nouvelle_solution.version = meta.get("name_version", "")
             totale_size = 0  # Initialisation de la taille totale
 
-            # Parcours des sous-dossiers et ajout des fichiers de médias à la solution
-            for subdir in subdirs:
-                target_dir = os.path.join(solution_dir, subdir)
-
-                if os.path.exists(target_dir):
-                    media_files = os.listdir(target_dir)
-                    totale_size += sum(os.path.getsize(os.path.join(target_dir, f)) for f in media_files)
-                    if subdir == "image":
-                        nouvelle_solution.image.extend(media_files)
-                    elif subdir == "image360":
-                        nouvelle_solution.image360.extend(media_files)
-                    elif subdir == "sound":
-                        nouvelle_solution.sound.extend(media_files)
-                    elif subdir == "srt":
-                        nouvelle_solution.srt.extend(media_files)
-                    elif subdir == "video":
-                        nouvelle_solution.video.extend(media_files)
+            # Les fichiers viennent de l'index, qui ne relit le dossier que s'il a changé
+            media_files = self.index.get_solution_files(solution_name, solution_dir, force)
+            for subdir, files in media_files.items():
+                totale_size += sum(size for _, size in files)
+                getattr(nouvelle_solution, subdir).extend(name for name, _ in files)
+            nouvelle_solution.set_manifest(media_files)
 
             nouvelle_solution.size = totale_size  # Attribuer la taille totale à l'objet SolutionBiblio
             return nouvelle_solution
@@ -92,57 +162,184 @@ class BiblioManager(metaclass=SingletonMeta):
 
     def refresh_biblio(self):
         """
-        Rafraîchit la liste des solutions dans la bibliothèque si un ajout ou une suppression est détecté.
+        Rafraîchit la liste des solutions dans la bibliothèque si un ajout, une suppression ou une modification est détecté.
+
+        Une solution déjà connue n'est relue que si la date de son dossier ou de ses sous-dossiers a changé.
         """
-        # Lire tous les éléments dans le dossier bibliothèque
-        solution_base_path = self.config.Bibliothèque_de_solution_path
-        name_sols_in_folder = set(os.listdir(solution_base_path))
+        # Le passage complet se fait sous le verrou : une mise à jour partielle (refresh_solutions) ne peut
+        # ni être écrasée par une liste calculée avant elle, ni s'intercaler au milieu
+        with self.lock:
+            # Lire tous les éléments dans le dossier bibliothèque
+            solution_base_path = self.config.Bibliothèque_de_solution_path
+            name_sols_in_folder = set(os.listdir(solution_base_path))
+            existing_solutions = self.solutions_par_dossier
 
-        # Mettre à jour les solutions existantes et ajouter de nouvelles solutions
-        updated_solutions = []
+            # Mettre à jour les solutions existantes et ajouter de nouvelles solutions
+            updated_solutions = []
 
-        for solution_name in name_sols_in_folder:
-            solution_path_folder = os.path.join(solution_base_path, solution_name)
+            for solution_name in name_sols_in_folder:
+                solution_path_folder = os.path.join(solution_base_path, solution_name)
 
-            if os.path.isdir(solution_path_folder):
-                existing_solution = next((sol for sol in self.liste_solutions if sol.nom == solution_name), None)
-                if existing_solution:
-                    # Vérifier si la taille a changé
-                    current_size = existing_solution.get_sol_size()
-                    if existing_solution.size != existing_solution.get_sol_size():
-                        existing_solution.size = existing_solution.get_sol_size()
-                    updated_solutions.append(existing_solution)
-                else:
-                    # Solution inexistante, la crée
-                    print(f"Ajout d'une nouvelle solution : {solution_name}")
+                if self.is_solution_folder(solution_name, solution_path_folder):
+                    existing_solution = existing_solutions.get(solution_name)
+                    if existing_solution and self.index.is_up_to_date(solution_name, solution_path_folder):
+                        updated_solutions.append(existing_solution)
+                        continue
+
+                    if existing_solution is None:
+                        # Solution inexistante, la crée
+                        print(f"Ajout d'une nouvelle solution : {solution_name}")
                     nouvelle_solution = self.get_sol_bibli(solution_name, solution_path_folder)
                     if nouvelle_solution is not None:
                         updated_solutions.append(nouvelle_solution)
 
-        # Mettre à jour la liste des solutions avec les nouvelles et mises à jour solutions
-        self.liste_solutions = updated_solutions
+            # Mettre à jour la liste des solutions, les solutions qui n'existent plus étant retirées
+            self._set_solutions(updated_solutions)
+            self.index.forget_missing(name_sols_in_folder)
 
-        # Supprimer les solutions qui n'existent plus
-        self.liste_solutions = [sol for sol in self.liste_solutions if sol.nom in name_sols_in_folder]
+    def refresh_solutions(self, solution_names):
+        """
+        Met à jour uniquement les solutions indiquées : relues si leur dossier existe, retirées sinon.
 
+        Args:
+            solution_names (set): Les noms des dossiers des solutions modifiées.
+        """
+        with self.lock:
+            solution_base_path = self.config.Bibliothèque_de_solution_path
+            updates = {}
+            for solution_name in solution_names:
+                if solution_name.startswith("."):
+                    continue
+                solution_path_folder = os.path.join(solution_base_path, solution_name)
+                if os.path.isdir(solution_path_folder):
+                    # Les nouveaux médias rejoignent le magasin partagé avant l'indexation
+                    self.blobs.add_folder(solution_path_folder, BiblioIndex.SUBDIRS)
+                    updates[solution_name] = self.get_sol_bibli(solution_name, solution_path_folder, force=True)
+                else:
+                    updates[solution_name] = None
+
+            solutions = dict(self.solutions_par_dossier)
+            for solution_name, solution in updates.items():
+                if solution is None:
+                    if solutions.pop(solution_name, None) is not None:
+                        print(f"Suppression de la solution : {solution_name}")
+                else:
+                    if solution_name not in solutions:
+                        print(f"Ajout d'une nouvelle solution : {solution_name}")
+                    solutions[solution_name] = solution
+            self._set_solutions(list(solutions.values()))
+            self.index.forget_missing(set(solutions))
+
+    def on_biblio_event(self, solution_names):
+        """
+        Reçoit les modifications signalées par la surveillance de la bibliothèque.
+
+        Args:
+            solution_names (set): Les noms des solutions modifiées, ou None s'il faut relire toute la bibliothèque.
+        """
+        try:
+            if solution_names is None:
+                self.refresh_biblio()
+            else:
+                self.refresh_solutions(solution_names)
+        except Exception as e:
+            print(f"Erreur lors de la mise à jour de la bibliothèque : {e}")
+            traceback.print_exc()
+
+    def start_watcher(self, stop_event):
+        """
+        Lance la surveillance de la bibliothèque dans un thread, jusqu'au déclenchement de stop_event.
+
+        Seules les solutions dont le dossier a changé depuis le relevé précédent (config.biblio_poll_interval)
+        sont relues ; la bibliothèque entière n'est plus relue périodiquement.
+
+        Args:
+            stop_event (threading.Event): L'événement d'arrêt.
+
+        Returns:
+            threading.Thread: Le thread de surveillance.
+        """
+        watcher = biblioWatcher.create_watcher(self.config.Bibliothèque_de_solution_path, self.on_biblio_event,
+                                               self.config.biblio_poll_interval, self.index.dir_mtimes)
+        # Rattrape les modifications faites avant la mise en place de la surveillance
+        self.refresh_biblio()
+        threading.Thread(target=self.deduplicate, daemon=True, name="biblio_dedup").start()
+        thread = threading.Thread(target=watcher.run, args=(stop_event,), daemon=True, name="biblio_watcher")
+        thread.start()
+        return thread
 
     def is_sol_in_library(self, solution):
         """
-        Vérifie si une solution est déjà présente dans la bibliothèque.
+        Cherche dans la bibliothèque la copie d'une solution de casque.
+
+        La copie de la même version est retenue en priorité. À défaut, une copie dont la version
+        n'est pas connue (dossier sans fichier de description) est acceptée si elle contient tous les
+        fichiers média de la solution. Une copie d'une autre version ou une copie vide n'est jamais retenue.
 
         Args:
-            solution (Solution): La solution à vérifier.
+            solution (SolutionCasque): La solution à chercher.
 
         Returns:
             SolutionBiblio: La solution correspondante dans la bibliothèque si elle existe, sinon False.
         """
-        for sol_in_biblio in self.liste_solutions:
-            if sol_in_biblio.nom == self.config.safe_string(solution.nom):
-                # Pour plus tard, il faudra vérifier davantage de choses que le nom, comme la version et le poids
+        safe_name = self.config.safe_string(solution.nom)
+        if solution.version:
+            sol_in_biblio = self.solutions_par_version.get((safe_name, solution.version))
+            if sol_in_biblio is not None and sol_in_biblio.size > 0:
+                return sol_in_biblio
+
+        for sol_in_biblio in self.solutions_par_nom.get(safe_name, []):
+            if sol_in_biblio.size == 0:
+                continue
+            if solution.version and sol_in_biblio.version and sol_in_biblio.version != solution.version:
+                continue
+            if sol_in_biblio.covers(solution):
                 return sol_in_biblio
-        
         return False
-        
+
+    def dossier_solution(self, solution):
+        """
+        Retourne le nom du dossier de la bibliothèque dans lequel ranger une solution de casque.
+
+        Args:
+            solution (SolutionCasque): La solution.
+
+        Returns:
+            str: Le nom sécurisé de la solution, suivi de sa version si elle est connue.
+        """
+        if solution.version:
+            return self.config.safe_string(f"{solution.nom}_{solution.version}")
+        return self.config.safe_string(solution.nom)
+
+    def read_meta(self, solution_dir):
+        """
+        Lit le fichier de description d'un dossier de solution.
+
+        Args:
+            solution_dir (str): Le chemin du dossier de la solution.
+
+        Returns:
+            dict: Le nom ("name") et la version ("name_version") de la solution, ou None si le fichier est absent ou illisible.
+        """
+        try:
+            with open(os.path.join(solution_dir, META_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Fichier de description illisible dans {solution_dir} : {e}")
+            return None
+
+    def write_meta(self, solution_dir, solution):
+        """
+        Écrit le fichier de description d'un dossier de solution.
+
+        Args:
+            solution_dir (str): Le chemin du dossier de la solution.
+            solution (Solution): La solution, dont le nom et la version sont enregistrés.
+        """
+        with open(os.path.join(solution_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({"name": solution.nom, "name_version": solution.version}, f, ensure_ascii=False)
 
     def print_solutions_with_size(self):
         """
@@ -0,0 +1,74 @@
+import os
+
+class PollingWatcher:
+    """
+    Surveille la bibliothèque en relevant périodiquement la signature de chaque dossier de solution.
+
+    La signature (dates du dossier et de ses sous-dossiers, voir BiblioIndex.dir_mtimes) ne coûte que quelques stat :
+    un relevé ne lit aucun fichier média, et seules les solutions dont la signature a changé sont relues.
+    """
+
+    def __init__(self, root, on_change, interval, signature):
+        """
+        Initialise la surveillance.
+
+        Args:
+            root (str): Le dossier de la bibliothèque.
+            on_change (callable): Appelé avec l'ensemble des noms de solutions modifiées.
+            interval (float): L'intervalle entre deux relevés en secondes.
+            signature (callable): Retourne, pour le chemin d'un dossier de solution, une valeur qui change avec son contenu.
+        """
+        self.root = root
+        self.on_change = on_change
+        self.interval = interval
+        self.signature = signature
+        self.signatures = self.snapshot()
+
+    def snapshot(self):
+        """
+        Relève la signature de chaque dossier de solution.
+
+        Returns:
+            dict: Les signatures, indexées par nom de solution.
+        """
+        signatures = {}
+        for solution_name in os.listdir(self.root):
+            solution_dir = os.path.join(self.root, solution_name)
+            if not solution_name.startswith(".") and os.path.isdir(solution_dir):
+                signatures[solution_name] = self.signature(solution_dir)
+        return signatures
+
+    def run(self, stop_event):
+        """
+        Boucle de surveillance, jusqu'au déclenchement de stop_event.
+
+        Args:
+            stop_event (threading.Event): L'événement d'arrêt.
+        """
+        while not stop_event.wait(self.interval):
+            try:
+                signatures = self.snapshot()
+            except OSError as e:
+                print(f"Erreur lors de la surveillance de la bibliothèque : {e}")
+                continue
+            changed = {name for name in signatures.keys() | self.signatures.keys()
+                       if signatures.get(name) != self.signatures.get(name)}
+            self.signatures = signatures
+            if changed:
+                self.on_change(changed)
+
+
+def create_watcher(root, on_change, poll_interval, signature):
+    """
+    Crée la surveillance de la bibliothèque.
+
+    Args:
+        root (str): Le dossier de la bibliothèque.
+        on_change (callable): Appelé avec l'ensemble des noms de solutions modifiées.
+        poll_interval (float): L'intervalle des relevés, en secondes.
+        signature (callable): La signature d'un dossier de solution.
+
+    Returns:
+        PollingWatcher: La surveillance, à lancer avec run(stop_event).
+    """
+    return PollingWatcher(root, on_change, poll_interval, signature)
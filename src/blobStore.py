@@ -0,0 +1,250 @@
+import os
+import shutil
+import threading
+
+import manifest
+
+class BlobStore:
+    """
+    Magasin de médias adressé par contenu, partagé par toutes les solutions de la bibliothèque.
+
+    Chaque média distinct est conservé une seule fois dans `.blobs/<md5[:2]>/<md5>` ; les fichiers
+    des dossiers de solutions en sont des liens physiques, si bien que la structure des dossiers
+    (image, video...) reste inchangée. Si le système de fichiers ne gère pas les liens physiques,
+    les fichiers restent de simples copies.
+
+    Note:
+        Un média lié est partagé : le modifier sur place le modifie dans toutes les solutions qui l'utilisent.
+        Le magasin le détecte alors (empreinte différente) et retire ce média, qui n'est plus proposé.
+    """
+
+    def __init__(self, library_path):
+        """
+        Initialise le magasin.
+
+        Args:
+            library_path (str): Le dossier de la bibliothèque.
+        """
+        self.root = os.path.join(library_path, ".blobs")
+        self.lock = threading.Lock()
+        # Tenu pendant la création des liens vers un média et pendant le ménage : un média en cours de
+        # liaison (compteur de liens encore à 1) n'est jamais supprimé par prune
+        self.link_lock = threading.Lock()
+        self.links_supported = None
+        self.inodes = None
+
+    def blob_path(self, digest):
+        """
+        Retourne le chemin du média d'empreinte donnée.
+
+        Args:
+            digest (str): L'empreinte md5 du média.
+
+        Returns:
+            str: Le chemin du média dans le magasin.
+        """
+        return os.path.join(self.root, digest[:2], digest)
+
+    def is_enabled(self):
+        """
+        Indique si le système de fichiers de la bibliothèque gère les liens physiques, en le vérifiant une seule fois.
+
+        Sans liens physiques (partage SMB, exFAT...), le magasin est désactivé : les fichiers restent de
+        simples copies et ne sont ni relus ni liés.
+
+        Returns:
+            bool: True si le magasin est utilisable.
+        """
+        with self.lock:
+            if self.links_supported is None:
+                probe = os.path.join(self.root, ".link_probe")
+                try:
+                    os.makedirs(self.root, exist_ok=True)
+                    with open(probe, 'wb'):
+                        pass
+                    os.link(probe, probe + "_link")
+                    os.remove(probe + "_link")
+                    self.links_supported = True
+                except OSError as e:
+                    print(f"Liens physiques non gérés par la bibliothèque, magasin de médias désactivé : {e}")
+                    self.links_supported = False
+                finally:
+                    if os.path.exists(probe):
+                        os.remove(probe)
+            return self.links_supported
+
+    def _inode_index(self):
+        """
+        Retourne l'index des médias du magasin par inode, construit au premier appel sans relire aucun fichier.
+
+        Returns:
+            dict: Les empreintes des médias, indexées par (périphérique, inode).
+        """
+        if self.inodes is None:
+            inodes = {}
+            if os.path.isdir(self.root):
+                for prefix in os.listdir(self.root):
+                    prefix_dir = os.path.join(self.root, prefix)
+                    if not os.path.isdir(prefix_dir):
+                        continue
+                    for digest in os.listdir(prefix_dir):
+                        stat = os.stat(os.path.join(prefix_dir, digest))
+                        inodes[(stat.st_dev, stat.st_ino)] = digest
+            self.inodes = inodes
+        return self.inodes
+
+    def sizes(self):
+        """
+        Retourne les tailles des médias du magasin, pour ne calculer l'empreinte que des fichiers qui peuvent s'y trouver.
+
+        Returns:
+            set: Les tailles en octets.
+        """
+        if not self.is_enabled():
+            return set()
+        sizes = set()
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if os.path.isdir(prefix_dir):
+                for digest in os.listdir(prefix_dir):
+                    sizes.add(os.stat(os.path.join(prefix_dir, digest)).st_size)
+        return sizes
+
+    def has(self, digest):
+        """
+        Indique si un média est dans le magasin et si son contenu correspond toujours à son empreinte.
+
+        Un média modifié sur place (par l'un des fichiers liés) est retiré du magasin ; les fichiers
+        des solutions gardent leur contenu.
+
+        Args:
+            digest (str): L'empreinte md5 du média.
+
+        Returns:
+            bool: True si le média est présent et intact.
+        """
+        if not digest or not self.is_enabled():
+            return False
+        blob = self.blob_path(digest)
+        try:
+            stat = os.stat(blob)
+        except OSError:
+            return False
+        # L'empreinte est mémorisée par taille et date : seul un média modifié est relu
+        if manifest.local_md5(blob, stat.st_size, int(stat.st_mtime)) == digest:
+            return True
+        print(f"Le média {digest} du magasin a été modifié, il en est retiré.")
+        with self.lock:
+            self._inode_index().pop((stat.st_dev, stat.st_ino), None)
+            os.remove(blob)
+        return False
+
+    def add_file(self, path):
+        """
+        Range un fichier de la bibliothèque dans le magasin.
+
+        Si un média identique est déjà présent, le fichier est remplacé par un lien vers ce média ;
+        sinon le fichier devient le média du magasin. Un fichier dont l'inode est déjà celui d'un
+        média du magasin n'est pas relu.
+
+        Args:
+            path (str): Le chemin du fichier dans un dossier de solution.
+
+        Returns:
+            bool: True si le fichier est lié au magasin.
+        """
+        if not self.is_enabled():
+            return False
+        stat = os.stat(path)
+        with self.lock:
+            if (stat.st_dev, stat.st_ino) in self._inode_index():
+                return True
+
+        digest = manifest.local_md5(path, stat.st_size, int(stat.st_mtime))
+        blob = self.blob_path(digest)
+        try:
+            with self.link_lock:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                if self.has(digest):
+                    temp_path = path + ".blob_tmp"
+                    os.link(blob, temp_path)
+                    os.replace(temp_path, path)
+                else:
+                    os.link(path, blob)
+                blob_stat = os.stat(blob)
+            with self.lock:
+                self._inode_index()[(blob_stat.st_dev, blob_stat.st_ino)] = digest
+            return True
+        except OSError as e:
+            print(f"Impossible de lier {path} au magasin de médias, le fichier reste une copie : {e}")
+            return False
+
+    def materialize(self, digest, dest):
+        """
+        Crée un fichier de solution à partir d'un média du magasin, par lien physique ou à défaut par copie.
+
+        Args:
+            digest (str): L'empreinte md5 du média.
+            dest (str): Le chemin du fichier à créer.
+
+        Returns:
+            bool: True si le fichier a été créé, False si le média n'est pas dans le magasin ou n'est plus intact.
+        """
+        with self.link_lock:
+            if not self.has(digest):
+                return False
+            blob = self.blob_path(digest)
+            if os.path.exists(dest):
+                os.remove(dest)
+            try:
+                os.link(blob, dest)
+            except OSError:
+                shutil.copy2(blob, dest)
+            return True
+
+    def add_folder(self, solution_dir, subdirs):
+        """
+        Range tous les fichiers média d'un dossier de solution dans le magasin.
+
+        Args:
+            solution_dir (str): Le chemin du dossier de la solution.
+            subdirs (list): Les sous-dossiers de médias.
+
+        Returns:
+            int: Le nombre de fichiers liés au magasin.
+        """
+        linked = 0
+        for subdir in subdirs:
+            target_dir = os.path.join(solution_dir, subdir)
+            if not os.path.isdir(target_dir):
+                continue
+            for name in os.listdir(target_dir):
+                path = os.path.join(target_dir, name)
+                if os.path.isfile(path) and self.add_file(path):
+                    linked += 1
+        return linked
+
+    def prune(self):
+        """
+        Supprime du magasin les médias qui ne sont plus utilisés par aucune solution.
+
+        Returns:
+            int: Le nombre de médias supprimés.
+        """
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        with self.link_lock:
+            for prefix in os.listdir(self.root):
+                prefix_dir = os.path.join(self.root, prefix)
+                if not os.path.isdir(prefix_dir):
+                    continue
+                for digest in os.listdir(prefix_dir):
+                    blob = os.path.join(prefix_dir, digest)
+                    stat = os.stat(blob)
+                    if stat.st_nlink == 1:
+                        os.remove(blob)
+                        with self.lock:
+                            self._inode_index().pop((stat.st_dev, stat.st_ino), None)
+                        removed += 1
+        return removed
@@ -1,17 +1,28 @@
 import subprocess
 import os
 import re
+import shlex
 import threading
 import traceback
 import json
-import base64
+import hashlib
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from marque import Marque
 from solutionCasque import SolutionCasque
 from config import Config
 import adbtools
 from biblioManager import BiblioManager
+from biblioIndex import BiblioIndex
+from refreshScheduler import RefreshScheduler
+from transferEngine import TransferEngine, ByteProgress
+import apkInfo
+import casqueView
+import hardwareCache
+import manifest
+import transferJournal
 
 class Casque:
 
@@ -23,19 +34,28 @@ class Casque:
         self.numero = ""
         self.marque = Marque()
         self.modele = ""
-        self.battery_level: int
+        self.battery_level = -1
         self.version_apk = ""
+        self.old_apk_installed = False
         self.JSON_path = "NULL"
         self.JSON_size = -1
+        self.JSON_mtime = -1
         self.solutions_casque = []
+        self.solutions_par_empreinte = {}
+        self.media_listing = None
         self.code = ""
         self.name = ""
         self.entreprise_association = ""
         self.download_progress = 0
+        self.pull_throughput = None
+        self.streaming_install = None
+        self.wifi_connected = False
+        self.wifi_ssid = "not connected"
 
         self.config = Config()
         self.lock = threading.Lock()
         self.refresh_lock = threading.Lock()
+        self.scheduler = RefreshScheduler(self.config.refresh_ttl)
 
         self.biblio = BiblioManager()
 
@@ -54,41 +74,149 @@ class Casque:
         """
         with self.refresh_lock:
             self.device = device
-            
-            try:
-                self.numero = self.device.get_serial_no().strip()
-            except Exception as e:
-                print(f"{self.name} {self.numero}: Erreur lors de l'obtention du numéro de série : {e}")
-                traceback.print_exc()
-                self.numero = "Inconnu"
-            adbtools.wake_up_device(self.config.adb_exe_path, self.numero) 
-            try:
-                self.marque.setNom(self.device.shell("getprop ro.product.manufacturer").strip(), apk_folder)
-            except Exception as e:
-                print(f"{self.name} {self.numero}: Erreur lors de l'obtention de la marque: {e}")
-                traceback.print_exc()
-                self.marque.setNom("Inconnu")
+            # Le numéro de série est déjà connu du serveur ADB, inutile de le redemander au casque
+            self.numero = self.device.serial
+
+            # Seules les informations périmées sont redemandées, en une seule connexion ADB
+            sections, forced = self.scheduler.stale_fields(with_forced=True)
+            if not sections:
+                return
+            snapshot = adbtools.probe_device(self.device, self.config.package_name, self.config.package_old_name_PPV1, self.config.json_file_path,
+                                             sections=sections, timeout=self.config.refresh_timeout)
+            self.apply_snapshot(snapshot, apk_folder)
+            self.scheduler.mark_refreshed(sections, forced=forced)
+
+    def stale_fields(self):
+        """
+        Retourne les informations du casque qui seront redemandées au prochain rafraîchissement.
 
-            try:
-                self.modele = self.device.shell("getprop ro.product.model").strip()
-            except Exception as e:
-                print(f"{self.name} {self.numero}: Erreur lors de l'obtention du modèle: {e}")
-                traceback.print_exc()
-                self.modele = "Inconnu"
+        Returns:
+            list: Les noms des champs périmés.
+        """
+        return self.scheduler.stale_fields()
 
-            self.battery_level = adbtools.check_battery_level(self.config.adb_exe_path, self.numero)
-            
-            self.version_apk = self.get_installed_apk_version()
-            # Vérifier si l'ancienne APK est installée
-            self.old_apk_installed = self.check_old_apk_installed()
-            
-            # Vérifie que le fichier JSON a une taille différente et que le fichier existe bien
-            if (self.JSON_path != self.check_json_file()) or (self.JSON_size != self.get_json_file_size()):
-                
-                self.JSON_path = self.check_json_file()
-                self.JSON_size = self.get_json_file_size()
+    def apply_snapshot(self, snapshot, apk_folder):
+        """
+        Remplit les attributs du casque à partir de l'enregistrement retourné par adbtools.probe_device.
+
+        Args:
+            snapshot (dict): Les informations du casque issues de la sonde.
+            apk_folder (str): Le chemin vers le dossier des APK.
+        """
+        if snapshot.get("screen_on") is False:
+            adbtools.press_power_key(self.config.adb_exe_path, self.numero)
+
+        if "manufacturer" in snapshot:
+            self.marque.setNom(snapshot["manufacturer"], apk_folder)
+        if "model" in snapshot:
+            self.modele = snapshot["model"]
+        if "battery_level" in snapshot:
+            self.battery_level = snapshot["battery_level"]
+        if "version_apk" in snapshot:
+            self.version_apk = snapshot["version_apk"]
+        if "old_apk_installed" in snapshot:
+            self.old_apk_installed = snapshot["old_apk_installed"]
+        if "wifi_connected" in snapshot:
+            self.wifi_connected = snapshot["wifi_connected"]
+            self.wifi_ssid = snapshot["wifi_ssid"]
+
+        if "json_size" in snapshot:
+            self.update_json_state(snapshot["json_size"], snapshot["json_mtime"])
+
+    def update_json_state(self, json_size, json_mtime):
+        """
+        Recharge les données du fichier JSON si celui-ci est apparu, a disparu, ou si sa taille ou sa date a changé.
+
+        Args:
+            json_size (int): La taille du fichier sur le casque, négative s'il est absent.
+            json_mtime (int): La date de modification du fichier sur le casque.
+        """
+        # Vérifie que le fichier JSON existe bien et que sa taille ou sa date de modification a changé
+        if json_size >= 0:
+            json_path = self.config.json_file_path
+        else:
+            json_path = "Fichier JSON inexistant"
+            json_size = 0
+
+        if (self.JSON_path != json_path) or (self.JSON_size != json_size) or (self.JSON_mtime != json_mtime):
+            self.JSON_path = json_path
+            self.JSON_size = json_size
+            self.JSON_mtime = json_mtime
+
+            self.solutions_casque = self.load_datas_from_json()
+
+    def stat_json_file(self):
+        """
+        Relève la taille et la date de modification du fichier JSON sur le casque, par la session shell persistante.
+
+        Returns:
+            tuple: (taille, date de modification), ou None si le fichier est absent.
+        """
+        output = adbtools.run_shell(self.config.adb_exe_path, self.numero,
+                                    f"stat -c '%s %Y' {shlex.quote(self.config.json_file_path)} 2>/dev/null", check=False)
+        parts = output.split()
+        try:
+            return int(parts[0]), int(parts[1])
+        except (IndexError, ValueError):
+            return None
+
+    def restart_app_for_json(self):
+        """
+        Relance l'application pour qu'elle réécrive le fichier JSON.
+
+        Returns:
+            tuple: L'état du fichier JSON avant la relance (taille, date), ou None s'il était absent, à passer à await_json.
+        """
+        baseline = self.stat_json_file()
+        self.refresh_JSON()
+        return baseline
+
+    def await_json(self, baseline, timeout=None):
+        """
+        Attend que le fichier JSON soit écrit et stable après une relance de l'application, et recharge ses données.
+
+        Le fichier est relevé à intervalles croissants (config.json_poll_min à config.json_poll_max), ramenés
+        au minimum à chaque changement. Il est prêt dès que sa taille et sa date n'ont pas bougé pendant
+        config.json_stable_delay secondes, à condition qu'il ait été réécrit depuis la relance de
+        l'application, ou qu'il existe déjà et n'ait pas changé pendant config.json_unchanged_grace secondes.
+
+        Args:
+            baseline (tuple): L'état du fichier avant la relance, retourné par restart_app_for_json.
+            timeout (float, optional): Le délai maximal d'attente en secondes, config.json_wait_timeout par défaut.
+
+        Returns:
+            bool: True si le fichier JSON est prêt et chargé, False si le délai est dépassé.
+        """
+        timeout = self.config.json_wait_timeout if timeout is None else timeout
+        _, forced = self.scheduler.stale_fields(with_forced=True)
+        start = time.monotonic()
+        interval = self.config.json_poll_min
+        last_state, last_change = None, start
+        while time.monotonic() - start < timeout:
+            state = self.stat_json_file()
+            now = time.monotonic()
+            if state != last_state:
+                last_state, last_change = state, now
+                interval = self.config.json_poll_min
+            elif state is not None and state[0] > 0 and now - last_change >= self.config.json_stable_delay:
+                if state != baseline or now - start >= self.config.json_unchanged_grace:
+                    print(f"{self.name} {self.numero}: Fichier JSON prêt en {now - start:.1f}s.")
+                    with self.refresh_lock:
+                        self.update_json_state(*state)
+                        self.scheduler.mark_refreshed(["json"], forced=forced)
+                    return True
+            time.sleep(interval)
+            interval = min(interval * 1.5, self.config.json_poll_max)
+        return False
+
+    def get_vue(self):
+        """
+        Retourne l'instantané d'affichage du casque, construit uniquement à partir des valeurs en cache.
 
-                self.solutions_casque = self.load_datas_from_json()
+        Returns:
+            CasqueView: L'instantané immuable du casque.
+        """
+        return casqueView.from_casque(self)
 
     def reset_JSON(self):
         """
@@ -102,6 +230,11 @@ class Casque:
         """
         Charge les données depuis le fichier JSON stocké sur le casque.
 
+        Le contenu décodé est mis en cache (hardwareCache) avec la taille, la date et l'empreinte du
+        fichier : il n'est relu que si la taille ou la date a changé, et décodé de nouveau que si
+        l'empreinte a changé. Seules les solutions ajoutées ou modifiées depuis le chargement précédent
+        sont reconstruites et vérifiées ; les autres sont conservées telles quelles.
+
         Returns:
             list: Une liste d'objets SolutionCasque représentant les solutions disponibles sur le casque.
         """
@@ -109,16 +242,7 @@ class Casque:
         self.reset_JSON()
         if self.JSON_path != "Fichier JSON inexistant" and self.JSON_path != "NULL":
             try:
-                # Lire le contenu du fichier JSON encodé en base 64 sur le casque
-                encoded_output = subprocess.check_output(["adb", "-s", self.numero, "shell", "cat", self.JSON_path], stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode('utf-8')
-                if encoded_output.strip() == "":
-                    raise ValueError(f"{self.name} {self.numero}: Le fichier JSON est vide")
-
-                # Décoder le contenu du fichier JSON de la base 64
-                decoded_output = base64.b64decode(encoded_output).decode('utf-8')
-
-                # Charger les données JSON
-                json_data = json.loads(decoded_output)
+                json_data = self.read_json_data()
 
                 # Récupérer et enregistrer le nom
                 self.name = json_data.get('name', "")
@@ -130,15 +254,111 @@ class Casque:
                 entreprises = json_data.get('enterprises_associate', [])
                 self.entreprise_association = entreprises[0] if entreprises else ""
 
-                # Créer des objets Solution à partir des données JSON
-                for solution_data in json_data.get('versions', []):
-                    solution_casque = SolutionCasque().from_json_opti(solution_data, self.numero, self.config.upload_casque_path)
-                    solutions_casque.append(solution_casque)
+                solutions_casque = self.build_solutions(json_data.get('versions', []))
             except Exception as e:
                 print(f"{self.name} {self.numero}: Erreur lors du chargement du fichier JSON : {e}")
                 traceback.print_exc()
+        if not solutions_casque:
+            self.solutions_par_empreinte = {}
         return solutions_casque
 
+    def read_json_data(self):
+        """
+        Retourne le contenu décodé du fichier JSON du casque, depuis le cache si le fichier n'a pas changé.
+
+        Returns:
+            dict: Le contenu JSON décodé.
+
+        Raises:
+            ValueError: Si le fichier JSON est vide.
+        """
+        cache = hardwareCache.get_cache(self.config.hardware_cache_path)
+        json_data = cache.get(self.numero, self.JSON_size, self.JSON_mtime)
+        if json_data is not None:
+            return json_data
+
+        # Lire le fichier JSON encodé en base 64 par le service sync, en le décodant au fil de la réception
+        decoder = hardwareCache.Base64Decoder()
+        TransferEngine(self.device).read_file(self.JSON_path, decoder)
+        if decoder.size == 0:
+            raise ValueError(f"{self.name} {self.numero}: Le fichier JSON est vide")
+
+        digest = decoder.hexdigest()
+        json_data = cache.get_by_digest(self.numero, digest)
+        if json_data is None:
+            # json.loads accepte directement les octets UTF-8, sans copie décodée en texte
+            json_data = json.loads(decoder.close())
+        cache.set(self.numero, self.JSON_size, self.JSON_mtime, digest, json_data)
+        return json_data
+
+    def build_solutions(self, versions):
+        """
+        Construit les solutions du casque à partir de la liste `versions` du fichier JSON.
+
+        Une entrée identique à celle du chargement précédent reprend l'objet SolutionCasque déjà construit,
+        sans nouvelle vérification de ses médias ; le listage du casque n'est relu que si une entrée est
+        nouvelle ou modifiée.
+
+        Args:
+            versions (list): Les entrées `versions` du fichier JSON.
+
+        Returns:
+            list: Les objets SolutionCasque, dans l'ordre du fichier JSON.
+        """
+        previous = dict(self.solutions_par_empreinte)
+        solutions_par_empreinte = {}
+        solutions_casque = []
+        listing = None
+        rebuilt = 0
+
+        for solution_data in versions:
+            empreinte = hashlib.sha1(json.dumps(solution_data, sort_keys=True).encode('utf-8')).hexdigest()
+            solution_casque = previous.pop(empreinte, None)
+            if solution_casque is None:
+                if listing is None:
+                    # Un seul listage du dossier upload, partagé par toutes les solutions du casque
+                    listing = self.get_media_listing(force=True)
+                solution_casque = SolutionCasque()
+                solution_casque.from_json_opti(solution_data, self.numero, self.config.upload_casque_path,
+                                               listing=listing, biblio=self.biblio)
+                rebuilt += 1
+            solutions_par_empreinte.setdefault(empreinte, solution_casque)
+            solutions_casque.append(solution_casque)
+
+        self.solutions_par_empreinte = solutions_par_empreinte
+        if rebuilt < len(versions):
+            print(f"{self.name} {self.numero}: {rebuilt} solution(s) ajoutée(s) ou modifiée(s), {len(versions) - rebuilt} inchangée(s).")
+        return solutions_casque
+
+    def get_media_listing(self, force=False):
+        """
+        Retourne le listage récursif du dossier upload du casque, obtenu en une seule commande ADB et mis en cache.
+
+        Args:
+            force (bool): Relit le listage même s'il est en cache.
+
+        Returns:
+            dict: La taille et la date de modification de chaque fichier, indexées par chemin complet sur le casque.
+        """
+        if self.media_listing is not None and not force:
+            return self.media_listing
+
+        listing = {}
+        command = f"find {shlex.quote(self.config.upload_casque_path)} -type f -exec stat -c '%s %Y %n' {{}} + 2>/dev/null"
+        try:
+            output = adbtools.run_shell(self.config.adb_exe_path, self.numero, command, check=False)
+            for line in output.splitlines():
+                parts = line.split(" ", 2)
+                if len(parts) == 3:
+                    try:
+                        listing[parts[2]] = (int(parts[0]), int(parts[1]))
+                    except ValueError:
+                        pass
+        except Exception as e:
+            print(f"{self.name} {self.numero}: Erreur lors du listage des fichiers du casque : {e}")
+        self.media_listing = listing
+        return listing
+
     def check_old_apk_installed(self):
         """
         Vérifie si l'ancienne APK est installée sur le casque.
@@ -147,9 +367,7 @@ class Casque:
             bool: True si l'ancienne APK est installée, False sinon.
         """
         try:
-            result = subprocess.run([self.config.adb_exe_path, "-s", self.numero, "shell", "pm", "list", "packages", self.config.package_old_name_PPV1],
-                                    check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, creationflags=subprocess.CREATE_NO_WINDOW)
-            output = result.stdout.decode('utf-8')
+            output = adbtools.run_shell(self.config.adb_exe_path, self.numero, f"pm list packages {shlex.quote(self.config.package_old_name_PPV1)}")
             if self.config.package_old_name_PPV1 in output:
                 return True
         except subprocess.CalledProcessError as e:
@@ -164,9 +382,8 @@ class Casque:
             int: La taille du fichier JSON en octets, ou 0 en cas d'erreur.
         """
         if self.JSON_path != "Fichier JSON inexistant":
-            command = [self.config.adb_exe_path, "-s", self.numero, "shell", "stat", "-c%s", self.JSON_path]
             try:
-                output = subprocess.check_output(command, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode("utf-8").strip()
+                output = adbtools.run_shell(self.config.adb_exe_path, self.numero, f"stat -c%s {shlex.quote(self.JSON_path)}").strip()
                 return int(output)
             except subprocess.CalledProcessError as e:
                 print(f"{self.name} {self.numero}: Erreur lors de la récupération de la taille du fichier JSON : {e}")
@@ -181,9 +398,7 @@ class Casque:
         """
         with self.lock:
             try:
-                result = subprocess.run([self.config.adb_exe_path, "-s", self.numero, "shell", "dumpsys", "package", self.config.package_name],
-                                        check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, creationflags=subprocess.CREATE_NO_WINDOW)
-                output = result.stdout.decode('utf-8')
+                output = adbtools.run_shell(self.config.adb_exe_path, self.numero, f"dumpsys package {shlex.quote(self.config.package_name)}")
 
                 version_match = re.search(r'versionName=(\S+)', output)
                 if version_match:
@@ -193,7 +408,6 @@ class Casque:
                     return "X"
             except subprocess.CalledProcessError as e:
                 print(f"{self.name} {self.numero}: Une erreur est survenue lors de l'obtention de la version de l'APK : {e}")
-                print(e.stderr.decode("utf-8"))
                 return None
 
     
@@ -227,7 +441,7 @@ class Casque:
         """
         with self.lock:
             try:
-                output = subprocess.check_output(["adb", "-s", self.numero, "shell", "ls", self.config.json_file_path], stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode("utf-8")
+                output = adbtools.run_shell(self.config.adb_exe_path, self.numero, f"ls {shlex.quote(self.config.json_file_path)}")
                 if self.config.json_file_path in output:
                     self.JSON_path = os.path.dirname(self.config.json_file_path)
                     return self.config.json_file_path
@@ -256,6 +470,7 @@ class Casque:
         Rafraîchit le JSON sur le casque en réinitialisant les données et en redémarrant l'application si nécessaire.
         """
         self.reset_JSON()
+        self.scheduler.invalidate(["json"])
         adbtools.wake_up_device(self.config.adb_exe_path, self.numero)
         
         # Vérifier si l'application est en cours d'exécution, et si oui, l'arrêter
@@ -276,111 +491,140 @@ class Casque:
         """
         Transfère les solutions disponibles dans la bibliothèque vers le casque.
         """
+        solutions = self.plan_push_solutions()
+        if solutions is None:
+            return
+
+        print(f"{self.name} {self.numero}: push_solutions")
+        for solution, solution_from_bibli in solutions:
+            self.push_solution_with_progress(solution, solution_from_bibli)
+
+    def plan_push_solutions(self):
+        """
+        Liste les solutions du casque à téléverser depuis la bibliothèque.
+
+        Returns:
+            list: Liste de tuples (SolutionCasque, SolutionBiblio) à téléverser, ou None si le casque
+                n'est pas prêt (aucune solution associée ou fichier JSON absent).
+        """
         if not self.solutions_casque:
             print(f"{self.name} {self.numero}: Aucune solution n'est associée au casque, rien n'est à push (téléverser) sur le casque.")
-            return
+            return None
 
         if not self.JSON_path or self.JSON_path == "Fichier JSON inexistant":
             print(f"{self.name} {self.numero}: Aucun fichier JSON détecté, cela est nécessaire. Veuillez vérifier la connexion du casque ou cliquer sur le bouton 'Rafraîchir fichier JSON'.")
-            return
-
-        solutions_pushed = False
+            return None
 
-        print(f"{self.name} {self.numero}: push_solutions")
+        solutions = []
         for solution in self.solutions_casque:
             if not solution.sol_install_on_casque:
                 solution_from_bibli = self.biblio.is_sol_in_library(solution)
                 if solution_from_bibli:
-                    self.push_solution_with_progress(solution, solution_from_bibli)
-                    solutions_pushed = True
+                    solutions.append((solution, solution_from_bibli))
                 else:
                     print(f"{self.name} {self.numero}: Push impossible car la solution '{solution.nom}' n'est pas disponible dans la bibliothèque, veuillez la télécharger manuellement sur le casque via l'APK.")
 
-        if not solutions_pushed:
+        if not solutions:
             print(f"{self.name} {self.numero}: Toutes les solutions sont déjà installées ou ne sont pas disponibles dans la bibliothèque.")
+        return solutions
 
-
-
-    def push_solution_with_progress(self, solution_json_casque, solution_biblio):
+    def push_solution_with_progress(self, solution_json_casque, solution_biblio, on_progress=None):
         """
-        Transfère une solution spécifique du PC vers le casque avec un suivi de la progression.
+        Transfère une solution spécifique du PC vers le casque avec un suivi de la progression en octets.
 
         Args:
             solution_json_casque (SolutionCasque): L'objet SolutionCasque à transférer.
             solution_biblio (SolutionBiblio): L'objet SolutionBiblio correspondant dans la bibliothèque.
+            on_progress (callable, optional): Appelé en plus avec (octets transférés, total), par exemple par l'ordonnanceur.
+
+        Returns:
+            bool: True si tous les fichiers ont été transférés.
         """
-        safe_solution_name = self.config.safe_string(solution_json_casque.nom)
-        print(f"{self.name} {self.numero}: {safe_solution_name}")
-        solution_dir = os.path.join(self.config.Bibliothèque_de_solution_path, safe_solution_name)
-        print(f"{self.name} {self.numero}: solution_dir {solution_dir}")
+        def progress_callback(copied_size, total_size):
+            progress = copied_size / total_size * 100 if total_size else 100
+            self.download_progress = progress  # Mise à jour de la progression du téléchargement
+            if on_progress:
+                on_progress(copied_size, total_size)
 
-        print(solution_biblio.size)
-        if os.path.exists(solution_dir):
-            subdirs = ["image", "image360", "sound", "srt", "video"]
-            
-            total_size = solution_biblio.size
-            copied_size = 0
-
-            def progress_callback(copied_bytes):
-                nonlocal copied_size
-                copied_size += copied_bytes
-                progress = copied_size / total_size * 100
-                print(f"{self.name} {self.numero}: Progress: {progress:.2f}%")
-                self.download_progress = progress  # Mise à jour de la progression du téléchargement
-
-            for subdir in subdirs:
-                source_dir = os.path.join(solution_dir, subdir)
-                
-                if os.path.exists(source_dir):
-                    media_files = getattr(solution_json_casque, subdir, [])
-                    
-                    for media_file in media_files:
-                        local_file_path = os.path.join(source_dir, os.path.basename(media_file)).replace("'\'", "/")
-                        
-                        try:
-                            self.copy_media_file(local_file_path, self.config.upload_casque_path + media_file, solution_json_casque.nom, "push")
-                            progress_callback(os.path.getsize(local_file_path))  # Mesure de la taille du fichier envoyé et mise à jour du poids envoyé
-                        except Exception as e:
-                            print(f"{self.name} {self.numero}: Erreur lors du téléversement du fichier {local_file_path} pour {solution_json_casque.nom} : {e}")
-                            return
-
-            solution_json_casque.sol_install_on_casque = True
-            print(f"{self.name} {self.numero}: Solution {solution_json_casque.nom} copiée avec succès dans le casque.")
-        else:
-            self._log_message(f"{self.name} {self.numero}: Solution directory does not exist for '{solution_json_casque.nom}' in the library")
+        return self._push_solution_files(solution_json_casque, solution_biblio, progress_callback)
 
     def push_solution(self, solution):
         """
-        Copie les fichiers média d'une solution spécifique du PC vers le casque.
+        Transfère une solution spécifique du PC vers le casque.
 
         Args:
             solution (Solution): L'objet Solution à transférer.
+
+        Returns:
+            bool: True si tous les fichiers ont été transférés.
         """
-        safe_solution_name = self.config.safe_string(solution.nom)
+        solution_biblio = self.biblio.is_sol_in_library(solution)
+        if not solution_biblio:
+            print(f"{self.name} {self.numero}: Push impossible car la solution '{solution.nom}' ({solution.version}) n'est pas disponible dans la bibliothèque.")
+            return False
+        return self._push_solution_files(solution, solution_biblio)
 
-        solution_dir = os.path.join(self.config.Bibliothèque_de_solution_path, safe_solution_name)
+    def get_local_media_files(self, solution, solution_dir):
+        """
+        Associe chaque fichier média d'une solution à sa copie dans la bibliothèque et à son chemin sur le casque.
 
-        if os.path.exists(solution_dir):
-            subdirs = ["image", "image360", "sound", "srt", "video"]
-            for subdir in subdirs:
-                source_dir = os.path.join(solution_dir, subdir)
-                
-                if os.path.exists(source_dir):
-                    media_files = getattr(solution, subdir, [])
-                    
-                    for media_file in media_files:
-                        local_file_path = os.path.join(source_dir, os.path.basename(media_file)).replace("'\'", "/")
-                        
-                        try:
-                            self.copy_media_file(local_file_path, self.config.upload_casque_path + media_file, solution.nom, "push")
-                        except Exception as e:
-                            print(f"{self.name} {self.numero}: Erreur lors du téléversement du fichier {local_file_path} pour {solution.nom} : {e}")
-                            return
-
-            solution.sol_install_on_casque = True
-            print(f"{self.name} {self.numero}: Solution {solution.nom} copiée avec succès dans le casque.")
-        else:
-            self._log_message(f"{self.name} {self.numero}: Solution directory does not exist for '{solution.nom}' in the library")
+        Args:
+            solution (Solution): La solution à transférer.
+            solution_dir (str): Le dossier de la solution dans la bibliothèque.
+
+        Returns:
+            list: Liste de tuples (chemin local, chemin sur le casque) pour les fichiers présents dans la bibliothèque.
+        """
+        files = []
+        subdirs = ["image", "image360", "sound", "srt", "video"]
+        for subdir in subdirs:
+            source_dir = os.path.join(solution_dir, subdir)
+            for media_file in getattr(solution, subdir, []):
+                local_file_path = os.path.join(source_dir, os.path.basename(media_file))
+                if os.path.isfile(local_file_path):
+                    files.append((local_file_path, self.config.upload_casque_path + media_file))
+                else:
+                    print(f"{self.name} {self.numero}: Fichier absent de la bibliothèque : {local_file_path}")
+        return files
+
+    def _push_solution_files(self, solution, solution_biblio, progress_callback=None):
+        """
+        Transfère les fichiers média d'une solution vers le casque, plusieurs fichiers à la fois
+        (config.push_depth) sur des connexions sync persistantes.
+
+        Seuls les fichiers absents du casque ou différents de la bibliothèque sont envoyés.
+
+        Args:
+            solution (Solution): La solution à transférer.
+            solution_biblio (SolutionBiblio): La copie de la solution dans la bibliothèque, dans la bonne version.
+            progress_callback (callable, optional): Appelé avec (octets transférés, total).
+
+        Returns:
+            bool: True si tous les fichiers ont été transférés.
+        """
+        solution_dir = os.path.join(self.config.Bibliothèque_de_solution_path, solution_biblio.dossier)
+
+        if not os.path.exists(solution_dir):
+            print(f"{self.name} {self.numero}: Solution directory does not exist for '{solution.nom}' in the library")
+            return False
+
+        local_files = self.get_local_media_files(solution, solution_dir)
+        files = manifest.files_to_push(local_files, self.get_media_listing(force=True), self.config.adb_exe_path,
+                                       self.numero, self.config.delta_sync_verify_hash)
+        print(f"{self.name} {self.numero}: {solution.nom} : {len(files)} fichier(s) à transférer, {len(local_files) - len(files)} déjà à jour sur le casque.")
+        progress = ByteProgress(sum(os.path.getsize(local_path) for local_path, _ in files), progress_callback)
+        failures = TransferEngine(self.device, self.config.push_depth, transferJournal.get_journal(self.config.transfer_journal_path)).push_files(files, progress)
+        self.media_listing = None
+        self.scheduler.invalidate(["json"])
+
+        for local_file_path, e in failures:
+            print(f"{self.name} {self.numero}: Erreur lors du téléversement du fichier {local_file_path} pour {solution.nom} : {e}")
+        if failures:
+            return False
+
+        solution.sol_install_on_casque = True
+        print(f"{self.name} {self.numero}: Solution {solution.nom} copiée avec succès dans le casque ({progress.throughput() / 1e6:.1f} Mo/s).")
+        return True
 
     def pull_solutions(self):
         """
@@ -394,7 +638,6 @@ class Casque:
                 # Si la solution n'est pas encore dans la bibliothèque, la "pull"
                 if not self.is_solution_in_library(solution):
                     self.pull_solution_sans_progress(solution)
-                    self.biblio.refresh_biblio()
                     solutions_to_pull += 1
 
         # Si aucune solution n'a été "pullée", afficher un message
@@ -408,91 +651,219 @@ class Casque:
 
         Args:
             solution (Solution): L'objet Solution à transférer.
+
+        Returns:
+            bool: True si la solution a été ajoutée à la bibliothèque.
+        """
+        return self.pull_solution(solution)
+
+    def pull_solution(self, solution, progress_callback=None, helpers=()):
+        """
+        Transfère les fichiers média d'une solution spécifique du casque vers le PC avec suivi de la progression.
+
+        Les tailles des médias sont relevées en un seul listage du casque, puis les fichiers sont reçus en
+        parallèle sur des connexions sync persistantes. Ils sont écrits dans un dossier temporaire de la
+        bibliothèque, renommé en dossier de solution une fois tous les fichiers reçus : une solution
+        incomplète n'apparaît jamais dans la bibliothèque.
+
+        Si d'autres casques possèdent la même solution, les fichiers sont répartis entre eux et ce casque
+        (voir split_pull_files) et reçus de tous en même temps.
+
+        Args:
+            solution (Solution): L'objet Solution à transférer.
+            progress_callback (callable, optional): Appelé en plus avec (octets transférés, total).
+            helpers (list, optional): Les autres casques sur lesquels la solution est installée.
+
+        Returns:
+            bool: True si la solution a été ajoutée à la bibliothèque.
         """
+        library_path = self.config.Bibliothèque_de_solution_path
+        solution_dossier = self.biblio.dossier_solution(solution)
+        solution_dir = os.path.join(library_path, solution_dossier)
+        if os.path.exists(solution_dir):
+            print(f"{self.name} {self.numero}: Le dossier {solution_dir} existe déjà, pull ignoré.")
+            return False
+
+        # Dossier caché : ni la surveillance ni le parcours de la bibliothèque ne le voient
+        staging_dir = os.path.join(library_path, ".staging", f"{solution_dossier}_{self.numero}")
         try:
-            safe_solution_name = self.config.safe_string(solution.nom)
-            solution_dir = os.path.join(self.config.Bibliothèque_de_solution_path, safe_solution_name)
-            print(f"{self.name} {self.numero}: Creating directory for solution: {solution_dir}")
-
-            if not os.path.exists(solution_dir):
-                os.makedirs(solution_dir)
-                print(f"Directory created: {solution_dir}")
-
-                subdirs = ["image", "image360", "sound", "srt", "video"]
-                for subdir in subdirs:
-                    target_dir = os.path.join(solution_dir, subdir)
-                    os.makedirs(target_dir, exist_ok=True)
-                    print(f"Subdirectory created: {target_dir}")
-
-                    media_files = getattr(solution, subdir, [])
-                    #print(f"Media files in {subdir}: {media_files}")
-
-                    for media_file in media_files:
-                        try:
-                            print(f"Copying media file: {media_file} to {target_dir}")
-                            self.copy_media_file(self.config.upload_casque_path + media_file, target_dir, solution.nom, "pull")
-                        except Exception as e:
-                            print(f"Erreur lors de la copie du fichier {self.config.upload_casque_path + media_file} pour {solution.nom} : {e}")
-                            continue  # Passer au fichier suivant en cas d'erreur
-                print(f"Solution {solution.nom} reconstruite avec succès dans {solution_dir}.")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            for subdir in BiblioIndex.SUBDIRS:
+                os.makedirs(os.path.join(staging_dir, subdir), exist_ok=True)
+
+            listing = self.get_media_listing(force=True)
+            digests = self.get_remote_digests(solution)
+            files = []
+            for subdir, media_file in solution.get_media_files():
+                remote_path = self.config.upload_casque_path + media_file
+                local_path = os.path.join(staging_dir, subdir, os.path.basename(media_file))
+                if self.biblio.blobs.materialize(digests.get(remote_path), local_path):
+                    continue
+                entry = listing.get(remote_path)
+                if entry is None:
+                    print(f"{self.name} {self.numero}: {media_file} absent du casque, pull de {solution.nom} annulé.")
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                    return False
+                files.append((remote_path, local_path, entry[0], entry[1]))
+
+            def on_progress(copied_size, total_size):
+                self.download_progress = copied_size / total_size * 100 if total_size else 100
+                if progress_callback:
+                    progress_callback(copied_size, total_size)
+
+            progress = ByteProgress(sum(size for _, _, size, _ in files), on_progress)
+            if not files:
+                # Tous les médias viennent du magasin de la bibliothèque
+                on_progress(0, 0)
+            groups = self.split_pull_files(files, helpers)
+            if len(groups) > 1:
+                print(f"{self.name} {self.numero}: Pull de {solution.nom} réparti sur {len(groups)} casques.")
+                with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+                    results = executor.map(lambda item: item[0].pull_files_from_casque(item[1], progress), groups.items())
+                    failures = [failure for result in results for failure in result]
             else:
-                print(f"Directory already exists, skipping: {solution_dir}")
+                failures = self.pull_files_from_casque(files, progress)
+            if failures:
+                for remote_path, error in failures:
+                    print(f"{self.name} {self.numero}: Erreur lors de la copie du fichier {remote_path} pour {solution.nom} : {error}")
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                return False
+
+            self.biblio.write_meta(staging_dir, solution)
+            os.rename(staging_dir, solution_dir)
         except Exception as e:
-            print(f"Error occurred while pulling solution {solution.nom}: {e}")
+            print(f"{self.name} {self.numero}: Erreur lors du pull de la solution {solution.nom} : {e}")
             traceback.print_exc()
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return False
+
+        self.biblio.refresh_solutions({solution_dossier})
+        print(f"{self.name} {self.numero}: Solution {solution.nom} reconstruite dans {solution_dir} ({progress.throughput() / 1e6:.1f} Mo/s).")
+        return True
 
-    def pull_solution(self, solution):
+    def relay_solution(self, solution, targets, progress_callback=None):
         """
-        Transfère les fichiers média d'une solution spécifique du casque vers le PC avec suivi de la progression.
+        Transfère une solution de ce casque directement vers d'autres casques, sans passer par la bibliothèque.
+
+        Chaque fichier est reçu une seule fois de ce casque et envoyé à tous les casques cibles au fur et à
+        mesure de sa réception ; un casque cible qui a déjà le fichier (même taille) ne le reçoit pas.
 
         Args:
-            solution (Solution): L'objet Solution à transférer.
+            solution (SolutionCasque): La solution, installée sur ce casque.
+            targets (list): Les casques sur lesquels installer la solution.
+            progress_callback (callable, optional): Appelé avec (octets reçus de ce casque, total).
+
+        Returns:
+            list: Les casques cibles sur lesquels la solution a été installée.
         """
-        try:
-            safe_solution_name = self.config.safe_string(solution.nom)
-            solution_dir = os.path.join(self.config.Bibliothèque_de_solution_path, safe_solution_name)
-            print(f"{self.name} {self.numero}: Creating directory for solution: {solution_dir}")
+        listing = self.get_media_listing(force=True)
+        target_listings = {target: target.get_media_listing(force=True) for target in targets}
+        files = []
+        for _, media_file in solution.get_media_files():
+            remote_path = self.config.upload_casque_path + media_file
+            entry = listing.get(remote_path)
+            if entry is None:
+                print(f"{self.name} {self.numero}: {media_file} absent du casque, relais de {solution.nom} annulé.")
+                return []
+            needing = [target.device for target in targets
+                       if target_listings[target].get(remote_path, (None,))[0] != entry[0]]
+            files.append((remote_path, entry[0], entry[1], needing))
+
+        progress = ByteProgress(sum(size for _, size, _, needing in files if needing), progress_callback)
+        failures = TransferEngine(self.device, self.config.pull_depth).relay_files(files, progress)
+        for serial, remote_path, error in failures:
+            print(f"{self.name} {self.numero}: Erreur lors du relais de {remote_path} vers {serial} pour {solution.nom} : {error}")
+
+        failed = {serial for serial, _, _ in failures}
+        served = []
+        for target in targets:
+            target.media_listing = None
+            if target.numero in failed:
+                continue
+            for target_solution in target.solutions_casque:
+                if target_solution.nom == solution.nom and target_solution.version == solution.version:
+                    target_solution.sol_install_on_casque = True
+            served.append(target)
+        print(f"{self.name} {self.numero}: Solution {solution.nom} relayée vers {len(served)}/{len(targets)} casque(s) ({progress.throughput() / 1e6:.1f} Mo/s).")
+        return served
+
+    def split_pull_files(self, files, helpers):
+        """
+        Répartit les fichiers d'un pull entre ce casque et d'autres casques qui possèdent les mêmes fichiers.
 
-            if not os.path.exists(solution_dir):
-                os.makedirs(solution_dir)
-                print(f"Directory created: {solution_dir}")
+        Les fichiers, du plus gros au plus petit, sont confiés au casque qui finirait le plus tôt d'après son
+        débit mesuré lors des pulls précédents (la moyenne des débits connus pour un casque jamais mesuré).
+        Un autre casque ne reçoit que les fichiers qu'il possède avec la même taille.
 
-                subdirs = ["image", "image360", "sound", "srt", "video"]
-                
-                # Utiliser la taille déjà calculée dans solution.size
-                total_size = solution.size
-                copied_size = 0
-
-                def progress_callback(copied_bytes):
-                    nonlocal copied_size
-                    copied_size += copied_bytes
-                    progress = copied_size / total_size * 100
-                    print(f"Progress: {progress:.2f}%")
-                    self.download_progress = progress  # Mise à jour de la progression du téléchargement
-
-                for subdir in subdirs:
-                    target_dir = os.path.join(solution_dir, subdir)
-                    os.makedirs(target_dir, exist_ok=True)
-                    print(f"Subdirectory created: {target_dir}")
-
-                    media_files = getattr(solution, subdir, [])
-                    print(f"Media files in {subdir}: {media_files}")
-
-                    for media_file in media_files:
-                        print(f"Copying media file: {self.config.upload_casque_path + media_file} to {target_dir}")
-                        try:
-                            progress_callback(os.path.getsize(self.config.upload_casque_path + media_file))  # Mise à jour de la taille copiée
-                            self.copy_media_file(self.config.upload_casque_path + media_file, target_dir, solution.nom, "pull")
-                        except Exception as e:
-                            print(f"Erreur lors de la copie du fichier {self.config.upload_casque_path + media_file} pour {solution.nom} : {e}")
-                            continue  # Passer au fichier suivant en cas d'erreur
-
-                print(f"Solution {solution.nom} reconstruite avec succès dans {solution_dir}.")
-            else:
-                print(f"Directory already exists, skipping: {solution_dir}")
+        Args:
+            files (list): Les tuples (chemin sur le casque, chemin local, taille, date de modification).
+            helpers (list): Les autres casques sur lesquels la solution est installée.
+
+        Returns:
+            dict: Les fichiers à recevoir, indexés par casque source ; ce casque seul si helpers est vide.
+        """
+        helpers = [helper for helper in helpers if helper is not self]
+        if not helpers:
+            return {self: files}
+
+        listings = {helper: helper.get_media_listing(force=True) for helper in helpers}
+        known = [casque.pull_throughput for casque in [self] + helpers if casque.pull_throughput]
+        default_speed = sum(known) / len(known) if known else 1.0
+        loads = {casque: 0.0 for casque in [self] + helpers}
+        groups = {casque: [] for casque in [self] + helpers}
+        for file in sorted(files, key=lambda f: f[2], reverse=True):
+            remote_path, _, size, _ = file
+            candidates = [self] + [helper for helper in helpers if listings[helper].get(remote_path, (None,))[0] == size]
+            source = min(candidates, key=lambda casque: (loads[casque] + size) / (casque.pull_throughput or default_speed))
+            loads[source] += size
+            groups[source].append(file)
+        return {casque: group for casque, group in groups.items() if group}
+
+    def pull_files_from_casque(self, files, progress):
+        """
+        Reçoit des fichiers de ce casque et mesure le débit obtenu.
+
+        Args:
+            files (list): Les tuples (chemin sur le casque, chemin local, taille, date de modification).
+            progress (ByteProgress): Le compteur de progression à alimenter.
+
+        Returns:
+            list: Liste de tuples (chemin sur le casque, exception) pour les fichiers en échec.
+        """
+        start_time = time.monotonic()
+        failures = TransferEngine(self.device, self.config.pull_depth).pull_files(files, progress)
+        elapsed = time.monotonic() - start_time
+        if not failures and elapsed > 0:
+            self.pull_throughput = sum(size for _, _, size, _ in files) / elapsed
+        return failures
+
+    def get_remote_digests(self, solution):
+        """
+        Calcule sur le casque l'empreinte md5 des fichiers média d'une solution, pour les retrouver dans le magasin de médias.
+
+        Seuls les fichiers dont la taille est celle d'un média du magasin sont relus ; les autres ne
+        peuvent pas s'y trouver.
+
+        Args:
+            solution (SolutionCasque): La solution.
+
+        Returns:
+            dict: Les empreintes, indexées par chemin sur le casque ; vide en cas d'erreur.
+        """
+        listing = self.get_media_listing()
+        blob_sizes = self.biblio.blobs.sizes()
+        sizes = {}
+        for _, media in solution.get_media_files():
+            entry = listing.get(self.config.upload_casque_path + media)
+            if entry is not None and entry[0] in blob_sizes:
+                sizes[self.config.upload_casque_path + media] = entry[0]
+        if not sizes:
+            return {}
+        try:
+            return manifest.remote_md5(self.config.adb_exe_path, self.numero, list(sizes), sizes)
         except Exception as e:
-            print(f"Error occurred while pulling solution {solution.nom}: {e}")
-            traceback.print_exc()
+            print(f"{self.name} {self.numero}: Empreintes des médias de {solution.nom} indisponibles : {e}")
+            return {}
 
     def calculate_total_files_and_size(self, solution_dir):
         """
@@ -538,26 +909,47 @@ class Casque:
     # APK 
     #-----------------------------------------------------
     
-    def install_APK(self):
+    def install_APK(self, start_app=True, force=False):
         """
         Installe une APK sur le casque, en réessayant plusieurs fois en cas d'échec.
 
+        L'installation est sautée si l'APK installée est identique (voir is_apk_up_to_date), et passe en
+        mode streaming quand le casque le permet.
+
+        Args:
+            start_app (bool): Accorde les permissions et démarre l'application après l'installation.
+            force (bool): Installe même si l'APK installée est identique.
+
+        Returns:
+            bool: True si l'APK a été installée.
+
         Note:
             Cette méthode tente d'installer une APK jusqu'à trois fois en cas d'échec.
         """
         if self.marque.version_apk != "" :
+            if not force and self.is_apk_up_to_date():
+                print(f"{self.name} {self.numero}: L'APK {self.marque.version_apk} est déjà installée à l'identique, installation inutile.")
+                return True
+
+            install_command = [self.config.adb_exe_path, "-s", self.numero, "install"]
+            if self.supports_streaming_install():
+                install_command.append("--streaming")
             max_attempts = 3
             attempt = 0
             
             while attempt < max_attempts:
                 try:
                     adbtools.grant_permissions(self.config.adb_exe_path, self.numero, self.config.package_name)
-                    subprocess.run([self.config.adb_exe_path, "-s", self.numero, "install", self.marque.APK_path], check=True, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW)
+                    subprocess.run(install_command + [self.marque.APK_path], check=True, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW)
                     print(f"{self.name} {self.numero}: Installation de l'APK {self.marque.version_apk} réussie.")
-                    
-                    adbtools.grant_permissions(self.config.adb_exe_path, self.numero, self.config.package_name)
-                    adbtools.wake_up_device(self.config.adb_exe_path, self.numero)
-                    adbtools.start_application(self.config.adb_exe_path, self.numero, self.config.package_name)
+                    # La version est relue au prochain rafraîchissement ; d'ici là l'application est connue comme installée
+                    self.version_apk = self.marque.version_apk
+                    self.scheduler.invalidate(["version_apk", "ppv1", "json"])
+
+                    if start_app:
+                        adbtools.grant_permissions(self.config.adb_exe_path, self.numero, self.config.package_name)
+                        adbtools.wake_up_device(self.config.adb_exe_path, self.numero)
+                        adbtools.start_application(self.config.adb_exe_path, self.numero, self.config.package_name)
                     break  # Sortir de la boucle si l'installation réussit
                 
                 except subprocess.CalledProcessError as e:
@@ -566,15 +958,72 @@ class Casque:
                     if attempt < max_attempts:
                         print(f"{self.name} {self.numero}: Difficulté a l'installation, suppression de l'ancienne application avant d'essayer d'installer de nouveau, essai n° {attempt}")
                         self.uninstall_APK()
-                    else:
-                        return
 
             if attempt < max_attempts:
-                pass
-            else:
-                print(f"{self.name} {self.numero}: Impossible d'installer l'APK")
+                return True
+            print(f"{self.name} {self.numero}: Impossible d'installer l'APK")
         else:
             print(f"{self.name} {self.numero}: Aucune APK disponible -> Veuillez ajouter une version d'apk dans le dossier du même nom pour installer une application")
+        return False
+
+    def get_installed_apk_info(self):
+        """
+        Retourne le versionCode et le chemin sur le casque de l'APK installée, en une seule commande.
+
+        Returns:
+            tuple: (versionCode ou None, chemin de base.apk ou None si l'application n'est pas installée).
+        """
+        package = shlex.quote(self.config.package_name)
+        output = adbtools.run_shell(self.config.adb_exe_path, self.numero,
+                                    f"dumpsys package {package} | grep -m1 versionCode; pm path {package}", check=False)
+        version_match = re.search(r'versionCode=(\d+)', output)
+        paths = re.findall(r'^package:(\S+)', output, re.MULTILINE)
+        apk_path = next((path for path in paths if path.endswith("/base.apk")), paths[0] if paths else None)
+        return (int(version_match.group(1)) if version_match else None), apk_path
+
+    def is_apk_up_to_date(self):
+        """
+        Indique si l'APK installée sur le casque est identique à celle du dossier APK.
+
+        Les versionCode sont comparés d'abord (celui du fichier local est lu une seule fois par fichier) ;
+        s'ils sont égaux, l'empreinte sha256 de l'APK installée est comparée à celle du fichier local,
+        ce qui garantit aussi la même signature.
+
+        Returns:
+            bool: True si l'installation est inutile.
+        """
+        apk_path = self.marque.APK_path
+        if not apk_path or not os.path.isfile(apk_path):
+            return False
+        try:
+            installed_code, installed_path = self.get_installed_apk_info()
+            if installed_path is None:
+                return False
+            local_code = apkInfo.version_code(apk_path)
+            if local_code is not None and installed_code is not None and local_code != installed_code:
+                print(f"{self.name} {self.numero}: versionCode installé {installed_code}, APK locale {local_code}.")
+                return False
+            output = adbtools.run_shell(self.config.adb_exe_path, self.numero, f"sha256sum {shlex.quote(installed_path)}", check=False)
+            return output.split()[:1] == [apkInfo.sha256(apk_path)]
+        except Exception as e:
+            print(f"{self.name} {self.numero}: Impossible de comparer l'APK installée : {e}")
+            return False
+
+    def supports_streaming_install(self):
+        """
+        Indique si le casque accepte l'installation en streaming (`adb install --streaming`, Android 11 et plus).
+
+        Returns:
+            bool: True si le casque annonce la fonctionnalité `abb_exec` ; le résultat est mémorisé.
+        """
+        if self.streaming_install is None:
+            try:
+                result = subprocess.run([self.config.adb_exe_path, "-s", self.numero, "features"], capture_output=True,
+                                        text=True, timeout=10, creationflags=subprocess.CREATE_NO_WINDOW)
+                self.streaming_install = "abb_exec" in result.stdout.split()
+            except (OSError, subprocess.SubprocessError):
+                self.streaming_install = False
+        return self.streaming_install
 
     def uninstall_APK(self):
         """
@@ -584,6 +1033,8 @@ class Casque:
             try:
                 subprocess.run([self.config.adb_exe_path, "-s", self.numero, "uninstall", self.config.package_name], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, creationflags=subprocess.CREATE_NO_WINDOW)
                 print(f"{self.name} {self.numero}: Désinstallation de l'APK réussie.")
+                self.version_apk = "X"
+                self.scheduler.invalidate(["version_apk", "json"])
             except subprocess.CalledProcessError as e:
                 if "Unknown package" in str(e):
                     print(f"{self.name} {self.numero}: L'application n'était pas installée.")
@@ -625,10 +1076,7 @@ class Casque:
             et le SSID du réseau connecté ou une indication d'erreur.
         """
         try:
-            wifi_status_output = subprocess.check_output(
-                [self.config.adb_exe_path, "-s", self.numero, "shell", "dumpsys", "wifi"],
-                stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW
-            ).decode("utf-8")
+            wifi_status_output = adbtools.run_shell(self.config.adb_exe_path, self.numero, "dumpsys wifi")
 
             if "mWifiInfo" in wifi_status_output:
                 wifi_info = next((line for line in wifi_status_output.split('\n') if "mWifiInfo" in line), None)
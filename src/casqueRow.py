@@ -0,0 +1,102 @@
+class CasqueRow:
+    """
+    Modèle d'une ligne du tableau des casques : garde les widgets de chaque cellule et
+    la dernière valeur affichée, pour ne reconfigurer que les cellules qui ont changé.
+    """
+
+    def __init__(self, frame):
+        """
+        Initialise la ligne.
+
+        Args:
+            frame (tk.Frame): Le cadre contenant les widgets de la ligne.
+        """
+        self.frame = frame
+        self.cells = {}
+        self.values = {}
+        self.config_count = 0
+
+    def add_cell(self, name, widget):
+        """
+        Enregistre le widget d'une cellule.
+
+        Args:
+            name (str): Le nom de la cellule.
+            widget: Le widget Tkinter (Label) affichant la cellule.
+        """
+        self.cells[name] = widget
+
+    def set(self, name, **options):
+        """
+        Met à jour une cellule seulement si ses options diffèrent de celles déjà affichées.
+
+        Args:
+            name (str): Le nom de la cellule.
+            **options: Les options Tkinter de la cellule (text, fg, bg...).
+
+        Returns:
+            bool: True si le widget a été reconfiguré.
+        """
+        if self.values.get(name) == options:
+            return False
+        self.cells[name].config(**options)
+        self.values[name] = options
+        self.config_count += 1
+        return True
+
+    def render(self, vue):
+        """
+        Affiche un instantané de casque en ne touchant que les cellules modifiées.
+
+        Args:
+            vue (CasqueView): L'instantané du casque.
+
+        Returns:
+            int: Le nombre de widgets reconfigurés.
+        """
+        changed = 0
+        for name, options in self.cell_values(vue).items():
+            changed += self.set(name, **options)
+        return changed
+
+    def set_background(self, color):
+        """
+        Change la couleur de fond de la ligne et de ses cellules.
+
+        Args:
+            color (str): La couleur de fond.
+        """
+        self.frame.config(bg=color)
+        for name in self.cells:
+            self.set(name, **dict(self.values.get(name, {}), bg=color))
+
+    @staticmethod
+    def cell_values(vue):
+        """
+        Calcule le contenu de chaque cellule pour un instantané de casque.
+
+        Args:
+            vue (CasqueView): L'instantané du casque.
+
+        Returns:
+            dict: Les options Tkinter de chaque cellule.
+        """
+        apk_color = "black" if vue.apk_installed else "orange"
+        json_status = "✓" if vue.json_present else "X"
+        # Définir la couleur de l'indicateur JSON en fonction de l'état de l'APK
+        json_color = "orange" if apk_color == "black" and json_status == "X" else "black"
+        return {
+            "battery": {"text": f"{vue.battery_level}%"},
+            "numero": {"text": vue.numero},
+            "name": {"text": vue.name},
+            "modele": {"text": vue.modele},
+            "apk": {"text": vue.version_apk, "fg": apk_color},
+            "wifi": {"text": f"{vue.wifi_ssid}" if vue.wifi_connected else "Please connect to Wifi",
+                     "fg": "black" if vue.wifi_connected else "orange"},
+            "json": {"text": json_status, "fg": json_color},
+            "code": {"text": vue.code},
+            "entreprise": {"text": vue.entreprise},
+            "solutions": {"text": f"{vue.nb_solutions} solution(s)"},
+            "solutions_installees": {"text": f"{vue.nb_solutions_installees} solution(s)"},
+            "info": {"text": "App PPV1 Installée" if vue.old_apk_installed else ""},
+        }
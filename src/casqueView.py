@@ -0,0 +1,49 @@
+from collections import namedtuple
+
+# Instantané immuable d'un casque, tel qu'affiché dans une ligne du tableau.
+# Il est construit hors du thread Tkinter, à partir des valeurs déjà en cache dans l'objet Casque.
+CasqueView = namedtuple("CasqueView", [
+    "numero",
+    "name",
+    "modele",
+    "battery_level",
+    "version_apk",
+    "apk_installed",
+    "wifi_connected",
+    "wifi_ssid",
+    "json_present",
+    "code",
+    "entreprise",
+    "nb_solutions",
+    "nb_solutions_installees",
+    "download_progress",
+    "old_apk_installed",
+])
+
+def from_casque(casque):
+    """
+    Construit l'instantané d'affichage d'un casque sans aucun appel ADB.
+
+    Args:
+        casque (Casque): Le casque à représenter.
+
+    Returns:
+        CasqueView: L'instantané du casque.
+    """
+    return CasqueView(
+        numero=casque.numero,
+        name=casque.name,
+        modele=casque.modele,
+        battery_level=casque.battery_level,
+        version_apk=casque.version_apk,
+        apk_installed=casque.version_apk != "X",
+        wifi_connected=casque.wifi_connected,
+        wifi_ssid=casque.wifi_ssid,
+        json_present=casque.JSON_path != "Fichier JSON inexistant",
+        code=casque.code,
+        entreprise=casque.getEntreprise(),
+        nb_solutions=len(casque.solutions_casque),
+        nb_solutions_installees=len(casque.getListSolInstall()),
+        download_progress=casque.download_progress,
+        old_apk_installed=casque.old_apk_installed,
+    )
@@ -1,13 +1,25 @@
 from casque import Casque
+import os
+import socket
 import subprocess
+import threading
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from ppadb.client import Client as AdbClient
+from ppadb.device import Device
 import adbtools
+import adbShell
+from biblioManager import BiblioManager
 from config import Config
+from installJob import InstallJob
+from pushScheduler import PushJob, PushScheduler
 from singletonMeta import SingletonMeta
 
 class CasquesManager(metaclass=SingletonMeta):
 
+    # Résultat d'un rafraîchissement non effectué, le précédent n'étant pas terminé
+    REFRESH_SKIPPED = "rafraîchissement ignoré"
+
     def __init__(self):
         """
         Initialise le gestionnaire de casques, configure ADB et récupère la liste initiale des casques connectés.
@@ -16,6 +28,17 @@ class CasquesManager(metaclass=SingletonMeta):
         self.config = Config()
         adbtools.check_adb_connection(self.config.platform_tools_path)
         self.liste_casques = []
+        self.casques_en_attente = {}
+        # Numéros de série des casques branchés, tenus à jour par le suivi des appareils et par chaque passage complet
+        self.connected = set()
+        self.liste_lock = threading.Lock()
+        self.refresh_executor = ThreadPoolExecutor(max_workers=self.config.refresh_max_workers, thread_name_prefix="refresh_casque")
+        self.push_scheduler = PushScheduler(self.config.push_max_concurrent, self.config.push_per_hub_limit)
+        self.pull_executor = ThreadPoolExecutor(max_workers=self.config.pull_max_concurrent, thread_name_prefix="pull_solution")
+        self.pulls_en_cours = {}
+        self.relais_en_cours = {}
+        self.install_executor = ThreadPoolExecutor(max_workers=self.config.install_max_workers, thread_name_prefix="install_job")
+        self.pulls_lock = threading.Lock()
         self.client = AdbClient(host="127.0.0.1", port=5037)
         self.refresh_casques()
 
@@ -40,6 +63,13 @@ class CasquesManager(metaclass=SingletonMeta):
     def refresh_casques(self):
         """
         Met à jour la liste des casques connectés en vérifiant les appareils connectés via ADB.
+
+        Les casques sont rafraîchis en parallèle (au plus config.refresh_max_workers à la fois) :
+        un passage coûte environ le temps du casque le plus lent, et un casque qui dépasse
+        config.refresh_timeout garde son état précédent sans bloquer les autres.
+
+        Le résultat est fusionné avec la liste courante plutôt que de la remplacer : un casque
+        débranché ou ajouté par le suivi des appareils pendant le passage n'est ni ressuscité ni perdu.
         """
         try:
             devices = self.client.devices()
@@ -48,36 +78,551 @@ class CasquesManager(metaclass=SingletonMeta):
             traceback.print_exc()
             return
 
-        current_casques = {casque.numero: casque for casque in self.liste_casques}
-        new_casques = []
+        with self.liste_lock:
+            self.connected = {device.serial for device in devices}
+            current_casques = {casque.numero: casque for casque in self.liste_casques}
+            casques_affiches = set(current_casques)
+            current_casques.update(self.casques_en_attente)
 
+        futures = []
         for device in devices:
-            try:
-                numero = device.get_serial_no().strip()
+            casque = current_casques.get(device.serial)
+            if casque is None:
+                casque = Casque()
+            futures.append((device, casque, self.refresh_executor.submit(self._refresh_casque, casque, device)))
+
+        wait([future for _, _, future in futures], timeout=self.config.refresh_timeout)
 
-                if numero in current_casques:
-                    existing_casque = current_casques[numero]
-                    existing_casque.refresh_casque(device, self.apk_folder)
-                    new_casques.append(existing_casque)
+        new_casques = {}
+        casques_en_attente = {}
+        failed = set()
+        for device, casque, future in futures:
+            if not future.done():
+                print(f"{casque.name} {device.serial}: Le casque ne répond pas, rafraîchissement ignoré pour ce passage.")
+                if device.serial in casques_affiches:
+                    new_casques[device.serial] = casque
                 else:
-                    nouveau_casque = Casque()
-                    nouveau_casque.refresh_casque(device, self.apk_folder)
-                    new_casques.append(nouveau_casque)
+                    # Casque jamais rafraîchi : on le garde de côté jusqu'à la fin de son rafraîchissement
+                    casques_en_attente[device.serial] = casque
+                continue
+
+            try:
+                if future.result() == self.REFRESH_SKIPPED and device.serial not in casques_affiches:
+                    # Le premier rafraîchissement du casque est encore en cours ailleurs
+                    casques_en_attente[device.serial] = casque
+                else:
+                    new_casques[device.serial] = casque
             except RuntimeError as e:
+                failed.add(device.serial)
                 # Gestion spécifique pour les erreurs de connexion ou d'autorisation
                 if "device unauthorized" in str(e) or "device offline" in str(e):
-                    message = f"Erreur: le casque avec numéro de série {device.serial} est non autorisé ou hors ligne. Veuillez le rebrancher et vérifier les autorisations."
-                    self.ui.handle_exception(message, e)  # Utilisation de la méthode handle_exception
+                    print(f"Erreur: le casque avec numéro de série {device.serial} est non autorisé ou hors ligne. Veuillez le rebrancher et vérifier les autorisations : {e}")
                 else:
-                    message = f"Erreur lors de l'ajout du casque {device.serial}"
-                    self.ui.handle_exception(message, e)
+                    print(f"Erreur lors de l'ajout du casque {device.serial} : {e}")
+                    traceback.print_exc()
+            except Exception as e:
+                failed.add(device.serial)
+                print(f"Erreur inconnue lors de l'ajout du casque {device.serial} : {e}")
+                traceback.print_exc()
+
+        with self.liste_lock:
+            merged = [casque for casque in self.liste_casques
+                      if casque.numero in self.connected and casque.numero not in failed]
+            merged += [casque for serial, casque in new_casques.items()
+                       if serial in self.connected and casque not in merged]
+            shown = {casque.numero for casque in merged}
+            casques_en_attente.update((serial, casque) for serial, casque in self.casques_en_attente.items()
+                                      if serial not in casques_en_attente)
+            self.liste_casques = merged
+            self.casques_en_attente = {serial: casque for serial, casque in casques_en_attente.items()
+                                       if serial in self.connected and serial not in shown and serial not in failed}
+
+        # Fermer les sessions shell des casques débranchés
+        connected = {device.serial for device in devices}
+        for serial in current_casques.keys() - connected:
+            adbShell.close_shell(serial)
+            self.push_scheduler.forget_casque(serial)
+
+    def _refresh_casque(self, casque, device):
+        """
+        Rafraîchit un casque depuis un thread du pool de rafraîchissement.
+
+        Si le rafraîchissement précédent du casque n'est pas terminé, le casque est laissé tel quel.
+
+        Args:
+            casque (Casque): Le casque à rafraîchir.
+            device (ppadb.device.Device): L'appareil ADB correspondant.
+
+        Returns:
+            True si le casque a été rafraîchi, REFRESH_SKIPPED si le rafraîchissement a été ignoré.
+        """
+        if casque.refresh_lock.locked():
+            return self.REFRESH_SKIPPED
+        casque.refresh_casque(device, self.apk_folder)
+        return True
+
+    def refresh_device(self, serial):
+        """
+        Rafraîchit un seul casque, identifié par son numéro de série, et l'ajoute à la liste s'il est nouveau.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+
+        Returns:
+            bool: True si le casque a été rafraîchi, False sinon.
+        """
+        with self.liste_lock:
+            casque = next((c for c in self.liste_casques if c.numero == serial), None)
+            if casque is None:
+                casque = self.casques_en_attente.setdefault(serial, Casque())
+
+        try:
+            refreshed = self._refresh_casque(casque, Device(self.client, serial))
+        except RuntimeError as e:
+            print(f"Erreur: le casque avec numéro de série {serial} est non autorisé ou hors ligne. Veuillez le rebrancher et vérifier les autorisations : {e}")
+            return False
+        except Exception as e:
+            print(f"Erreur lors du rafraîchissement du casque {serial} : {e}")
+            return False
+        if refreshed == self.REFRESH_SKIPPED:
+            # Un autre rafraîchissement du casque est en cours : il reste en attente jusqu'à la fin de celui-ci
+            return False
+
+        with self.liste_lock:
+            self.casques_en_attente.pop(serial, None)
+            if serial not in self.connected:
+                # Le casque a été débranché pendant son rafraîchissement
+                return False
+            if casque not in self.liste_casques:
+                self.liste_casques = self.liste_casques + [casque]
+        return True
+
+    def remove_device(self, serial):
+        """
+        Retire un casque de la liste des casques gérés.
+
+        Args:
+            serial (str): Le numéro de série du casque débranché.
+        """
+        with self.liste_lock:
+            self.connected.discard(serial)
+            self.casques_en_attente.pop(serial, None)
+            self.liste_casques = [casque for casque in self.liste_casques if casque.numero != serial]
+        adbShell.close_shell(serial)
+        self.push_scheduler.forget_casque(serial)
+
+    @staticmethod
+    def parse_device_states(payload):
+        """
+        Analyse une liste d'appareils envoyée par le serveur ADB.
+
+        Args:
+            payload (str): Le contenu d'un message host:track-devices ("serial\tétat" par ligne).
+
+        Returns:
+            dict: Les états des appareils, indexés par numéro de série.
+        """
+        states = {}
+        for line in payload.split('\n'):
+            tokens = line.split()
+            if len(tokens) >= 2:
+                states[tokens[0]] = tokens[1]
+        return states
+
+    def track_devices(self, stop_event, on_change=None):
+        """
+        Suit les branchements et débranchements des casques via le flux host:track-devices du serveur ADB.
+
+        Seuls les casques concernés par un événement sont rafraîchis ou retirés. La connexion
+        est rétablie automatiquement si le serveur ADB redémarre.
+
+        Args:
+            stop_event (threading.Event): Un événement pour arrêter le suivi des appareils.
+            on_change (callable, optional): Appelé après chaque modification de la liste des casques.
+        """
+        known_states = {}
+        while not stop_event.is_set():
+            conn = None
+            try:
+                conn = self.client.create_connection()
+                conn.send("host:track-devices")
+                conn.socket.settimeout(1.0)
+                buffer = b""
+                while not stop_event.is_set():
+                    try:
+                        data = conn.socket.recv(4096)
+                    except socket.timeout:
+                        continue
+                    if not data:
+                        raise ConnectionError("Le serveur ADB a fermé le flux de suivi des appareils")
+                    buffer += data
+
+                    # Chaque message est préfixé par sa longueur sur 4 caractères hexadécimaux
+                    while len(buffer) >= 4:
+                        length = int(buffer[:4], 16)
+                        if len(buffer) < 4 + length:
+                            break
+                        payload = buffer[4:4 + length].decode('utf-8')
+                        buffer = buffer[4 + length:]
+                        self._handle_device_states(known_states, self.parse_device_states(payload), on_change)
             except Exception as e:
-                message = f"Erreur inconnue lors de l'ajout du casque {device.serial}"
-                self.ui.handle_exception(message, e)
+                if stop_event.is_set():
+                    break
+                print(f"Suivi des casques interrompu, nouvelle tentative : {e}")
+                known_states = {}
+                adbtools.check_adb_connection(self.config.platform_tools_path)
+                stop_event.wait(2)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _handle_device_states(self, known_states, states, on_change):
+        """
+        Compare le nouvel état des appareils au précédent et déclenche les rafraîchissements ou suppressions nécessaires.
+
+        Args:
+            known_states (dict): Les derniers états connus, mis à jour sur place.
+            states (dict): Les états reçus du serveur ADB.
+            on_change (callable): Appelé après chaque modification de la liste des casques.
+        """
+        for serial in set(known_states) - set(states):
+            print(f"Casque {serial} débranché.")
+            known_states.pop(serial)
+            self.remove_device(serial)
+            if on_change:
+                on_change()
+
+        for serial, state in states.items():
+            old_state = known_states.get(serial)
+            if old_state == state:
+                continue
+            known_states[serial] = state
+
+            if state == "device":
+                with self.liste_lock:
+                    self.connected.add(serial)
+                if old_state is None and any(casque.numero == serial for casque in self.liste_casques):
+                    continue
+                self.refresh_executor.submit(self._refresh_device_and_notify, serial, on_change)
+            else:
+                print(f"Erreur: le casque avec numéro de série {serial} est {state}. Veuillez le rebrancher et vérifier les autorisations.")
+                self.remove_device(serial)
+                if on_change:
+                    on_change()
+
+    def _refresh_device_and_notify(self, serial, on_change):
+        """
+        Rafraîchit un casque suite à un événement de branchement et prévient l'interface.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+            on_change (callable): Appelé si la liste des casques a été modifiée.
+        """
+        if self.refresh_device(serial) and on_change:
+            on_change()
+
+    def get_vues(self):
+        """
+        Retourne les instantanés d'affichage de tous les casques gérés, sans aucun appel ADB.
+
+        Returns:
+            list: Liste des CasqueView, dans l'ordre de liste_casques.
+        """
+        return [casque.get_vue() for casque in self.liste_casques]
+
+    def get_casque(self, numero):
+        """
+        Retourne le casque correspondant à un numéro de série.
+
+        Args:
+            numero (str): Le numéro de série du casque.
+
+        Returns:
+            Casque: Le casque correspondant, ou None s'il n'est plus branché.
+        """
+        return next((casque for casque in self.liste_casques if casque.numero == numero), None)
+
+    def get_stale_fields(self):
+        """
+        Indique, pour chaque casque, les informations qui seront redemandées au prochain rafraîchissement.
+
+        Returns:
+            dict: Les listes de champs périmés, indexées par numéro de série.
+        """
+        return {casque.numero: casque.stale_fields() for casque in self.liste_casques}
 
-        self.liste_casques = new_casques
+    def schedule_install_apk(self, casque, start_app=True, force=False):
+        """
+        Place l'installation de l'APK d'un casque dans la file des transferts, avant les solutions.
+
+        Args:
+            casque (Casque): Le casque sur lequel installer l'APK.
+            start_app (bool): Accorde les permissions et démarre l'application après l'installation.
+            force (bool): Installe même si l'APK installée est identique.
+
+        Returns:
+            concurrent.futures.Future: True une fois l'APK installée, False en cas d'échec.
+        """
+        apk_path = casque.marque.APK_path
+        size = os.path.getsize(apk_path) if apk_path and os.path.isfile(apk_path) else 0
+        return self.push_scheduler.submit(casque, PushJob.APK, f"APK {casque.marque.version_apk}", size,
+                                          lambda progress: casque.install_APK(start_app, force))
+
+    def schedule_push_solutions(self, casque, plan=None):
+        """
+        Place le téléversement des solutions d'un casque dans la file des transferts.
+
+        Args:
+            casque (Casque): Le casque sur lequel téléverser les solutions.
+            plan (list, optional): Les tuples (SolutionCasque, SolutionBiblio) à téléverser, déjà établis par
+                casque.plan_push_solutions ; établis ici par défaut.
+
+        Returns:
+            list: Les Future des téléversements, un par solution.
+        """
+        if plan is None:
+            plan = casque.plan_push_solutions() or []
+        futures = []
+        for solution, solution_biblio in plan:
+            futures.append(self.push_scheduler.submit(
+                casque, PushJob.SOLUTION, solution.nom, solution_biblio.size,
+                lambda progress, solution=solution, solution_biblio=solution_biblio:
+                    casque.push_solution_with_progress(solution, solution_biblio, progress)))
+        return futures
+
+    def schedule_install_job(self, casque, selected_version):
+        """
+        Lance l'installation complète d'un casque (APK puis solutions) sur l'exécuteur partagé des installations.
+
+        Args:
+            casque (Casque): Le casque à installer.
+            selected_version (str): La version de l'APK choisie dans l'interface.
+
+        Returns:
+            concurrent.futures.Future: L'InstallJob, une fois toutes ses étapes franchies ou la première en échec.
+        """
+        return self.install_executor.submit(InstallJob(casque, self, selected_version).run)
+
+    @staticmethod
+    def print_install_report(jobs):
+        """
+        Affiche, pour chaque étape d'un déploiement sur plusieurs casques, la durée moyenne et le casque le plus lent.
+
+        Args:
+            jobs (list): Les InstallJob terminés.
+        """
+        print(f"Installation terminée : {sum(job.state == InstallJob.TERMINE for job in jobs)}/{len(jobs)} casque(s) prêt(s).")
+        for stage in InstallJob.STAGES:
+            durations = [(job.timings[stage], job.casque) for job in jobs if stage in job.timings and stage not in job.skipped]
+            if not durations:
+                continue
+            slowest, casque = max(durations, key=lambda item: item[0])
+            average = sum(duration for duration, _ in durations) / len(durations)
+            print(f"  {stage:<12} moyenne {average:6.1f}s, max {slowest:6.1f}s ({casque.name} {casque.numero})")
+
+    def schedule_pull_solutions(self, casque=None):
+        """
+        Planifie la récupération dans la bibliothèque des solutions installées sur les casques mais absentes de la bibliothèque.
+
+        Chaque solution manquante n'est récupérée qu'une fois pour toute la flotte : depuis le casque le plus
+        rapide qui la possède, ses fichiers étant répartis entre tous les casques qui la possèdent.
+
+        Args:
+            casque (Casque, optional): Limite la récupération aux solutions de ce casque ; toute la flotte par défaut.
+
+        Returns:
+            dict: Les Future des récupérations (True si la solution a été ajoutée), indexés par dossier de solution.
+        """
+        biblio = BiblioManager()
+        casques = list(self.liste_casques)
+        wanted = casque.solutions_casque if casque is not None else [sol for c in casques for sol in c.solutions_casque]
+
+        sources = {}
+        for solution in wanted:
+            if not solution.sol_install_on_casque or biblio.is_sol_in_library(solution):
+                continue
+            dossier = biblio.dossier_solution(solution)
+            if dossier in sources:
+                continue
+            sources[dossier] = (solution, self.find_casques_with(casques, solution, installed=True))
+
+        if not sources:
+            print("Aucune solution à récupérer : les solutions des casques sont déjà dans la bibliothèque.")
+        return {dossier: self.schedule_pull_solution(dossier, solution, holders)
+                for dossier, (solution, holders) in sources.items()}
+
+    def schedule_pull_solution(self, dossier, solution, holders):
+        """
+        Planifie la récupération d'une solution, sauf si elle est déjà en cours.
+
+        Args:
+            dossier (str): Le dossier de la solution dans la bibliothèque.
+            solution (SolutionCasque): La solution à récupérer.
+            holders (list): Les casques sur lesquels la solution est installée.
+
+        Returns:
+            concurrent.futures.Future: La récupération, éventuellement déjà en cours ; False d'emblée si aucun
+                casque ne possède la solution.
+        """
+        if not holders:
+            print(f"Récupération de {solution.nom} impossible : aucun casque branché ne possède la solution.")
+            future = Future()
+            future.set_result(False)
+            return future
+
+        with self.pulls_lock:
+            future = self.pulls_en_cours.get(dossier)
+            if future is not None:
+                print(f"Récupération de {solution.nom} déjà en cours.")
+                return future
+
+            # Le casque le plus rapide mesuré est la source principale ; les autres l'épaulent
+            holders = sorted(holders, key=lambda c: c.pull_throughput or 0, reverse=True)
+            source, helpers = holders[0], holders[1:]
+            print(f"Récupération de {solution.nom} depuis {source.name} {source.numero}" +
+                  (f" avec {len(helpers)} autre(s) casque(s)." if helpers else "."))
+            future = self.pull_executor.submit(source.pull_solution, solution, None, helpers)
+            self.pulls_en_cours[dossier] = future
+
+        def forget(_):
+            with self.pulls_lock:
+                self.pulls_en_cours.pop(dossier, None)
+        future.add_done_callback(forget)
+        return future
+
+    def schedule_relay_solutions(self, casque=None):
+        """
+        Planifie le transfert de casque à casque des solutions attendues par des casques mais absentes de la bibliothèque.
 
+        Une solution installée sur un casque est relayée vers les casques qui l'attendent, depuis le
+        casque le plus rapide qui la possède, chaque fichier n'étant lu qu'une fois pour plusieurs cibles.
+
+        Args:
+            casque (Casque, optional): Limite le relais aux solutions attendues par ce casque, et à ce seul
+                casque comme cible ; toute la flotte par défaut.
+
+        Returns:
+            dict: Les Future des relais (liste des casques servis), indexés par dossier de solution.
+        """
+        biblio = BiblioManager()
+        casques = list(self.liste_casques)
+        wanted = casque.solutions_casque if casque is not None else [sol for c in casques for sol in c.solutions_casque]
+
+        relays = {}
+        for solution in wanted:
+            if solution.sol_install_on_casque or biblio.is_sol_in_library(solution):
+                continue
+            dossier = biblio.dossier_solution(solution)
+            if dossier in relays:
+                continue
+            holders = self.find_casques_with(casques, solution, installed=True)
+            if holders:
+                targets = [casque] if casque is not None else self.find_casques_with(casques, solution, installed=False)
+                relays[dossier] = (solution, holders, targets)
+
+        return {dossier: self.schedule_relay_solution(dossier, solution, holders, targets)
+                for dossier, (solution, holders, targets) in relays.items()}
+
+    def schedule_relay_solution(self, dossier, solution, holders, targets):
+        """
+        Place le relais d'une solution vers des casques dans la file des transferts, sauf pour les casques
+        vers lesquels un relais de cette solution est déjà prévu.
+
+        Les cibles sont découpées en groupes qui respectent les limites de l'ordonnanceur (au total et par
+        hub USB) ; un groupe attend que tous ses casques soient libres.
+
+        Args:
+            dossier (str): Le dossier de la solution dans la bibliothèque.
+            solution (SolutionCasque): La solution à relayer.
+            holders (list): Les casques sur lesquels la solution est installée.
+            targets (list): Les casques qui attendent la solution.
+
+        Returns:
+            concurrent.futures.Future: La liste des casques cibles servis, une fois tous les relais terminés.
+        """
+        source = max(holders, key=lambda c: c.pull_throughput or 0)
+        listing = source.get_media_listing()
+        size = sum(listing.get(self.config.upload_casque_path + media, (0,))[0] for _, media in solution.get_media_files())
 
+        futures = []
+        with self.pulls_lock:
+            new_targets = []
+            for target in targets:
+                future = self.relais_en_cours.get((dossier, target.numero))
+                if future is not None:
+                    futures.append(future)
+                else:
+                    new_targets.append(target)
+            if futures:
+                print(f"Relais de {solution.nom} déjà en cours vers {len(futures)} casque(s).")
+
+            if new_targets:
+                print(f"Relais de {solution.nom} depuis {source.name} {source.numero} vers {len(new_targets)} casque(s).")
+            for group in self.push_scheduler.split_targets(new_targets):
+                future = self.push_scheduler.submit(
+                    group[0], PushJob.SOLUTION, f"relais {solution.nom}", size,
+                    lambda progress, group=group: source.relay_solution(solution, group, progress), others=group[1:])
+                keys = [(dossier, target.numero) for target in group]
+                for key in keys:
+                    self.relais_en_cours[key] = future
+
+                def forget(_, keys=keys):
+                    with self.pulls_lock:
+                        for key in keys:
+                            self.relais_en_cours.pop(key, None)
+                future.add_done_callback(forget)
+                futures.append(future)
+
+        return self.gather_served(futures, targets)
+
+    @staticmethod
+    def gather_served(futures, targets):
+        """
+        Réunit les relais vers plusieurs groupes de casques en un seul résultat.
+
+        Args:
+            futures (list): Les Future des relais, chacun donnant la liste des casques servis.
+            targets (list): Les casques cibles attendus.
+
+        Returns:
+            concurrent.futures.Future: Les casques de targets servis par l'un des relais ; un relais en échec n'en sert aucun.
+        """
+        gathered = Future()
+        served = []
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def collect(future):
+            with lock:
+                if not future.cancelled() and future.exception() is None:
+                    served.extend(target for target in future.result() if target in targets and target not in served)
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                gathered.set_result(served)
+
+        if not futures:
+            gathered.set_result([])
+        for future in futures:
+            future.add_done_callback(collect)
+        return gathered
+
+    @staticmethod
+    def find_casques_with(casques, solution, installed):
+        """
+        Retourne les casques dont le fichier JSON contient une solution, installée ou non.
+
+        Args:
+            casques (list): Les casques à examiner.
+            solution (SolutionCasque): La solution recherchée (même nom et même version).
+            installed (bool): True pour les casques où elle est installée, False pour ceux qui l'attendent.
+
+        Returns:
+            list: Les casques correspondants.
+        """
+        return [casque for casque in casques if any(
+            sol.nom == solution.nom and sol.version == solution.version and sol.sol_install_on_casque == installed
+            for sol in casque.solutions_casque)]
 
     def is_device_online(self, device):
         """
@@ -3,12 +3,32 @@ import sys
 import platform
 import traceback
 import re
+from functools import lru_cache
 from singletonMeta import SingletonMeta
 
+NON_ALPHANUMERIQUE = re.compile(r'[^a-zA-Z0-9]+')
+
+@lru_cache(maxsize=4096)
+def _safe_string(nom):
+    """
+    Calcule le nom sécurisé d'une chaîne (voir Config.safe_string).
+
+    Args:
+        nom (str): Le nom original à sécuriser.
+
+    Returns:
+        str: Le nom sécurisé.
+    """
+    # Remplace chaque suite de caractères non alphanumériques par un seul underscore,
+    # puis supprime les underscores en début et fin de chaîne
+    return NON_ALPHANUMERIQUE.sub('_', nom).strip('_')
+
 class Config(metaclass=SingletonMeta):
     def __init__(self):
-        """Initialise la configuration en définissant les chemins nécessaires."""
+        """Initialise la configuration en définissant les chemins et les paramètres nécessaires."""
         self.init_paths()
+        self.init_refresh_settings()
+        self.init_transfer_settings()
 
     def init_paths(self):
         """Initialise les chemins en fonction du système d'exploitation et crée les répertoires requis."""
@@ -33,6 +53,11 @@ class Config(metaclass=SingletonMeta):
         self.local_archivage_path = self.config_path("./Archivage")
         self.upload_casque_path = "/sdcard/Android/data/com.VRAI_Studio.Reverto/files/Downloaded"
         self.Bibliothèque_de_solution_path = "./Bibliothèque_de_solution"
+        self.biblio_index_path = "./biblio_index.sqlite"
+        # Contenu décodé des fichiers hardware.json des casques, conservé entre deux lancements
+        self.hardware_cache_path = "./hardware_cache.json"
+        # Intervalle (en secondes) des relevés des dates des dossiers de la bibliothèque
+        self.biblio_poll_interval = 5
         self.APK_path = self.config_path("./APK")
         self.img_path = self.config_path("resources/images")
         self.img_path_menu = self.config_path("resources/images/image.png")
@@ -41,6 +66,62 @@ class Config(metaclass=SingletonMeta):
         self.ensure_directory_exists(self.Bibliothèque_de_solution_path)
         self.ensure_directory_exists(self.APK_path)
 
+    def init_refresh_settings(self):
+        """Initialise les paramètres du rafraîchissement des casques."""
+        # Nombre maximal de casques rafraîchis en parallèle
+        self.refresh_max_workers = 8
+        # Délai maximal (en secondes) accordé à un casque pour se rafraîchir
+        self.refresh_timeout = 10
+        # Intervalle (en secondes) entre deux passages du rafraîchissement, les branchements étant suivis en continu
+        self.refresh_interval = 5
+        # Durée de validité (en secondes) de chaque information d'un casque, None = tant qu'il reste branché
+        self.refresh_ttl = {
+            "manufacturer": None,
+            "model": None,
+            "battery": 120,
+            "version_apk": 300,
+            "ppv1": 600,
+            "screen": 60,
+            "json": 60,
+            "wifi": 60,
+        }
+        # Attente du fichier JSON après la relance de l'application (en secondes) : délai maximal,
+        # intervalles des relevés, durée sans changement exigée, et délai après lequel un fichier
+        # existant que l'application n'a pas réécrit est accepté tel quel
+        self.json_wait_timeout = 60
+        self.json_poll_min = 0.25
+        self.json_poll_max = 3
+        self.json_stable_delay = 1.5
+        self.json_unchanged_grace = 10
+
+    def init_transfer_settings(self):
+        """Initialise les paramètres des transferts de fichiers vers les casques."""
+        # Nombre maximal de fichiers transférés en même temps vers un même casque
+        self.push_depth = 4
+        # Nombre maximal de fichiers transférés en même temps depuis un même casque (pull)
+        self.pull_depth = 4
+        # Nombre maximal de solutions récupérées en même temps depuis les casques
+        self.pull_max_concurrent = 2
+        # Nombre de morceaux (64 Ko) gardés en mémoire par casque cible lors d'un relais de casque à casque
+        self.relay_buffer_chunks = 16
+        # Délai (s) au-delà duquel un casque cible qui ne vide plus sa file est abandonné pendant un relais
+        self.relay_stall_timeout = 30
+        # Nombre maximal d'installations complètes (APK puis solutions) suivies en même temps ; elles attendent surtout
+        self.install_max_workers = 32
+        # Nombre maximal de casques servis en même temps, au total et derrière un même hub USB
+        self.push_max_concurrent = 6
+        self.push_per_hub_limit = 2
+        # Compare les empreintes md5 des fichiers de même taille mais de date différente au lieu de les renvoyer
+        # (un fichier identique prend alors la date de la bibliothèque et n'est plus revérifié)
+        self.delta_sync_verify_hash = True
+        # Les fichiers plus gros que ce seuil (en octets) sont envoyés par morceaux vérifiés, avec reprise
+        self.resumable_threshold = 64 * 1024 * 1024
+        self.resumable_chunk_size = 32 * 1024 * 1024
+        # Nombre de reprises automatiques d'un gros fichier après une coupure
+        self.transfer_retries = 2
+        # Journal local des transferts interrompus : le prochain envoi du même fichier reprend là où il s'était arrêté
+        self.transfer_journal_path = "./transfer_journal.json"
+
     def safe_string(self, nom):
         """
         Crée une version sécurisée d'une chaîne de caractères pour l'utiliser comme nom de dossier.
@@ -50,15 +131,11 @@ class Config(metaclass=SingletonMeta):
 
         Returns:
             str: Le nom sécurisé, adapté pour être utilisé comme nom de dossier.
+
+        Note:
+            Le résultat est mémorisé : le même nom est comparé à la bibliothèque pour chaque casque.
         """
-        # Remplace les caractères non alphanumériques par des underscores
-        safe_solution_name = re.sub(r'[^a-zA-Z0-9]', '_', nom)
-        # Remplace les multiples underscores par un seul
-        safe_solution_name = re.sub(r'_+', '_', safe_solution_name)
-        # Supprime les underscores en début et fin de chaîne
-        safe_solution_name = safe_solution_name.strip('_')
-
-        return safe_solution_name
+        return _safe_string(nom)
 
     def config_path(self, relative_path):
         """
@@ -0,0 +1,167 @@
+import binascii
+import hashlib
+import json
+import os
+import threading
+
+class HardwareCache:
+    """
+    Cache local du contenu décodé des fichiers hardware.json des casques, conservé sur disque entre deux lancements.
+
+    Pour chaque casque, le cache retient la taille, la date de modification et l'empreinte sha256 du
+    fichier (tel que stocké sur le casque, encodé en base 64) avec son contenu décodé. Tant que la
+    taille et la date n'ont pas changé, le fichier n'est pas relu ; s'il est relu avec la même
+    empreinte, il n'est pas décodé de nouveau.
+    """
+
+    def __init__(self, path):
+        """
+        Initialise le cache et relit les entrées d'une session précédente.
+
+        Args:
+            path (str): Le chemin du fichier cache.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Cache des fichiers hardware.json illisible, il est ignoré : {e}")
+
+    def get(self, serial, size, mtime):
+        """
+        Retourne le contenu du fichier d'un casque, si sa taille et sa date n'ont pas changé.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+            size (int): La taille actuelle du fichier sur le casque.
+            mtime (int): La date de modification actuelle du fichier sur le casque.
+
+        Returns:
+            dict: Le contenu JSON décodé, ou None s'il faut relire le fichier.
+        """
+        with self.lock:
+            entry = self.entries.get(serial)
+        if entry is None or entry.get("size") != size or entry.get("mtime") != mtime:
+            return None
+        return entry.get("data")
+
+    def get_by_digest(self, serial, digest):
+        """
+        Retourne le contenu du fichier d'un casque, si son empreinte n'a pas changé.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+            digest (str): L'empreinte sha256 du fichier relu.
+
+        Returns:
+            dict: Le contenu JSON décodé, ou None s'il faut le décoder.
+        """
+        with self.lock:
+            entry = self.entries.get(serial)
+        if entry is None or entry.get("sha256") != digest:
+            return None
+        return entry.get("data")
+
+    def set(self, serial, size, mtime, digest, data):
+        """
+        Enregistre le contenu du fichier d'un casque.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+            size (int): La taille du fichier sur le casque.
+            mtime (int): La date de modification du fichier sur le casque.
+            digest (str): L'empreinte sha256 du fichier.
+            data (dict): Le contenu JSON décodé.
+        """
+        with self.lock:
+            self.entries[serial] = {"size": size, "mtime": mtime, "sha256": digest, "data": data}
+            self._save()
+
+    def _save(self):
+        """
+        Écrit le cache sur disque de façon atomique, le verrou étant tenu.
+        """
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Impossible d'enregistrer le cache des fichiers hardware.json : {e}")
+
+
+class Base64Decoder:
+    """
+    Flux en écriture qui décode du base 64 au fil de l'eau et calcule l'empreinte sha256 des données reçues.
+
+    Les données encodées ne sont jamais conservées en entier : seul le contenu décodé est accumulé.
+    """
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.pending = b""
+        self.decoded = bytearray()
+
+    def write(self, data):
+        """
+        Reçoit un morceau de données encodées.
+
+        Args:
+            data (bytes): Le morceau reçu, éventuellement coupé au milieu d'un groupe de quatre caractères.
+        """
+        self.sha256.update(data)
+        self.size += len(data)
+        chunk = self.pending + bytes(data).translate(None, b" \t\r\n")
+        usable = len(chunk) - len(chunk) % 4
+        self.decoded += binascii.a2b_base64(chunk[:usable])
+        self.pending = chunk[usable:]
+
+    def close(self):
+        """
+        Termine le décodage.
+
+        Returns:
+            bytearray: Le contenu décodé (accepté tel quel par json.loads).
+
+        Raises:
+            binascii.Error: Si les données se terminent par un groupe incomplet.
+        """
+        if self.pending:
+            self.decoded += binascii.a2b_base64(self.pending)
+            self.pending = b""
+        return self.decoded
+
+    def hexdigest(self):
+        """
+        Retourne l'empreinte des données reçues, identique à celle du fichier stocké sur le casque.
+
+        Returns:
+            str: L'empreinte sha256 des données encodées reçues.
+        """
+        return self.sha256.hexdigest()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(path):
+    """
+    Retourne le cache enregistré à un chemin donné, en le chargeant si nécessaire.
+
+    Args:
+        path (str): Le chemin du fichier cache.
+
+    Returns:
+        HardwareCache: Le cache partagé par tous les casques.
+    """
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = HardwareCache(path)
+        return cache
@@ -0,0 +1,209 @@
+import threading
+import time
+
+import adbtools
+from biblioManager import BiblioManager
+
+class InstallJob:
+    """
+    Installation complète d'un casque (APK puis solutions), déroulée comme une suite d'étapes.
+
+    Les étapes s'enchaînent dans l'ordre de STAGES ; chacune est chronométrée et chaque changement
+    d'état est affiché, si bien que l'étape la plus lente d'un déploiement sur toute la flotte se
+    repère immédiatement (voir CasquesManager.print_install_report). Une étape qui échoue arrête le
+    travail ; une étape inutile (APK déjà à jour) est marquée comme sautée.
+    """
+
+    STAGES = ["version", "install", "permissions", "start_app", "await_json", "verify", "push", "verify_push"]
+
+    # États du travail, en plus du nom de l'étape en cours
+    EN_ATTENTE = "en attente"
+    TERMINE = "terminé"
+    ECHEC = "échec"
+
+    # Résultat d'une étape inutile
+    SKIPPED = "sautée"
+
+    def __init__(self, casque, manager, selected_version):
+        """
+        Initialise le travail.
+
+        Args:
+            casque (Casque): Le casque à installer.
+            manager (CasquesManager): Le gestionnaire des casques, qui ordonnance les transferts.
+            selected_version (str): La version de l'APK choisie dans l'interface.
+        """
+        self.casque = casque
+        self.manager = manager
+        self.selected_version = selected_version
+        self.state = self.EN_ATTENTE
+        self.timings = {}
+        self.skipped = set()
+        self.error = None
+        self.lock = threading.Lock()
+
+        # Données transmises d'une étape à l'autre
+        self.needs_install = False
+        self.json_baseline = None
+        self.plan = []
+        self.relayed = []
+
+    def run(self):
+        """
+        Déroule les étapes jusqu'à la fin ou jusqu'au premier échec.
+
+        Returns:
+            InstallJob: Le travail lui-même, pour être relu une fois terminé.
+        """
+        for stage in self.STAGES:
+            self._set_state(stage)
+            start = time.monotonic()
+            try:
+                result = getattr(self, f"stage_{stage}")()
+            except Exception as e:
+                result = False
+                self.error = e
+            self.timings[stage] = time.monotonic() - start
+
+            if result == self.SKIPPED:
+                self.skipped.add(stage)
+            elif not result:
+                if self.error is None:
+                    self.error = RuntimeError(f"Étape '{stage}' en échec")
+                self._set_state(self.ECHEC, f"à l'étape '{stage}' : {self.error}")
+                return self
+        self._set_state(self.TERMINE, self.get_timings_message())
+        return self
+
+    def _set_state(self, state, detail=""):
+        """
+        Change l'état du travail et l'affiche.
+
+        Args:
+            state (str): Le nouvel état, ou le nom de l'étape qui commence.
+            detail (str, optional): Une précision ajoutée au message.
+        """
+        with self.lock:
+            self.state = state
+        print(f"{self.casque.name} {self.casque.numero}: Installation -> {state}" + (f" {detail}" if detail else ""))
+
+    def get_timings_message(self):
+        """
+        Retourne la durée de chaque étape déjà franchie.
+
+        Returns:
+            str: Les durées, par exemple "(version 0.1s, install 31.8s, ...)".
+        """
+        parts = [f"{stage} {'sautée' if stage in self.skipped else f'{duration:.1f}s'}"
+                 for stage, duration in self.timings.items()]
+        return f"({', '.join(parts)})"
+
+    def stage_version(self):
+        """
+        Compare l'APK installée à celle du dossier APK (versionCode puis empreinte), ou à défaut à la version choisie.
+        """
+        if self.casque.marque.APK_path:
+            self.needs_install = not self.casque.is_apk_up_to_date()
+        else:
+            self.needs_install = self.casque.version_apk != self.selected_version
+        if self.needs_install:
+            print(f"{self.casque.name} {self.casque.numero}: Installation nécessaire {self.casque.version_apk} -> {self.selected_version}")
+        else:
+            print(f"{self.casque.name} {self.casque.numero}: Aucune installation nécessaire. Version actuelle {self.casque.version_apk}")
+        return True
+
+    def stage_install(self):
+        """
+        Installe l'APK, via la file des transferts, si elle n'est pas à jour.
+        """
+        if not self.needs_install:
+            return self.SKIPPED
+        return self.manager.schedule_install_apk(self.casque, start_app=False, force=True).result()
+
+    def stage_permissions(self):
+        """
+        Accorde les permissions de l'application.
+        """
+        adbtools.grant_permissions(self.casque.config.adb_exe_path, self.casque.numero, self.casque.config.package_name)
+        return True
+
+    def stage_start_app(self):
+        """
+        Relance l'application pour qu'elle réécrive le fichier JSON.
+        """
+        self.json_baseline = self.casque.restart_app_for_json()
+        return True
+
+    def stage_await_json(self):
+        """
+        Attend que le fichier JSON soit écrit et stable, et le charge.
+        """
+        if not self.casque.await_json(self.json_baseline):
+            self.error = FileNotFoundError(f"Fichier JSON introuvable après {self.casque.config.json_wait_timeout} secondes")
+            return False
+        return True
+
+    def stage_verify(self):
+        """
+        Vérifie les solutions du casque et prépare la liste de celles à téléverser.
+        """
+        plan = self.casque.plan_push_solutions()
+        if plan is None:
+            self.error = RuntimeError("Aucune solution associée au casque ou fichier JSON absent")
+            return False
+        self.plan = plan
+        return True
+
+    def stage_push(self):
+        """
+        Téléverse les solutions depuis la bibliothèque, et depuis d'autres casques celles qui n'y sont pas.
+
+        Tous les transferts sont attendus ; l'étape échoue si l'un d'eux échoue ou si un relais n'a pas servi ce casque.
+        """
+        push_futures = self.manager.schedule_push_solutions(self.casque, self.plan)
+        relay_futures = self.manager.schedule_relay_solutions(self.casque)
+        if not push_futures and not relay_futures:
+            return self.SKIPPED
+
+        biblio = BiblioManager()
+        self.relayed = [solution for solution in self.casque.solutions_casque
+                        if biblio.dossier_solution(solution) in relay_futures]
+
+        failed = []
+        for (solution, _), future in zip(self.plan, push_futures):
+            try:
+                if not future.result():
+                    failed.append(solution.nom)
+            except Exception as e:
+                failed.append(f"{solution.nom} ({e})")
+        for solution in self.relayed:
+            try:
+                if self.casque not in relay_futures[biblio.dossier_solution(solution)].result():
+                    failed.append(f"{solution.nom} (relais)")
+            except Exception as e:
+                failed.append(f"{solution.nom} (relais : {e})")
+
+        if failed:
+            self.error = RuntimeError(f"Téléversement en échec : {', '.join(failed)}")
+            return False
+        return True
+
+    def stage_verify_push(self):
+        """
+        Vérifie sur le casque que toutes les solutions téléversées ou relayées sont complètes.
+
+        La taille des fichiers relayés n'est pas connue de la bibliothèque : seule leur présence est vérifiée.
+        """
+        if "push" in self.skipped:
+            return self.SKIPPED
+        listing = self.casque.get_media_listing(force=True)
+        expected = [(solution, solution.get_expected_sizes(solution_biblio)) for solution, solution_biblio in self.plan]
+        expected += [(solution, None) for solution in self.relayed]
+        incomplete = []
+        for solution, expected_sizes in expected:
+            if not solution.verif_sol_install_listing(listing, self.casque.config.upload_casque_path, expected_sizes):
+                incomplete.append(solution.nom)
+        if incomplete:
+            self.error = RuntimeError(f"Solution(s) incomplète(s) sur le casque : {', '.join(incomplete)}")
+            return False
+        return True
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import shlex
+import subprocess
+import threading
+from collections import namedtuple
+
+import adbtools
+
+# Délai minimal (s) et débit minimal supposé (octets/s) d'un calcul d'empreintes sur le casque
+REMOTE_MD5_BASE_TIMEOUT = 30
+REMOTE_MD5_RATE = 20 * 1024 * 1024
+
+# Description d'un fichier dans un manifeste : taille en octets, date de modification (s) et empreinte md5 si connue
+FileEntry = namedtuple("FileEntry", ["size", "mtime", "md5"])
+
+_md5_cache = {}
+_md5_cache_lock = threading.Lock()
+
+def local_md5(path, size, mtime):
+    """
+    Calcule l'empreinte md5 d'un fichier local, mémorisée tant que sa taille et sa date ne changent pas.
+
+    Args:
+        path (str): Le chemin du fichier.
+        size (int): La taille du fichier.
+        mtime (int): La date de modification du fichier.
+
+    Returns:
+        str: L'empreinte md5 en hexadécimal.
+    """
+    key = (path, size, mtime)
+    with _md5_cache_lock:
+        digest = _md5_cache.get(key)
+    if digest is None:
+        md5 = hashlib.md5()
+        with open(path, 'rb') as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                md5.update(chunk)
+        digest = md5.hexdigest()
+        with _md5_cache_lock:
+            _md5_cache[key] = digest
+    return digest
+
+def local_manifest(files):
+    """
+    Construit le manifeste des fichiers de la bibliothèque à envoyer sur un casque.
+
+    Args:
+        files (list): Liste de tuples (chemin local, chemin sur le casque).
+
+    Returns:
+        dict: Les FileEntry des fichiers locaux (sans empreinte), indexées par chemin sur le casque.
+    """
+    manifest = {}
+    for local_path, remote_path in files:
+        stat = os.stat(local_path)
+        manifest[remote_path] = FileEntry(stat.st_size, int(stat.st_mtime), None)
+    return manifest
+
+def remote_manifest(listing):
+    """
+    Construit le manifeste d'un casque à partir du listage de son dossier de téléchargement.
+
+    Args:
+        listing (dict): Le listage du casque, chemin -> (taille, date de modification).
+
+    Returns:
+        dict: Les FileEntry des fichiers du casque, indexées par chemin.
+    """
+    return {path: FileEntry(size, mtime, None) for path, (size, mtime) in listing.items()}
+
+def remote_md5(adb_exe_path, serial, paths, sizes=None, batch_size=64):
+    """
+    Calcule sur le casque l'empreinte md5 de plusieurs fichiers, par lots de commandes `md5sum`.
+
+    Chaque lot passe par un processus `adb shell` à part, et non par la session persistante du casque :
+    le calcul sur de gros fichiers peut être long et ne doit pas bloquer les autres commandes. Le délai
+    accordé à un lot croît avec la taille des fichiers (REMOTE_MD5_RATE octets par seconde).
+
+    Args:
+        adb_exe_path (str): Le chemin vers l'exécutable ADB.
+        serial (str): Le numéro de série du casque.
+        paths (list): Les chemins des fichiers sur le casque.
+        sizes (dict, optional): La taille de chaque fichier, indexée par chemin, pour dimensionner le délai.
+        batch_size (int): Le nombre maximal de fichiers par commande.
+
+    Returns:
+        dict: Les empreintes md5, indexées par chemin ; les fichiers illisibles ou trop lents sont absents.
+    """
+    sizes = sizes or {}
+    digests = {}
+    for start in range(0, len(paths), batch_size):
+        batch = paths[start:start + batch_size]
+        command = "md5sum " + " ".join(shlex.quote(path) for path in batch) + " 2>/dev/null"
+        timeout = REMOTE_MD5_BASE_TIMEOUT + sum(sizes.get(path, 0) for path in batch) / REMOTE_MD5_RATE
+        try:
+            result = subprocess.run([adb_exe_path, "-s", serial, "shell", command], capture_output=True, text=True,
+                                    timeout=timeout, creationflags=subprocess.CREATE_NO_WINDOW)
+        except subprocess.TimeoutExpired:
+            print(f"{serial}: Calcul des empreintes interrompu après {timeout:.0f}s pour {len(batch)} fichier(s).")
+            continue
+        for line in result.stdout.splitlines():
+            parts = line.split(None, 1)
+            if len(parts) == 2:
+                digests[parts[1].strip()] = parts[0].lower()
+    return digests
+
+def set_remote_mtimes(adb_exe_path, serial, mtimes, batch_size=64):
+    """
+    Donne aux fichiers du casque une date de modification, par lots de commandes `touch`.
+
+    Args:
+        adb_exe_path (str): Le chemin vers l'exécutable ADB.
+        serial (str): Le numéro de série du casque.
+        mtimes (dict): La date de modification (s) à donner à chaque fichier, indexée par chemin.
+        batch_size (int): Le nombre maximal de fichiers par commande.
+    """
+    paths = list(mtimes)
+    for start in range(0, len(paths), batch_size):
+        command = "; ".join(f"touch -m -d @{int(mtimes[path])} {shlex.quote(path)}" for path in paths[start:start + batch_size])
+        try:
+            adbtools.run_shell(adb_exe_path, serial, command, check=False)
+        except subprocess.CalledProcessError as e:
+            print(f"{serial}: Impossible de mettre à jour la date des fichiers vérifiés : {e}")
+            return
+
+def diff_manifests(local, remote):
+    """
+    Compare le manifeste de la bibliothèque à celui du casque.
+
+    Args:
+        local (dict): Le manifeste local, chemin sur le casque -> FileEntry.
+        remote (dict): Le manifeste du casque, chemin -> FileEntry.
+
+    Returns:
+        tuple: Trois listes de chemins sur le casque : les fichiers absents ou de taille différente
+            (à envoyer), ceux de même taille mais de date différente (à vérifier), et ceux identiques.
+    """
+    missing, to_verify, unchanged = [], [], []
+    for path, entry in local.items():
+        other = remote.get(path)
+        if other is None or other.size != entry.size:
+            missing.append(path)
+        elif other.mtime != entry.mtime:
+            to_verify.append(path)
+        else:
+            unchanged.append(path)
+    return missing, to_verify, unchanged
+
+def files_to_push(files, listing, adb_exe_path=None, serial=None, verify_hash=False):
+    """
+    Sélectionne les fichiers à envoyer sur un casque : seuls les fichiers absents ou modifiés sont retenus.
+
+    Un fichier de même taille mais de date différente est renvoyé, sauf si verify_hash est vrai :
+    les empreintes md5 locale et distante sont alors comparées pour éviter un transfert inutile, et
+    un fichier identique reçoit sur le casque la date de la bibliothèque, pour ne plus être vérifié
+    aux envois suivants.
+
+    Args:
+        files (list): Liste de tuples (chemin local, chemin sur le casque).
+        listing (dict): Le listage du casque, chemin -> (taille, date de modification).
+        adb_exe_path (str, optional): Le chemin vers l'exécutable ADB, requis si verify_hash est vrai.
+        serial (str, optional): Le numéro de série du casque, requis si verify_hash est vrai.
+        verify_hash (bool): Compare les empreintes des fichiers dont seule la date diffère.
+
+    Returns:
+        list: Les tuples (chemin local, chemin sur le casque) à envoyer.
+    """
+    local = local_manifest(files)
+    missing, to_verify, _ = diff_manifests(local, remote_manifest(listing))
+    changed = set(missing)
+
+    if to_verify and verify_hash:
+        local_paths = {remote_path: local_path for local_path, remote_path in files}
+        digests = remote_md5(adb_exe_path, serial, to_verify, {path: listing[path][0] for path in to_verify})
+        confirmed = {}
+        for path in to_verify:
+            entry = local[path]
+            if digests.get(path) != local_md5(local_paths[path], entry.size, entry.mtime):
+                changed.add(path)
+            else:
+                confirmed[path] = entry.mtime
+        if confirmed:
+            set_remote_mtimes(adb_exe_path, serial, confirmed)
+    else:
+        changed.update(to_verify)
+
+    return [(local_path, remote_path) for local_path, remote_path in files if remote_path in changed]
@@ -0,0 +1,303 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+class PushJob:
+    """
+    Transfert en attente ou en cours vers un casque : installation d'APK ou téléversement de solution.
+
+    Un relais de casque à casque écrit sur plusieurs casques à la fois : il occupe alors une place
+    pour chacun d'eux.
+    """
+
+    # Priorités : les APK passent avant les solutions
+    APK = 0
+    SOLUTION = 1
+
+    def __init__(self, casque, kind, label, size, action, others=()):
+        """
+        Initialise le transfert.
+
+        Args:
+            casque (Casque): Le casque cible.
+            kind (int): La priorité du transfert (PushJob.APK ou PushJob.SOLUTION).
+            label (str): Le nom du transfert, pour les messages.
+            size (int): La taille estimée du transfert en octets.
+            action (callable): La fonction qui réalise le transfert, appelée avec un callback (octets transférés, total).
+            others (list, optional): Les autres casques écrits par le même transfert.
+        """
+        self.casque = casque
+        self.casques = [casque] + list(others)
+        self.kind = kind
+        self.label = label
+        self.size = size
+        self.action = action
+        self.done = 0
+        self.hubs = []
+        self.future = Future()
+
+    def sort_key(self):
+        """
+        Retourne la clé d'ordonnancement : les APK d'abord, puis les plus petites solutions.
+
+        Returns:
+            tuple: (priorité, taille).
+        """
+        return (self.kind, self.size)
+
+
+class PushScheduler:
+    """
+    Ordonnanceur des transferts vers l'ensemble des casques.
+
+    Il limite le nombre de transferts simultanés, au total et par hub USB, sert les casques
+    à tour de rôle et fait passer les APK avant les solutions, les plus petites en premier.
+    Un casque n'a jamais plus d'un transfert en cours : son débit est déjà réparti par le
+    moteur de transfert (config.push_depth). Un relais vers plusieurs casques ne démarre que
+    lorsque tous ses casques sont libres et qu'il tient dans les limites globale et par hub.
+    """
+
+    def __init__(self, max_concurrent, per_hub_limit):
+        """
+        Initialise l'ordonnanceur.
+
+        Args:
+            max_concurrent (int): Le nombre maximal de transferts simultanés, tous casques confondus.
+            per_hub_limit (int): Le nombre maximal de transferts simultanés derrière un même hub USB.
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.per_hub_limit = max(1, per_hub_limit)
+        self.condition = threading.Condition()
+        self.queues = OrderedDict()
+        self.running = {}
+        self.hub_counts = {}
+        self.hubs = {}
+        self.workers = []
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.busy_since = None
+
+    def submit(self, casque, kind, label, size, action, others=()):
+        """
+        Ajoute un transfert à la file d'attente.
+
+        Args:
+            casque (Casque): Le casque cible.
+            kind (int): La priorité du transfert (PushJob.APK ou PushJob.SOLUTION).
+            label (str): Le nom du transfert, pour les messages.
+            size (int): La taille estimée du transfert en octets.
+            action (callable): La fonction qui réalise le transfert, appelée avec un callback (octets transférés, total).
+            others (list, optional): Les autres casques écrits par le même transfert (relais), à découper
+                au préalable avec split_targets.
+
+        Returns:
+            concurrent.futures.Future: Le résultat de l'action une fois le transfert terminé.
+        """
+        job = PushJob(casque, kind, label, size, action, others)
+        # Résolus hors du verrou : la requête passe par le serveur ADB
+        job.hubs = [self.get_hub(target) for target in job.casques]
+
+        with self.condition:
+            if self.busy_since is None:
+                self.busy_since = time.monotonic()
+                self.bytes_total = 0
+                self.bytes_done = 0
+            self.bytes_total += size
+            self.queues.setdefault(casque.numero, []).append(job)
+            while len(self.workers) < self.max_concurrent:
+                worker = threading.Thread(target=self._worker, daemon=True, name=f"push_{len(self.workers)}")
+                self.workers.append(worker)
+                worker.start()
+            self.condition.notify_all()
+        return job.future
+
+    def get_hub(self, casque):
+        """
+        Identifie le hub USB auquel un casque est branché.
+
+        Le chemin USB renvoyé par ADB (ex. "usb:1-2.3") désigne le port du casque ; on retire le
+        dernier numéro de port pour obtenir celui du hub. Sans chemin exploitable (casque en Wi-Fi,
+        chemin opaque sous Windows), tous ces casques sont comptés sur un même hub, par prudence.
+
+        Args:
+            casque (Casque): Le casque.
+
+        Returns:
+            str: L'identifiant du hub.
+        """
+        hub = self.hubs.get(casque.numero)
+        if hub is not None:
+            return hub
+        try:
+            path = casque.device.get_device_path() or ""
+        except Exception:
+            path = ""
+        port = path.split(":", 1)[-1]
+        if "." in port:
+            hub = path.rsplit(".", 1)[0]
+        elif "-" in port:
+            hub = path.rsplit("-", 1)[0]
+        else:
+            hub = "host"
+        self.hubs[casque.numero] = hub
+        return hub
+
+    def split_targets(self, casques):
+        """
+        Répartit les casques cibles d'un relais en groupes qui tiennent dans les limites de l'ordonnanceur.
+
+        Args:
+            casques (list): Les casques cibles.
+
+        Returns:
+            list: Les groupes de casques, chacun avec au plus max_concurrent casques et per_hub_limit par hub.
+        """
+        groups = []
+        for casque in casques:
+            hub = self.get_hub(casque)
+            for group, hubs in groups:
+                if len(group) < self.max_concurrent and hubs.count(hub) < self.per_hub_limit:
+                    group.append(casque)
+                    hubs.append(hub)
+                    break
+            else:
+                groups.append(([casque], [hub]))
+        return [group for group, _ in groups]
+
+    def forget_casque(self, numero):
+        """
+        Oublie le hub mémorisé d'un casque débranché, qui peut être rebranché ailleurs.
+
+        Args:
+            numero (str): Le numéro de série du casque.
+        """
+        self.hubs.pop(numero, None)
+
+    def _next_job(self):
+        """
+        Choisit le prochain transfert à lancer, le verrou étant tenu.
+
+        On retient la meilleure priorité disponible, puis le premier casque éligible dans l'ordre
+        du tourniquet ; le casque servi passe en fin de tourniquet.
+
+        Returns:
+            PushJob: Le transfert à lancer, ou None si aucun n'est éligible.
+        """
+        if len(self.running) >= self.max_concurrent:
+            return None
+
+        best = None
+        for numero, jobs in self.queues.items():
+            if not jobs or numero in self.running:
+                continue
+            job = min(jobs, key=PushJob.sort_key)
+            if not self._can_start(job):
+                continue
+            if best is None or job.kind < best.kind:
+                best = job
+
+        if best is not None:
+            numero = best.casque.numero
+            self.queues[numero].remove(best)
+            if not self.queues[numero]:
+                del self.queues[numero]
+            else:
+                self.queues.move_to_end(numero)
+            for casque, hub in zip(best.casques, best.hubs):
+                self.running[casque.numero] = best
+                self.hub_counts[hub] = self.hub_counts.get(hub, 0) + 1
+        return best
+
+    def _can_start(self, job):
+        """
+        Indique si un transfert tient dans les places libres, le verrou étant tenu.
+
+        Args:
+            job (PushJob): Le transfert.
+
+        Returns:
+            bool: True si aucun de ses casques n'est occupé et que les limites globale et par hub sont respectées.
+        """
+        if len(self.running) + len(job.casques) > self.max_concurrent:
+            return False
+        if any(casque.numero in self.running for casque in job.casques):
+            return False
+        return all(self.hub_counts.get(hub, 0) + job.hubs.count(hub) <= self.per_hub_limit for hub in job.hubs)
+
+    def _worker(self):
+        """
+        Boucle d'un worker : lance les transferts éligibles les uns après les autres.
+        """
+        while True:
+            with self.condition:
+                job = self._next_job()
+                while job is None:
+                    self.condition.wait()
+                    job = self._next_job()
+
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.action(lambda done, total: self._on_progress(job, done)))
+                except Exception as e:
+                    print(f"{job.casque.name} {job.casque.numero}: Échec du transfert {job.label} : {e}")
+                    job.future.set_exception(e)
+
+            with self.condition:
+                # Les octets non comptés (échec, taille estimée) sont considérés comme traités
+                self.bytes_done += job.size - job.done
+                job.done = job.size
+                for casque, hub in zip(job.casques, job.hubs):
+                    del self.running[casque.numero]
+                    self.hub_counts[hub] -= 1
+                if not self.running and not self.queues:
+                    self.busy_since = None
+                self.condition.notify_all()
+            print(f"Transferts : {self.get_stats_message()}")
+
+    def _on_progress(self, job, done):
+        """
+        Comptabilise l'avancée d'un transfert.
+
+        Args:
+            job (PushJob): Le transfert.
+            done (int): Le nombre d'octets transférés depuis le début du transfert.
+        """
+        with self.condition:
+            done = min(done, job.size)
+            self.bytes_done += done - job.done
+            job.done = done
+
+    def get_stats(self):
+        """
+        Retourne l'état global des transferts.
+
+        Returns:
+            dict: Octets transférés et attendus, débit (octets/s), temps restant estimé (s, None si inconnu),
+                nombre de transferts en cours et en attente.
+        """
+        with self.condition:
+            elapsed = time.monotonic() - self.busy_since if self.busy_since is not None else 0
+            throughput = self.bytes_done / elapsed if elapsed > 0 else 0.0
+            remaining = self.bytes_total - self.bytes_done
+            return {
+                "bytes_done": self.bytes_done,
+                "bytes_total": self.bytes_total,
+                "throughput": throughput,
+                "eta": remaining / throughput if throughput > 0 else None,
+                "running": len(self.running),
+                "pending": sum(len(jobs) for jobs in self.queues.values()),
+            }
+
+    def get_stats_message(self):
+        """
+        Résume l'état global des transferts en une ligne.
+
+        Returns:
+            str: Le résumé.
+        """
+        stats = self.get_stats()
+        eta = f"{stats['eta']:.0f} s" if stats["eta"] is not None else "inconnu"
+        return (f"{stats['bytes_done'] / 1e6:.1f}/{stats['bytes_total'] / 1e6:.1f} Mo, "
+                f"{stats['throughput'] / 1e6:.1f} Mo/s, temps restant {eta}, "
+                f"{stats['running']} en cours, {stats['pending']} en attente")
@@ -0,0 +1,84 @@
+import threading
+import time
+
+class RefreshScheduler:
+    """
+    Planifie le rafraîchissement des informations d'un casque : chaque champ a sa propre
+    durée de validité (en secondes), None signifiant qu'il n'expire jamais tant que le
+    casque reste branché.
+    """
+
+    def __init__(self, intervals):
+        """
+        Initialise le planificateur avec les durées de validité de chaque champ.
+
+        Args:
+            intervals (dict): Durée de validité en secondes (ou None) pour chaque champ.
+        """
+        self.intervals = dict(intervals)
+        self.last_refresh = {}
+        # Champs forcés, chacun avec le numéro de l'invalidation qui l'a forcé
+        self.forced = {}
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def stale_fields(self, now=None, with_forced=False):
+        """
+        Retourne les champs à rafraîchir : jamais récupérés, expirés ou forcés.
+
+        Args:
+            now (float, optional): L'instant de référence (time.monotonic()).
+            with_forced (bool): Retourne aussi les invalidations prises en compte, à transmettre à mark_refreshed.
+
+        Returns:
+            list: Les noms des champs périmés ; avec with_forced, le tuple (champs, invalidations prises en compte).
+        """
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            stale = []
+            for field, interval in self.intervals.items():
+                last = self.last_refresh.get(field)
+                if field in self.forced or last is None:
+                    stale.append(field)
+                elif interval is not None and now - last >= interval:
+                    stale.append(field)
+            if with_forced:
+                return stale, dict(self.forced)
+            return stale
+
+    def mark_refreshed(self, fields, now=None, forced=None):
+        """
+        Enregistre que les champs donnés viennent d'être rafraîchis.
+
+        Seules les invalidations prises en compte par ce rafraîchissement sont levées : un champ
+        invalidé pendant la lecture reste forcé pour le passage suivant.
+
+        Args:
+            fields (list): Les noms des champs rafraîchis.
+            now (float, optional): L'instant du rafraîchissement (time.monotonic()).
+            forced (dict, optional): Les invalidations retournées par stale_fields(with_forced=True) avant la
+                lecture ; par défaut, toutes les invalidations des champs sont levées.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            for field in fields:
+                self.last_refresh[field] = now
+                if forced is None or self.forced.get(field) == forced.get(field):
+                    self.forced.pop(field, None)
+
+    def invalidate(self, fields=None):
+        """
+        Force le rafraîchissement des champs donnés au prochain passage, par exemple après une action de l'utilisateur.
+
+        Args:
+            fields (list, optional): Les noms des champs à rafraîchir, tous par défaut.
+        """
+        with self.lock:
+            if fields is None:
+                fields = self.intervals.keys()
+            self.invalidations += 1
+            for field in fields:
+                if field in self.intervals:
+                    self.forced[field] = self.invalidations
@@ -7,10 +7,32 @@ class SolutionBiblio(Solution):
     def __init__(self):
         super().__init__()
         self.config = Config()
+        # Dossier de la solution dans la bibliothèque : son nom sécurisé, suivi de sa version pour les solutions versionnées
+        self.dossier = ""
+        # Taille de chaque fichier média, indexée par "sous-dossier/nom du fichier"
+        self.manifest = {}
         self.size = self.get_sol_size()
 
+    def set_manifest(self, media_files):
+        """
+        Enregistre les fichiers média de la solution.
+
+        Args:
+            media_files (dict): Pour chaque sous-dossier, la liste des tuples (nom du fichier, taille).
+        """
+        self.manifest = {f"{subdir}/{name}": size for subdir, files in media_files.items() for name, size in files}
 
-        
+    def covers(self, solution):
+        """
+        Vérifie que la bibliothèque contient tous les fichiers média d'une solution de casque.
+
+        Args:
+            solution (SolutionCasque): La solution du casque.
+
+        Returns:
+            bool: True si chaque média de la solution a sa copie dans ce dossier.
+        """
+        return all(f"{subdir}/{os.path.basename(media)}" in self.manifest for subdir, media in solution.get_media_files())
 
     def get_sol_size(self):
         """
@@ -24,7 +46,7 @@ class SolutionBiblio(Solution):
         for subdir, media_files in zip(subdirs, media_directories):
             for file in media_files:
                 # Construire le chemin complet du fichier en incluant le sous-dossier
-                file_path = os.path.join(self.config.Bibliothèque_de_solution_path, self.config.safe_string(self.nom), subdir, file)
+                file_path = os.path.join(self.config.Bibliothèque_de_solution_path, self.dossier or self.config.safe_string(self.nom), subdir, file)
                 if os.path.exists(file_path):
                     total_size += os.path.getsize(file_path)
                 else:
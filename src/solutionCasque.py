@@ -1,23 +1,36 @@
 import subprocess
+import shlex
 import time
 import os
 from solution import Solution
 from config import Config
+import adbtools
+
+# État de chaque fichier média d'une solution sur le casque
+FICHIER_PRESENT = "present"
+FICHIER_MANQUANT = "missing"
+FICHIER_TAILLE_DIFFERENTE = "size_mismatch"
 
 class SolutionCasque(Solution):
 
     def __init__(self):
         super().__init__()
         self.sol_install_on_casque = False
+        self.file_status = {}
         self.config = Config()
 
-    def from_json_opti(self, json_data, device_serial, upload_casque_path):
+    def from_json_opti(self, json_data, device_serial, upload_casque_path, listing=None, biblio=None):
         """
         Initialise l'objet Solution à partir des données JSON.
 
         Args:
             json_data (dict): Les données JSON pour initialiser l'objet.
             device_serial (str): Le numéro de série du casque pour les vérifications ADB.
+            upload_casque_path (str): Le chemin de base des fichiers sur l'appareil.
+            listing (dict, optional): Le listage des fichiers du casque (chemin -> (taille, date)), partagé
+                par toutes les solutions du casque. Sans listage, les fichiers sont vérifiés par ADB.
+            biblio (BiblioManager, optional): La bibliothèque, pour comparer la taille des fichiers
+                avec ceux de la solution correspondante.
 
         Returns:
             Solution: L'instance de l'objet Solution initialisée.
@@ -48,7 +61,12 @@ class SolutionCasque(Solution):
                     break
 
         # Calculate total size and check installation status
-        self.size = self.verif_sol_install_opti(device_serial, upload_casque_path)
+        if listing is not None:
+            solution_biblio = biblio.is_sol_in_library(self) if biblio is not None else False
+            expected_sizes = self.get_expected_sizes(solution_biblio) if solution_biblio else {}
+            self.size = self.verif_sol_install_listing(listing, upload_casque_path, expected_sizes)
+        else:
+            self.size = self.verif_sol_install_opti(device_serial, upload_casque_path)
         self.sol_install_on_casque = self.size != 0
 
         return self
@@ -111,9 +129,8 @@ class SolutionCasque(Solution):
         for dir in directories:
             if dir:
                 first_file = upload_casque_path + dir[0]
-                check_file_command = [self.config.adb_exe_path, "-s", device_serial, "shell", "ls", first_file]
                 try:
-                    output = subprocess.check_output(check_file_command, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode("utf-8")
+                    output = adbtools.run_shell(self.config.adb_exe_path, device_serial, f"ls {shlex.quote(first_file)}")
                     if first_file not in output:
                         print("fichier non trouvé")
                         return False
@@ -132,10 +149,8 @@ class SolutionCasque(Solution):
         Returns:
             tuple: (bool, int) True si le fichier est présent, False sinon et la taille du fichier.
         """
-        check_file_command = [self.config.adb_exe_path, "-s", device_serial, "shell", "ls", "-l", file_path]
-
         try:
-            output = subprocess.check_output(check_file_command, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode("utf-8")
+            output = adbtools.run_shell(self.config.adb_exe_path, device_serial, f"ls -l {shlex.quote(file_path)}")
             if file_path not in output:
                 print(f"Fichier non trouvé : {file_path}")
                 return False
@@ -216,8 +231,8 @@ class SolutionCasque(Solution):
 
             try:
                 # Use adb to list details of all files in the current batch
-                command = [self.config.adb_exe_path, "-s", device_serial, "shell", "ls", "-l"] + batch_files
-                output = subprocess.check_output(command, stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW).decode("utf-8")
+                command = "ls -l " + " ".join(shlex.quote(file_path) for file_path in batch_files)
+                output = adbtools.run_shell(self.config.adb_exe_path, device_serial, command)
 
                 # Parse output to extract file sizes
                 for line in output.splitlines():
@@ -235,3 +250,69 @@ class SolutionCasque(Solution):
                 return 0  # Return 0 if any batch fails
 
         return total_size
+
+    def get_media_files(self):
+        """
+        Retourne les fichiers média de la solution avec leur sous-dossier dans la bibliothèque.
+
+        Returns:
+            list: Liste de tuples (sous-dossier, chemin du média dans le dossier upload du casque).
+        """
+        directories = {
+            "image": self.image,
+            "image360": self.image360,
+            "sound": self.sound,
+            "srt": self.srt,
+            "video": self.video
+        }
+        return [(subdir, media) for subdir, files in directories.items() for media in files]
+
+    def get_expected_sizes(self, solution_biblio):
+        """
+        Retourne la taille attendue de chaque fichier média, d'après la copie de la solution dans la bibliothèque.
+
+        Args:
+            solution_biblio (SolutionBiblio): La solution correspondante dans la bibliothèque.
+
+        Returns:
+            dict: Les tailles en octets, indexées par chemin du média ; les fichiers absents de la bibliothèque sont ignorés.
+        """
+        expected_sizes = {}
+        for subdir, media in self.get_media_files():
+            size = solution_biblio.manifest.get(f"{subdir}/{os.path.basename(media)}")
+            if size is not None:
+                expected_sizes[media] = size
+        return expected_sizes
+
+    def verif_sol_install_listing(self, listing, upload_casque_path, expected_sizes=None):
+        """
+        Vérifie les fichiers de la solution à partir du listage du casque, sans aucun appel ADB.
+
+        L'état de chaque fichier (présent, manquant ou de taille différente) est conservé dans self.file_status.
+
+        Args:
+            listing (dict): Le listage des fichiers du casque, chemin -> (taille, date de modification).
+            upload_casque_path (str): Le chemin de base des fichiers sur l'appareil.
+            expected_sizes (dict, optional): La taille attendue de chaque média, si elle est connue.
+
+        Returns:
+            int: La taille totale des fichiers s'ils sont tous présents et de la bonne taille, sinon 0.
+        """
+        if expected_sizes is None:
+            expected_sizes = {}
+        self.file_status = {}
+        total_size = 0
+
+        for _, media in self.get_media_files():
+            entry = listing.get(upload_casque_path + media)
+            if entry is None:
+                self.file_status[media] = FICHIER_MANQUANT
+            elif media in expected_sizes and expected_sizes[media] != entry[0]:
+                self.file_status[media] = FICHIER_TAILLE_DIFFERENTE
+            else:
+                self.file_status[media] = FICHIER_PRESENT
+                total_size += entry[0]
+
+        if any(status != FICHIER_PRESENT for status in self.file_status.values()):
+            return 0
+        return total_size
@@ -0,0 +1,641 @@
+import os
+import queue
+import shlex
+import socket
+import stat
+import struct
+import threading
+import time
+
+from ppadb.protocol import Protocol
+from ppadb.sync import Sync
+
+import adbtools
+import manifest
+from config import Config
+
+class ByteProgress:
+    """
+    Compteur de progression en octets, partagé par plusieurs transferts simultanés.
+    """
+
+    def __init__(self, total, callback=None):
+        """
+        Initialise le compteur.
+
+        Args:
+            total (int): Le nombre total d'octets à transférer.
+            callback (callable, optional): Appelé avec (octets transférés, total) à chaque avancée.
+        """
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self.start_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, nbytes):
+        """
+        Ajoute des octets transférés et prévient le callback.
+
+        Args:
+            nbytes (int): Le nombre d'octets transférés depuis le dernier appel.
+        """
+        with self.lock:
+            self.done += nbytes
+            done = self.done
+        if self.callback:
+            self.callback(done, self.total)
+
+    def throughput(self):
+        """
+        Retourne le débit moyen depuis le début du transfert.
+
+        Returns:
+            float: Le débit en octets par seconde.
+        """
+        elapsed = time.monotonic() - self.start_time
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+
+class TransferEngine:
+    """
+    Moteur de transfert de fichiers entre le PC et un casque via le service sync d'ADB.
+
+    Jusqu'à `depth` fichiers sont transférés en même temps ; chaque worker garde sa propre
+    connexion sync ouverte pour enchaîner les fichiers, sans lancer de processus `adb push` ou `adb pull`.
+
+    Les gros fichiers (config.resumable_threshold) sont envoyés par morceaux dans une copie
+    temporaire du casque : chaque morceau est vérifié puis noté dans le journal, si bien qu'une
+    coupure ne fait perdre que le morceau en cours. L'empreinte md5 de la copie est contrôlée
+    avant de la renommer.
+    """
+
+    def __init__(self, device, depth=4, journal=None):
+        """
+        Initialise le moteur de transfert.
+
+        Args:
+            device (ppadb.device.Device): L'appareil cible.
+            depth (int): Le nombre maximal de transferts simultanés.
+            journal (TransferJournal, optional): Le journal des transferts reprenables ; sans journal,
+                les gros fichiers sont envoyés d'un seul bloc.
+        """
+        self.config = Config()
+        self.device = device
+        self.depth = max(1, depth)
+        self.journal = journal
+
+    def push_files(self, files, progress=None):
+        """
+        Transfère une liste de fichiers du PC vers le casque.
+
+        Args:
+            files (list): Liste de tuples (chemin local, chemin sur le casque).
+            progress (ByteProgress, optional): Le compteur de progression à alimenter.
+
+        Returns:
+            list: Liste de tuples (chemin local, exception) pour les fichiers dont le transfert a échoué.
+        """
+        def is_resumable(local_path, remote_path):
+            return self.journal is not None and os.path.getsize(local_path) >= self.config.resumable_threshold
+
+        def push(connection, local_path, remote_path):
+            if is_resumable(local_path, remote_path):
+                self._push_resumable(connection, local_path, remote_path, progress)
+            else:
+                self._push_file(connection, local_path, remote_path, progress)
+
+        # Les gros fichiers d'abord, pour que les petits remplissent les workers en fin de transfert
+        tasks = sorted(files, key=lambda f: os.path.getsize(f[0]), reverse=True)
+        return self._run_workers(tasks, push, is_resumable)
+
+    def pull_files(self, files, progress=None):
+        """
+        Transfère une liste de fichiers du casque vers le PC.
+
+        Chaque fichier reçoit la date de modification qu'il a sur le casque.
+
+        Args:
+            files (list): Liste de tuples (chemin sur le casque, chemin local, taille, date de modification).
+            progress (ByteProgress, optional): Le compteur de progression à alimenter.
+
+        Returns:
+            list: Liste de tuples (chemin sur le casque, exception) pour les fichiers dont le transfert a échoué.
+        """
+        def pull(connection, remote_path, local_path, mtime):
+            received = ByteProgress(0)
+            try:
+                with open(local_path, 'wb') as stream:
+                    self._recv_stream(connection, remote_path, stream, _Relay(received, progress))
+            except Exception:
+                # Les octets d'un fichier incomplet ne sont pas acquis
+                if progress is not None:
+                    progress.add(-received.done)
+                raise
+            os.utime(local_path, (mtime, mtime))
+
+        tasks = [(remote_path, local_path, mtime) for remote_path, local_path, _, mtime
+                 in sorted(files, key=lambda f: f[2], reverse=True)]
+        return self._run_workers(tasks, pull)
+
+    def read_file(self, remote_path, stream):
+        """
+        Reçoit un fichier du casque dans un flux en mémoire, octet pour octet (sans conversion du shell).
+
+        Args:
+            remote_path (str): Le chemin du fichier sur le casque.
+            stream: Le flux binaire où écrire (méthode write).
+
+        Raises:
+            RuntimeError: Si le casque refuse le transfert.
+        """
+        connection = self.device.sync()
+        try:
+            self._recv_stream(connection, remote_path, stream, None)
+        finally:
+            connection.close()
+
+    def relay_files(self, files, progress=None):
+        """
+        Reçoit des fichiers de ce casque et les envoie en même temps sur d'autres casques, sans passer par le disque du PC.
+
+        Chaque morceau reçu est déposé dans une file bornée (config.relay_buffer_chunks morceaux) par casque
+        cible, vidée par un envoi sync vers ce casque : la réception avance au rythme de la cible la plus
+        lente et la mémoire utilisée reste fixe. Une cible en échec, ou dont la file reste pleine plus de
+        config.relay_stall_timeout secondes, est abandonnée pour ce fichier sans interrompre les autres ;
+        chaque worker garde ses connexions sync vers les cibles d'un fichier à l'autre.
+
+        Chaque fichier est écrit sous un nom temporaire (`.relay`) puis renommé une fois l'envoi confirmé
+        par la cible : un relais interrompu ne laisse jamais un fichier tronqué à sa place définitive.
+
+        Args:
+            files (list): Liste de tuples (chemin sur les casques, taille, date de modification, casques cibles),
+                les casques cibles étant des ppadb.device.Device.
+            progress (ByteProgress, optional): Le compteur des octets reçus de ce casque.
+
+        Returns:
+            list: Liste de tuples (numéro de série de la cible, chemin sur les casques, exception) pour les
+                fichiers qui n'ont pas été transférés.
+        """
+        failures = []
+        failures_lock = threading.Lock()
+        local = threading.local()
+        opened = []
+        opened_lock = threading.Lock()
+
+        def target_connection(device):
+            connections = local.__dict__.setdefault("connections", {})
+            connection = connections.get(device.serial)
+            if connection is None:
+                connection = connections[device.serial] = device.sync()
+                with opened_lock:
+                    opened.append(connection)
+            return connection
+
+        def drop_connection(device):
+            connection = local.__dict__.get("connections", {}).pop(device.serial, None)
+            if connection is not None:
+                connection.close()
+
+        def relay(connection, remote_path, mtime, targets):
+            buffers, connections, broken = {}, {}, set()
+            for device in targets:
+                try:
+                    connections[device.serial] = target_connection(device)
+                    buffers[device.serial] = queue.Queue(maxsize=self.config.relay_buffer_chunks)
+                except Exception as e:
+                    drop_connection(device)
+                    with failures_lock:
+                        failures.append((device.serial, remote_path, e))
+
+            temp_path = shlex.quote(remote_path + ".relay")
+
+            def write(serial):
+                stream = _QueueStream(buffers[serial])
+                try:
+                    self._send_stream(connections[serial], remote_path + ".relay", stream, mtime, None)
+                    adbtools.run_shell(self.config.adb_exe_path, serial, f"mv -f {temp_path} {shlex.quote(remote_path)}")
+                except Exception as e:
+                    with failures_lock:
+                        if serial not in broken:
+                            failures.append((serial, remote_path, e))
+                    broken.add(serial)
+                    # Vide la file jusqu'au bout pour ne pas bloquer la réception
+                    stream.drain()
+                    try:
+                        adbtools.run_shell(self.config.adb_exe_path, serial, f"rm -f {temp_path}", check=False)
+                    except Exception:
+                        pass
+
+            def stall(serial):
+                # La cible n'avance plus : elle est abandonnée et sa connexion coupée pour libérer son envoi
+                with failures_lock:
+                    failures.append((serial, remote_path, TimeoutError(
+                        f"Casque cible bloqué depuis {self.config.relay_stall_timeout} secondes")))
+                    broken.add(serial)
+                try:
+                    connections[serial].socket.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+            writers = [threading.Thread(target=write, args=(serial,), daemon=True) for serial in buffers]
+            for thread in writers:
+                thread.start()
+
+            received = ByteProgress(0)
+            try:
+                self._recv_stream(connection, remote_path, _FanOut(buffers, self.config.relay_stall_timeout, stall),
+                                  _Relay(received, progress))
+            except Exception as e:
+                # La source est perdue : les envois en cours sont abandonnés
+                for buffer in buffers.values():
+                    buffer.put(_Abort(e))
+                if progress is not None:
+                    progress.add(-received.done)
+                raise
+            else:
+                for buffer in buffers.values():
+                    buffer.put(None)
+            finally:
+                for thread in writers:
+                    thread.join()
+                # Une connexion interrompue au milieu d'un envoi n'est plus utilisable
+                for device in targets:
+                    if device.serial in broken:
+                        drop_connection(device)
+
+        tasks = [(remote_path, mtime, targets) for remote_path, _, mtime, targets
+                 in sorted(files, key=lambda f: f[1], reverse=True) if targets]
+        for remote_path, error in self._run_workers(tasks, relay):
+            targets = next(task[2] for task in tasks if task[0] == remote_path)
+            for device in targets:
+                with failures_lock:
+                    if not any(serial == device.serial and path == remote_path for serial, path, _ in failures):
+                        failures.append((device.serial, remote_path, error))
+        with opened_lock:
+            for connection in opened:
+                connection.close()
+        return failures
+
+    def _run_workers(self, tasks, handler, can_retry=None):
+        """
+        Répartit des transferts entre au plus `depth` workers, chacun avec sa propre connexion sync.
+
+        Args:
+            tasks (list): Les transferts, des tuples dont le premier élément identifie le fichier.
+            handler (callable): Appelé avec (connexion, *transfert) pour réaliser un transfert.
+            can_retry (callable, optional): Appelé avec (*transfert) ; True si le transfert peut être repris
+                après une coupure (config.transfer_retries tentatives supplémentaires).
+
+        Returns:
+            list: Liste de tuples (premier élément du transfert, exception) pour les transferts en échec.
+        """
+        pending = queue.Queue()
+        for task in tasks:
+            pending.put(task)
+
+        failures = []
+        failures_lock = threading.Lock()
+
+        def worker():
+            connection = None
+            while True:
+                try:
+                    task = pending.get_nowait()
+                except queue.Empty:
+                    break
+                attempt = 0
+                while True:
+                    try:
+                        if connection is None:
+                            connection = self.device.sync()
+                        handler(connection, *task)
+                        break
+                    except Exception as e:
+                        # La connexion est dans un état inconnu après une erreur : on en ouvre une nouvelle
+                        if connection is not None:
+                            connection.close()
+                            connection = None
+                        attempt += 1
+                        if can_retry is None or not can_retry(*task) or attempt > self.config.transfer_retries:
+                            with failures_lock:
+                                failures.append((task[0], e))
+                            break
+                        print(f"{self.device.serial}: Transfert de {task[0]} interrompu, reprise ({attempt}/{self.config.transfer_retries}) : {e}")
+            if connection is not None:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.depth, len(tasks)))]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return failures
+
+    def _push_file(self, connection, local_path, remote_path, progress):
+        """
+        Transfère un fichier d'un seul bloc sur une connexion sync déjà ouverte.
+
+        Args:
+            connection (ppadb.connection.Connection): La connexion sync.
+            local_path (str): Le chemin du fichier sur le PC.
+            remote_path (str): Le chemin du fichier sur le casque.
+            progress (ByteProgress): Le compteur de progression à alimenter, ou None.
+        """
+        sent = ByteProgress(0)
+        try:
+            with open(local_path, 'rb') as stream:
+                self._send_stream(connection, remote_path, stream, int(os.path.getmtime(local_path)), _Relay(sent, progress))
+        except Exception:
+            # Les octets d'un fichier incomplet ne sont pas acquis
+            if progress is not None:
+                progress.add(-sent.done)
+            raise
+
+    def _push_resumable(self, connection, local_path, remote_path, progress):
+        """
+        Transfère un gros fichier par morceaux vérifiés, en reprenant à la dernière position notée dans le journal.
+
+        Chaque morceau est envoyé dans un fichier à part puis ajouté à la copie temporaire (`.part`)
+        du casque, dont la taille est contrôlée. Une fois la copie complète et son empreinte md5
+        identique à celle du fichier local, elle est renommée et reçoit la date du fichier local.
+
+        Args:
+            connection (ppadb.connection.Connection): La connexion sync.
+            local_path (str): Le chemin du fichier sur le PC.
+            remote_path (str): Le chemin du fichier sur le casque.
+            progress (ByteProgress): Le compteur de progression à alimenter, ou None.
+
+        Raises:
+            RuntimeError: Si un morceau ou l'empreinte finale ne correspond pas.
+        """
+        serial = self.device.serial
+        stat_result = os.stat(local_path)
+        size, mtime = stat_result.st_size, int(stat_result.st_mtime)
+        part_path = shlex.quote(remote_path + ".part")
+        chunk_path = shlex.quote(remote_path + ".part.chunk")
+
+        offset = self.journal.get_offset(serial, remote_path, size, mtime)
+        if offset:
+            remote_size = self._remote_size(remote_path + ".part")
+            if remote_size < offset:
+                offset = 0
+            elif remote_size > offset:
+                # Morceau ajouté mais pas encore noté dans le journal : on revient à la position vérifiée
+                self._shell(f"truncate -s {offset} {part_path}")
+        if offset == 0:
+            self._shell(f"rm -f {part_path} {chunk_path}")
+        else:
+            self._shell(f"rm -f {chunk_path}")
+            print(f"{serial}: Reprise de {local_path} à {offset / 1e6:.0f} Mo sur {size / 1e6:.0f} Mo.")
+
+        # Octets comptés par cette tentative, retirés de la progression si elle échoue :
+        # la tentative suivante recomptera la partie déjà vérifiée
+        counted = ByteProgress(size)
+        relay = _Relay(counted, progress)
+        relay.add(offset)
+        try:
+            with open(local_path, 'rb') as stream:
+                stream.seek(offset)
+                while offset < size:
+                    length = min(self.config.resumable_chunk_size, size - offset)
+                    self._send_stream(connection, remote_path + ".part.chunk", stream, mtime, relay, length)
+                    new_size = int(self._shell(f"cat {chunk_path} >> {part_path} && rm -f {chunk_path} && stat -c %s {part_path}").strip())
+                    if new_size != offset + length:
+                        raise RuntimeError(f"Taille de {remote_path}.part inattendue après ajout d'un morceau : {new_size} au lieu de {offset + length}")
+                    offset = new_size
+                    self.journal.set_offset(serial, remote_path, size, mtime, offset)
+
+            remote_digest = self._shell(f"md5sum {part_path}", timeout=600).split(" ", 1)[0].strip().lower()
+            if remote_digest != manifest.local_md5(local_path, size, mtime):
+                # Copie corrompue : on repartira du début
+                self.journal.remove(serial, remote_path)
+                self._shell(f"rm -f {part_path}")
+                raise RuntimeError(f"Empreinte md5 de {remote_path} différente du fichier local")
+        except Exception:
+            if progress is not None:
+                progress.add(-counted.done)
+            raise
+
+        quoted_remote = shlex.quote(remote_path)
+        self._shell(f"mv -f {part_path} {quoted_remote}")
+        # La date du fichier local sert à la comparaison des manifestes lors des synchronisations suivantes
+        self._shell(f"touch -m -d @{mtime} {quoted_remote}", check=False)
+        self.journal.remove(serial, remote_path)
+
+    def _remote_size(self, remote_path):
+        """
+        Retourne la taille d'un fichier sur le casque.
+
+        Args:
+            remote_path (str): Le chemin du fichier sur le casque.
+
+        Returns:
+            int: La taille en octets, -1 si le fichier n'existe pas.
+        """
+        output = self._shell(f"stat -c %s {shlex.quote(remote_path)} 2>/dev/null", check=False).strip()
+        return int(output) if output.isdigit() else -1
+
+    def _shell(self, command, check=True, timeout=60):
+        """
+        Exécute une commande shell sur le casque, dans sa session persistante.
+
+        Args:
+            command (str): La commande à exécuter.
+            check (bool): Lève une exception si la commande échoue.
+            timeout (float): Le délai maximal en secondes.
+
+        Returns:
+            str: La sortie de la commande.
+        """
+        return adbtools.run_shell(self.config.adb_exe_path, self.device.serial, command, check=check, timeout=timeout)
+
+    @staticmethod
+    def _send_stream(connection, remote_path, stream, mtime, progress, length=None):
+        """
+        Envoie le contenu d'un flux dans un fichier du casque, sur une connexion sync déjà ouverte.
+
+        Args:
+            connection (ppadb.connection.Connection): La connexion sync.
+            remote_path (str): Le chemin du fichier sur le casque.
+            stream: Le flux binaire à lire.
+            mtime (int): La date de modification à donner au fichier.
+            progress: Le compteur de progression à alimenter (méthode add), ou None.
+            length (int, optional): Le nombre d'octets à envoyer ; par défaut, jusqu'à la fin du flux.
+        """
+        _send_request(connection, Protocol.SEND, f"{remote_path},{Sync.DEFAULT_CHMOD | stat.S_IFREG}".encode('utf-8'))
+        remaining = length
+        while remaining is None or remaining > 0:
+            chunk = stream.read(Sync.DATA_MAX_LENGTH if remaining is None else min(Sync.DATA_MAX_LENGTH, remaining))
+            if not chunk:
+                break
+            _send_request(connection, Protocol.DATA, chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+            if progress is not None:
+                progress.add(len(chunk))
+        connection.socket.sendall(Protocol.DONE.encode() + struct.pack("<I", mtime))
+
+        # Le statut sync fait 8 octets (code + longueur du message) ; Sync.push n'en lit que 4,
+        # ce qui désynchronise une connexion réutilisée : on lit donc la réponse complète ici
+        status, message = _read_message(connection)
+        if status != Protocol.OKAY:
+            raise RuntimeError(f"Échec du transfert vers {remote_path} : {message.decode('utf-8', errors='replace') or status}")
+
+    @staticmethod
+    def _recv_stream(connection, remote_path, stream, progress):
+        """
+        Reçoit un fichier du casque dans un flux, sur une connexion sync déjà ouverte.
+
+        Args:
+            connection (ppadb.connection.Connection): La connexion sync.
+            remote_path (str): Le chemin du fichier sur le casque.
+            stream: Le flux binaire où écrire.
+            progress: Le compteur de progression à alimenter (méthode add), ou None.
+
+        Raises:
+            RuntimeError: Si le casque refuse le transfert.
+        """
+        _send_request(connection, Protocol.RECV, remote_path.encode('utf-8'))
+        while True:
+            status, data = _read_message(connection)
+            if status == Protocol.DATA:
+                stream.write(data)
+                if progress is not None:
+                    progress.add(len(data))
+            elif status == Protocol.DONE:
+                return
+            elif status == Protocol.FAIL:
+                raise RuntimeError(f"Échec du transfert depuis {remote_path} : {data.decode('utf-8', errors='replace')}")
+            else:
+                raise RuntimeError(f"Réponse sync inattendue pour {remote_path} : {status!r}")
+
+
+def _send_request(connection, command, payload):
+    """
+    Envoie une requête sync (commande, longueur, contenu) en entier.
+
+    Args:
+        connection (ppadb.connection.Connection): La connexion sync.
+        command (str): La commande sync sur quatre lettres.
+        payload (bytes): Le contenu de la requête.
+    """
+    connection.socket.sendall(command.encode() + struct.pack("<I", len(payload)) + payload)
+
+def _read_exact(connection, length):
+    """
+    Lit exactement `length` octets sur la connexion ; Connection.read peut en retourner moins.
+
+    Args:
+        connection (ppadb.connection.Connection): La connexion sync.
+        length (int): Le nombre d'octets à lire.
+
+    Returns:
+        bytes: Les octets lus.
+
+    Raises:
+        ConnectionError: Si la connexion est fermée avant la fin.
+    """
+    data = bytearray()
+    while len(data) < length:
+        chunk = connection.socket.recv(length - len(data))
+        if not chunk:
+            raise ConnectionError("Connexion sync fermée par le casque")
+        data += chunk
+    return bytes(data)
+
+def _read_message(connection):
+    """
+    Lit une réponse sync : un code sur quatre lettres suivi d'une longueur et, sauf pour DONE, du contenu.
+
+    Args:
+        connection (ppadb.connection.Connection): La connexion sync.
+
+    Returns:
+        tuple: (code, contenu en octets).
+    """
+    header = _read_exact(connection, 8)
+    status = header[:4].decode('utf-8', errors='replace')
+    length = struct.unpack("<I", header[4:])[0]
+    if status == Protocol.DONE:
+        # Pour DONE, le second champ est une date et non une longueur
+        return status, b""
+    return status, _read_exact(connection, length)
+
+
+class _Relay:
+    """
+    Transmet une avancée à deux compteurs : celui d'une tentative de transfert et celui du transfert complet.
+    """
+
+    def __init__(self, chunk_progress, progress):
+        self.chunk_progress = chunk_progress
+        self.progress = progress
+
+    def add(self, nbytes):
+        self.chunk_progress.add(nbytes)
+        if self.progress is not None:
+            self.progress.add(nbytes)
+
+
+class _Abort:
+    """
+    Marque l'abandon d'un transfert relayé dans une file, avec la cause de l'abandon.
+    """
+
+    def __init__(self, error):
+        self.error = error
+
+
+class _QueueStream:
+    """
+    Flux en lecture alimenté par une file de morceaux ; None marque la fin du fichier.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.pending = b""
+        self.finished = False
+
+    def read(self, size):
+        while not self.pending and not self.finished:
+            chunk = self.buffer.get()
+            if isinstance(chunk, _Abort):
+                self.finished = True
+                raise RuntimeError(f"Source du relais perdue : {chunk.error}")
+            if chunk is None:
+                self.finished = True
+            else:
+                self.pending = chunk
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def drain(self):
+        """
+        Consomme la file jusqu'à la fin du fichier ou son abandon.
+        """
+        while not self.finished:
+            chunk = self.buffer.get()
+            self.finished = chunk is None or isinstance(chunk, _Abort)
+
+
+class _FanOut:
+    """
+    Flux en écriture qui dépose chaque morceau dans plusieurs files bornées.
+
+    Une file qui reste pleine plus de `timeout` secondes n'est plus alimentée, et `on_stall` est appelé
+    avec sa clé.
+    """
+
+    def __init__(self, buffers, timeout, on_stall):
+        self.buffers = dict(buffers)
+        self.timeout = timeout
+        self.on_stall = on_stall
+
+    def write(self, data):
+        for key, buffer in list(self.buffers.items()):
+            try:
+                buffer.put(data, timeout=self.timeout)
+            except queue.Full:
+                del self.buffers[key]
+                self.on_stall(key)
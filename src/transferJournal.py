@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+
+class TransferJournal:
+    """
+    Journal local des transferts reprenables, conservé sur disque entre deux lancements.
+
+    Pour chaque fichier en cours d'envoi sur un casque, il retient le fichier local (taille et date)
+    et la position jusqu'à laquelle la copie temporaire du casque a été vérifiée. Le transfert reprend
+    à cette position au prochain envoi du même fichier vers le même casque, même après un redémarrage.
+    """
+
+    def __init__(self, path):
+        """
+        Initialise le journal et relit les entrées d'une session précédente.
+
+        Args:
+            path (str): Le chemin du fichier journal.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Journal des transferts illisible, il est ignoré : {e}")
+
+    @staticmethod
+    def key(serial, remote_path):
+        """
+        Construit la clé d'un transfert.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+            remote_path (str): Le chemin du fichier sur le casque.
+
+        Returns:
+            str: La clé du transfert dans le journal.
+        """
+        return f"{serial}|{remote_path}"
+
+    def get_offset(self, serial, remote_path, size, mtime):
+        """
+        Retourne la position vérifiée d'un transfert interrompu, si le fichier local n'a pas changé depuis.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+            remote_path (str): Le chemin du fichier sur le casque.
+            size (int): La taille actuelle du fichier local.
+            mtime (int): La date de modification actuelle du fichier local.
+
+        Returns:
+            int: Le nombre d'octets déjà vérifiés sur le casque, 0 s'il faut repartir du début.
+        """
+        with self.lock:
+            entry = self.entries.get(self.key(serial, remote_path))
+        if entry is None or entry.get("size") != size or entry.get("mtime") != mtime:
+            return 0
+        return entry.get("offset", 0)
+
+    def set_offset(self, serial, remote_path, size, mtime, offset):
+        """
+        Enregistre la position vérifiée d'un transfert.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+            remote_path (str): Le chemin du fichier sur le casque.
+            size (int): La taille du fichier local.
+            mtime (int): La date de modification du fichier local.
+            offset (int): Le nombre d'octets vérifiés sur le casque.
+        """
+        with self.lock:
+            self.entries[self.key(serial, remote_path)] = {"size": size, "mtime": mtime, "offset": offset}
+            self._save()
+
+    def remove(self, serial, remote_path):
+        """
+        Retire un transfert terminé du journal.
+
+        Args:
+            serial (str): Le numéro de série du casque.
+            remote_path (str): Le chemin du fichier sur le casque.
+        """
+        with self.lock:
+            if self.entries.pop(self.key(serial, remote_path), None) is not None:
+                self._save()
+
+    def _save(self):
+        """
+        Écrit le journal sur disque de façon atomique, le verrou étant tenu.
+        """
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Impossible d'enregistrer le journal des transferts : {e}")
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+def get_journal(path):
+    """
+    Retourne le journal des transferts enregistré à un chemin donné, en le chargeant si nécessaire.
+
+    Args:
+        path (str): Le chemin du fichier journal.
+
+    Returns:
+        TransferJournal: Le journal partagé par tous les casques.
+    """
+    with _journals_lock:
+        journal = _journals.get(path)
+        if journal is None:
+            journal = _journals[path] = TransferJournal(path)
+        return journal
@@ -1,6 +1,5 @@
 import subprocess
 import re
-import time
 import shutil
 from threading import Thread
 from tkinter import filedialog
@@ -27,69 +26,31 @@ class UI_Back:
 
     def installer_apks_et_solutions(self):
         """
-        Lance l'installation des APKs et des solutions sur chaque casque dans un thread séparé.
-        """
-        try:
-            for casque in self.casques.liste_casques:
-                Thread(target=self.installer_apks_et_solution, args=(casque,)).start()
-        except Exception as e:
-            self.app.handle_exception("Erreur lors de l'installation des APKs et des solutions", e)
+        Lance l'installation des APKs et des solutions sur chaque casque.
 
-    def installer_apks_et_solution(self, casque):
-        """
-        Installe l'APK et les solutions sur un casque spécifique, et lance le processus de vérification du fichier JSON.
-
-        Args:
-            casque: L'objet Casque sur lequel installer l'APK et les solutions.
+        Chaque casque suit les étapes d'un InstallJob sur l'exécuteur partagé des installations ; les
+        transferts passent par l'ordonnanceur des casques, qui limite leur nombre simultané. Un résumé
+        des durées de chaque étape est affiché une fois tous les casques terminés.
         """
         try:
-            # 1. Obtenir la version actuelle de l'APK installée
-            current_version = casque.version_apk
             selected_version = self.app.ui_front.selected_folder.get()  # Récupérer la version sélectionnée via le menu déroulant
-
-            # 2. Comparer la version actuelle avec la version sélectionnée
-            if current_version != selected_version:
-                print(f"{casque.name} {casque.numero}: Installation nécessaire {current_version} -> {selected_version}")
-                self.install_apk(casque)
-            else:
-                print(f"{casque.name} {casque.numero}: Aucune installation nécessaire. Version actuelle {current_version}")
-
-            # 3. Lancer la vérification du fichier JSON dans un thread séparé
-            thread = Thread(target=self.wait_for_json_and_push_solutions, args=(casque,))
-            thread.start()
-
+            futures = [self.casques.schedule_install_job(casque, selected_version) for casque in self.casques.liste_casques]
+            Thread(target=self.report_install_jobs, args=(futures,), daemon=True).start()
         except Exception as e:
             self.app.handle_exception("Erreur lors de l'installation des APKs et des solutions", e)
 
-    def wait_for_json_and_push_solutions(self, casque):
+    def report_install_jobs(self, futures):
         """
-        Attend que le fichier JSON soit disponible sur le casque et téléverse les solutions une fois le fichier trouvé.
+        Attend la fin des installations, signale les échecs et affiche le résumé des étapes.
 
         Args:
-            casque: L'objet Casque sur lequel attendre le fichier JSON et téléverser les solutions.
+            futures (list): Les Future des InstallJob.
         """
-        try:
-            # 3.1 Attendre que le fichier JSON soit disponible, avec un maximum de 3 essais
-            max_attempts = 3
-            attempt = 0
-            time.sleep(10)
-            while attempt < max_attempts:
-                time.sleep(15)  # Attendre 15 secondes avant de vérifier à nouveau
-                self.refresh_json(casque)  # Rafraîchir le JSON
-                if casque.JSON_path != 'Fichier JSON inexistant':
-                    break
-                attempt += 1
-
-            # Si après 3 tentatives le fichier JSON est toujours inexistant
-            if casque.JSON_path == 'Fichier JSON inexistant':
-                raise FileNotFoundError(f"{casque.name} {casque.numero}: Fichier JSON introuvable pour le casque {casque.numero} après {max_attempts} tentatives.")
-
-            # 4. Téléverser les solutions
-            self.push_solutions(casque)
-            print(f"Solutions téléversées sur le casque {casque.numero}.")
-
-        except Exception as e:
-            self.app.handle_exception("Erreur lors de l'attente du fichier JSON ou du téléversement des solutions", e)
+        jobs = [future.result() for future in futures]
+        for job in jobs:
+            if job.error is not None:
+                self.app.handle_exception(f"Erreur lors de l'installation du casque {job.casque.numero}", job.error)
+        self.casques.print_install_report(jobs)
 
     def open_solution_manager(self, casque):
         """
@@ -139,21 +100,40 @@ class UI_Back:
         """
         Suit l'état des casques connectés et met à jour la liste des casques dans l'interface utilisateur tant que l'événement stop_event n'est pas déclenché.
 
+        Les branchements, débranchements et changements d'autorisation sont reçus en continu
+        depuis le serveur ADB ; un rafraîchissement complet n'est fait que toutes les
+        config.refresh_interval secondes. La bibliothèque est mise à jour par sa propre surveillance.
+
         Args:
             stop_event: Un événement pour arrêter le suivi des appareils.
         """
+        events_thread = Thread(target=self.casques.track_devices, args=(stop_event, self.on_casques_changed), daemon=True)
+        events_thread.start()
+        biblio_thread = self.biblio.start_watcher(stop_event)
+
         while not stop_event.is_set():
             try:
                 self.casques.refresh_casques()
-                self.biblio.refresh_biblio()
-                if self.app.running:  # Vérifiez si l'application est toujours en cours d'exécution
-                    self.app.ui_front.afficher_casques()
-                time.sleep(2.5)
+                self.on_casques_changed()
             except Exception as e:
                 if self.app.running:
                     self.app.handle_exception("Erreur lors de l'actualisation des casques", e)
                 else:
                     break
+            stop_event.wait(self.config.refresh_interval)
+
+        events_thread.join()
+        biblio_thread.join()
+
+    def on_casques_changed(self):
+        """
+        Met à jour l'affichage des casques après une modification de la liste des casques.
+
+        Les instantanés sont construits dans le thread appelant ; le thread Tkinter se contente de les afficher.
+        """
+        if self.app.running:  # Vérifiez si l'application est toujours en cours d'exécution
+            vues = self.casques.get_vues()
+            self.app.ui_front.root.after(0, self.app.ui_front.afficher_casques, vues)
 
     def install_apk(self, casque):
         """
@@ -180,7 +160,7 @@ class UI_Back:
         Args:
             casque: L'objet Casque sur lequel démarrer l'APK.
         """
-        Thread(target=casque.open_apk()).start()
+        Thread(target=casque.open_apk).start()
 
     def close_apk(self, casque):
         """
@@ -189,25 +169,29 @@ class UI_Back:
         Args:
             casque: L'objet Casque sur lequel fermer l'APK.
         """
-        Thread(target=casque.close_apk()).start()
+        Thread(target=casque.close_apk).start()
 
     def push_solutions(self, casque):
         """
-        Téléverse les solutions sur un casque spécifique dans un thread séparé.
+        Place le téléversement des solutions d'un casque dans la file de l'ordonnanceur des transferts.
 
         Args:
             casque: L'objet Casque sur lequel téléverser les solutions.
         """
-        Thread(target=casque.push_solutions).start()
+        self.casques.schedule_push_solutions(casque)
+        # Les solutions absentes de la bibliothèque mais présentes sur un autre casque lui sont relayées
+        self.casques.schedule_relay_solutions(casque)
 
     def pull_solutions(self, casque):
         """
-        Récupère les solutions depuis un casque spécifique dans un thread séparé.
+        Récupère dans la bibliothèque les solutions d'un casque spécifique qui y manquent, en arrière-plan.
+
+        Une solution présente sur plusieurs casques est récupérée une seule fois, depuis tous ces casques à la fois.
 
         Args:
             casque: L'objet Casque depuis lequel récupérer les solutions.
         """
-        Thread(target=casque.pull_solutions).start()
+        self.casques.schedule_pull_solutions(casque)
 
     def refresh_json(self, casque):
         """
@@ -3,10 +3,13 @@ from tkinter import ttk
 from PIL import Image, ImageTk
 import os
 import sys
+import threading
+import time
 import http.client
 from config import Config
 from biblioManager import BiblioManager
 from casquesManager import CasquesManager
+from casqueRow import CasqueRow
 
 class UI_Front:
     def __init__(self, root, app):
@@ -23,6 +26,9 @@ class UI_Front:
         self.biblio = BiblioManager()
         self.progress_bars = {}
         self.widget_cache = {}
+        self.empty_label = None
+        self.gestion_photo = None
+        self.render_stats = {}
         self.config = Config()
 
     # ---------------------------------------------------------------------------
@@ -198,7 +204,8 @@ class UI_Front:
         solutions_list.pack(padx=10, pady=10, fill="both", expand=True)
 
         for solution in self.app.biblio_manager.liste_solutions:
-            solutions_list.insert(tk.END, f"{solution.nom} \n")
+            version = f" ({solution.version})" if solution.version else ""
+            solutions_list.insert(tk.END, f"{solution.nom}{version} \n")
 
         solutions_list.config(state=tk.DISABLED)
 
@@ -247,199 +254,199 @@ class UI_Front:
         selected_folder = self.selected_folder.get()
         self.app.casques.set_apk_folder(selected_folder)
 
-    def afficher_casques(self):
+    def afficher_casques(self, vues=None):
         """
         Affiche la liste des casques dans l'interface utilisateur.
+
+        Cette méthode s'exécute dans le thread Tkinter et n'affiche que des instantanés
+        (CasqueView) déjà construits : aucun appel ADB n'est fait pendant le rendu.
+        Seules les cellules dont la valeur a changé sont reconfigurées ; la durée du rendu
+        et le nombre de widgets modifiés sont conservés dans self.render_stats.
+
+        Args:
+            vues (list, optional): Les instantanés des casques, construits à partir des valeurs en cache par défaut.
         """
         try:
-            # Obtenez la liste des casques actuels
-            casques_list = self.app.casques.get_liste_casque()
+            start_time = time.perf_counter()
+            config_count = 0
 
-            # Supprimez les messages précédents s'il en existe
-            for widget in self.scrollable_frame.winfo_children():
-                if isinstance(widget, tk.Label) and "Veuillez brancher un ou plusieurs casques" in widget.cget("text"):
-                    widget.destroy()
+            # Obtenez la liste des casques actuels
+            if vues is None:
+                vues = self.app.casques.get_vues()
 
-            # Si aucun casque n'est connecté, affichez le message
-            if not casques_list:
+            # Afficher ou masquer le message si aucun casque n'est connecté
+            if not vues and self.empty_label is None:
                 message = "Veuillez brancher un ou plusieurs casques"
-                tk.Label(self.scrollable_frame, text=message, bg="white", fg="orange", font=("Helvetica", 14, "bold")).pack(pady=20)
+                self.empty_label = tk.Label(self.scrollable_frame, text=message, bg="white", fg="orange", font=("Helvetica", 14, "bold"))
+                self.empty_label.pack(pady=20)
+            elif vues and self.empty_label is not None:
+                self.empty_label.destroy()
+                self.empty_label = None
             
             casques_to_remove = set(self.widget_cache.keys())
 
-            for i, casque in enumerate(casques_list, 1):
-                if casque.numero not in self.widget_cache:
-                    self.widget_cache[casque.numero] = self.create_casque_row(i, casque)
+            for i, vue in enumerate(vues, 1):
+                if vue.numero not in self.widget_cache:
+                    self.widget_cache[vue.numero] = self.create_casque_row(i, vue)
                 else:
-                    self.update_casque_row(i, casque)
-                casques_to_remove.discard(casque.numero)
+                    config_count += self.update_casque_row(i, vue)
+                casques_to_remove.discard(vue.numero)
 
             # Supprimer les casques débranchés de l'affichage
             for casque_num in casques_to_remove:
-                self.widget_cache[casque_num].pack_forget()
+                self.widget_cache[casque_num].frame.destroy()
                 del self.widget_cache[casque_num]
+                self.progress_bars.pop(casque_num, None)
+
+            self.render_stats = {
+                "rows": len(vues),
+                "configs": config_count,
+                "duration_ms": (time.perf_counter() - start_time) * 1000,
+            }
 
         except Exception as e:
             self.app.handle_exception("Erreur lors de l'affichage des casques", e)
 
-    def create_casque_row(self, index, casque):
+    def casque_action(self, action, numero):
+        """
+        Exécute une action de l'interface arrière sur le casque correspondant à un numéro de série.
+
+        Args:
+            action (callable): La méthode de UI_Back à appeler avec le casque.
+            numero (str): Le numéro de série du casque.
+        """
+        casque = self.app.casques.get_casque(numero)
+        if casque is None:
+            self.log_debug(f"Le casque {numero} n'est plus branché.")
+            return
+        action(casque)
+
+    def create_casque_row(self, index, vue):
         """
         Crée une ligne dans la table pour afficher les informations d'un casque.
 
         Args:
             index (int): L'index du casque dans la liste.
-            casque: L'objet Casque contenant les informations à afficher.
+            vue (CasqueView): L'instantané contenant les informations à afficher.
 
         Returns:
-            item_frame: Le cadre contenant les widgets pour la ligne du casque.
+            CasqueRow: Le modèle de la ligne, avec les widgets de chaque cellule.
         """
         item_frame = tk.Frame(self.scrollable_frame, bg="white")
         item_frame.pack(fill="x")
-
-        battery_text = f"{casque.battery_level}%"
-        tk.Label(item_frame, text=battery_text, width=4, anchor="center", bg="white", font=("Helvetica", 10)).pack(side="left")
-
-        tk.Label(item_frame, text=casque.numero, width=20, anchor="center", bg="white", font=("Helvetica", 10)).pack(side="left")
-        tk.Label(item_frame, text=casque.name, width=7, anchor="center", bg="white", fg="blue", font=("Helvetica", 10)).pack(side="left")
-        tk.Label(item_frame, text=casque.modele, width=10, anchor="center", bg="white", font=("Helvetica", 10)).pack(side="left")
+        row = CasqueRow(item_frame)
+        back = self.app.ui_back
+        numero = vue.numero
+
+        row.add_cell("battery", tk.Label(item_frame, width=4, anchor="center", bg="white", font=("Helvetica", 10)))
+        row.cells["battery"].pack(side="left")
+        row.add_cell("numero", tk.Label(item_frame, width=20, anchor="center", bg="white", font=("Helvetica", 10)))
+        row.cells["numero"].pack(side="left")
+        row.add_cell("name", tk.Label(item_frame, width=7, anchor="center", bg="white", fg="blue", font=("Helvetica", 10)))
+        row.cells["name"].pack(side="left")
+        row.add_cell("modele", tk.Label(item_frame, width=10, anchor="center", bg="white", font=("Helvetica", 10)))
+        row.cells["modele"].pack(side="left")
 
         version_frame = tk.Frame(item_frame, bg="white")
         version_frame.pack(side="left", fill="x")
-        install_button = tk.Button(version_frame, text="install", width=4, fg="black", command=lambda c=casque: self.app.ui_back.install_apk(c), bg="white")
+        install_button = tk.Button(version_frame, text="install", width=4, fg="black", command=lambda: self.casque_action(back.install_apk, numero), bg="white")
         install_button.pack(side="left", padx=0)
-        uninstall_button = tk.Button(version_frame, text="✗", width=1, fg="red", command=lambda c=casque: self.app.ui_back.uninstall_apk(c), bg="white")
+        uninstall_button = tk.Button(version_frame, text="✗", width=1, fg="red", command=lambda: self.casque_action(back.uninstall_apk, numero), bg="white")
         uninstall_button.pack(side="left", padx=0)
 
-        # Vérifiez s'il y a une APK installée et définissez la couleur du texte
-        apk_text = casque.version_apk
-        apk_color = "orange" if apk_text == "X" else "black"
-        tk.Label(version_frame, text=apk_text, width=4, anchor="center", bg="white", fg=apk_color, font=("Helvetica", 10)).pack(side="left", padx=(5, 5))
+        row.add_cell("apk", tk.Label(version_frame, width=4, anchor="center", bg="white", font=("Helvetica", 10)))
+        row.cells["apk"].pack(side="left", padx=(5, 5))
 
-        open_button = tk.Button(version_frame, text="open", width=4, fg="black", command=lambda c=casque: self.app.ui_back.start_apk(c), bg="white")
+        open_button = tk.Button(version_frame, text="open", width=4, fg="black", command=lambda: self.casque_action(back.start_apk, numero), bg="white")
         open_button.pack(side="left", padx=0)
-        close_button = tk.Button(version_frame, text="✗", width=1, fg="red", command=lambda c=casque: self.app.ui_back.close_apk(c), bg="white")
+        close_button = tk.Button(version_frame, text="✗", width=1, fg="red", command=lambda: self.casque_action(back.close_apk, numero), bg="white")
         close_button.pack(side="left", padx=2)
 
-        # Vérifier l'état du Wi-Fi
-        is_connected, ssid = casque.is_wifi_connected()
-        wifi_status = f"{ssid}" if is_connected else "Please Connect Wifi"
-        wifi_color = "black" if is_connected else "orange"
-        tk.Label(item_frame, text=wifi_status, width=16, anchor="center", bg="white", fg=wifi_color, font=("Helvetica", 10)).pack(side="left")
-        
-        json_status = "✓" if casque.JSON_path != "Fichier JSON inexistant" else "X"
-        
-        # Définir la couleur de l'indicateur JSON en fonction de l'état de l'APK
-        json_color = "orange" if apk_color == "black" and json_status == "X" else "black"
+        row.add_cell("wifi", tk.Label(item_frame, width=16, anchor="center", bg="white", font=("Helvetica", 10)))
+        row.cells["wifi"].pack(side="left")
 
         json_frame = tk.Frame(item_frame, bg="white")
         json_frame.pack(side="left", fill="x")
-        tk.Label(json_frame, text=json_status, width=2, anchor="center", bg="white", fg=json_color, font=("Helvetica", 10)).pack(side="left")
-        refresh_button = tk.Button(json_frame, text="⟳", width=2, fg="blue", command=lambda c=casque: self.app.ui_back.refresh_json(c), bg="white")
+        row.add_cell("json", tk.Label(json_frame, width=2, anchor="center", bg="white", font=("Helvetica", 10)))
+        row.cells["json"].pack(side="left")
+        refresh_button = tk.Button(json_frame, text="⟳", width=2, fg="blue", command=lambda: self.casque_action(back.refresh_json, numero), bg="white")
         refresh_button.pack(side="left", padx=7)
 
-        tk.Label(item_frame, text=casque.code, width=4, anchor="center", bg="white", fg="blue", font=("Helvetica", 10)).pack(side="left")
-        tk.Label(item_frame, text=casque.getEntreprise(), width=25, anchor="center", bg="white", fg="blue", font=("Helvetica", 10)).pack(side="left")
+        row.add_cell("code", tk.Label(item_frame, width=4, anchor="center", bg="white", fg="blue", font=("Helvetica", 10)))
+        row.cells["code"].pack(side="left")
+        row.add_cell("entreprise", tk.Label(item_frame, width=25, anchor="center", bg="white", fg="blue", font=("Helvetica", 10)))
+        row.cells["entreprise"].pack(side="left")
 
-        solutions_casque_text = f"{len(casque.solutions_casque)} solution(s)"
-        tk.Label(item_frame, text=solutions_casque_text, width=9, anchor="w", bg="white", fg="blue", font=("Helvetica", 10)).pack(side="left", padx=(5, 0))
+        row.add_cell("solutions", tk.Label(item_frame, width=9, anchor="w", bg="white", fg="blue", font=("Helvetica", 10)))
+        row.cells["solutions"].pack(side="left", padx=(5, 0))
 
-        install_solutions_button = tk.Button(item_frame, text="--> Push", width=0, fg="black", command=lambda c=casque: self.app.ui_back.push_solutions(c), bg="white")
+        install_solutions_button = tk.Button(item_frame, text="--> Push", width=0, fg="black", command=lambda: self.casque_action(back.push_solutions, numero), bg="white")
         install_solutions_button.pack(side="left", padx=0)
 
-        solutions_install_text = f"{len(casque.getListSolInstall())} solution(s)"
-        tk.Label(item_frame, text=solutions_install_text, width=9, anchor="w", bg="white", fg="blue", font=("Helvetica", 10)).pack(side="left", padx=(5, 0))
+        row.add_cell("solutions_installees", tk.Label(item_frame, width=9, anchor="w", bg="white", fg="blue", font=("Helvetica", 10)))
+        row.cells["solutions_installees"].pack(side="left", padx=(5, 0))
         
-        pull_button = tk.Button(item_frame, text="Pull", width=3, fg="black", command=lambda c=casque: self.app.ui_back.pull_solutions(c), bg="white")
+        pull_button = tk.Button(item_frame, text="Pull", width=3, fg="black", command=lambda: self.casque_action(back.pull_solutions, numero), bg="white")
         pull_button.pack(side="left", padx=0)
 
-        gestion_image = Image.open(self.config.img_path_icon_setting)
-        gestion_image = gestion_image.resize((15, 15), Image.LANCZOS)
-        gestion_photo = ImageTk.PhotoImage(gestion_image)
-        gestion_button = tk.Button(item_frame, image=gestion_photo, width=20, height=20, command=lambda c=casque: self.app.ui_back.open_solution_manager(c), bg="white")
-        gestion_button.image = gestion_photo
+        gestion_button = tk.Button(item_frame, image=self.get_gestion_photo(), width=20, height=20, command=lambda: self.casque_action(back.open_solution_manager, numero), bg="white")
         gestion_button.pack(side="left", padx=5)
 
         # Ajouter la barre de progression
         progress_var = tk.DoubleVar()
         progress_bar = ttk.Progressbar(item_frame, orient="horizontal", length=82, mode="determinate", variable=progress_var)
         progress_bar.pack(side="left", padx=2)
-        self.progress_bars[casque.numero] = progress_var
-        self.progress_bars[casque.numero].set(casque.download_progress)
+        self.progress_bars[vue.numero] = progress_var
+        self.progress_bars[vue.numero].set(vue.download_progress)
 
         # Ajouter les informations supplémentaires
-        info_suppl = "PPV1 Installée" if casque.old_apk_installed else ""
-        tk.Label(item_frame, text=info_suppl, width=15, anchor="center", bg="white", font=("Helvetica", 10)).pack(side="left")
+        row.add_cell("info", tk.Label(item_frame, width=15, anchor="center", bg="white", font=("Helvetica", 10)))
+        row.cells["info"].pack(side="left")
 
-        return item_frame
+        row.render(vue)
+        return row
 
 
-    def update_casque_row(self, index, casque):
+    def update_casque_row(self, index, vue):
         """
-        Met à jour les informations pour un casque dans la table.
+        Met à jour les informations pour un casque dans la table, en ne reconfigurant que les cellules modifiées.
 
         Args:
             index (int): L'index du casque dans la liste.
-            casque: L'objet Casque contenant les informations mises à jour.
-        """
-        item_frame = self.widget_cache[casque.numero]
-        widgets = item_frame.winfo_children()
-
-        # Mettre à jour le numéro, le modèle, la version APK, le statut JSON, le nombre de solutions
-        battery_text = f"{casque.battery_level}%"
-        widgets[0].config(text=battery_text)
-
-        widgets[1].config(text=casque.numero)
-        widgets[2].config(text=casque.name)
-        widgets[3].config(text=casque.modele)
-
-        # Mettre à jour les enfants de version_frame
-        version_frame = widgets[4]
-        version_widgets = version_frame.winfo_children()
-
-        # Définir la couleur en fonction de la présence de l'APK
-        apk_text = casque.version_apk
-        apk_color = "orange" if casque.get_installed_apk_version() == "X" else "black"
-        version_widgets[2].config(text=apk_text, fg=apk_color)  # version_apk label
+            vue (CasqueView): L'instantané contenant les informations mises à jour.
 
-        # Mettre à jour le statut Wi-Fi
-        is_connected, ssid = casque.is_wifi_connected()
-        wifi_status = f"{ssid}" if is_connected else "Please connect to Wifi"
-        wifi_color = "black" if is_connected else "orange"
-        widgets[5].config(text=wifi_status, fg=wifi_color)  # Wi-Fi status
-
-        json_status = "✓" if casque.JSON_path != "Fichier JSON inexistant" else "X"
-
-        # Définir la couleur de l'indicateur JSON en fonction de l'état de l'APK
-        json_color = "orange" if apk_color == "black" and json_status == "X" else "black"
-
-        json_frame = widgets[6]
-        json_widgets = json_frame.winfo_children()
-        json_widgets[0].config(text=json_status, fg=json_color)  # JSON status
-
-        widgets[7].config(text=casque.code)  # code
-        widgets[8].config(text=casque.getEntreprise())  # entreprise
-
-        solutions_casque_text = f"{len(casque.solutions_casque)} solution(s)"
-        widgets[9].config(text=solutions_casque_text)  # solutions count
-
-        solutions_install_text = f"{len(casque.getListSolInstall())} solution(s)"
-        widgets[11].config(text=solutions_install_text)  # solutions install count
+        Returns:
+            int: Le nombre de widgets reconfigurés.
+        """
+        changed = self.widget_cache[vue.numero].render(vue)
 
         # Mettre à jour la barre de progression
-        self.progress_bars[casque.numero].set(casque.download_progress)
+        if self.progress_bars[vue.numero].get() != vue.download_progress:
+            self.progress_bars[vue.numero].set(vue.download_progress)
+            changed += 1
+        return changed
 
-        # Mettre à jour les informations supplémentaires
-        info_suppl = "App PPV1 Installée" if casque.old_apk_installed else ""
-        widgets[13].config(text=info_suppl)  # info supplémentaire
+    def get_gestion_photo(self):
+        """
+        Retourne l'icône du bouton de gestion des solutions, chargée une seule fois.
 
+        Returns:
+            ImageTk.PhotoImage: L'icône redimensionnée.
+        """
+        if self.gestion_photo is None:
+            gestion_image = Image.open(self.config.img_path_icon_setting)
+            gestion_image = gestion_image.resize((15, 15), Image.LANCZOS)
+            self.gestion_photo = ImageTk.PhotoImage(gestion_image)
+        return self.gestion_photo
 
     def update_progress_bars(self):
         """
         Met à jour périodiquement les barres de progression en fonction de l'attribut download_progress de chaque casque.
         """
         for casque in self.app.casques.get_liste_casque():
-            if casque.numero in self.progress_bars:
-                self.progress_bars[casque.numero].set(casque.download_progress)
+            progress_var = self.progress_bars.get(casque.numero)
+            if progress_var is not None and progress_var.get() != casque.download_progress:
+                progress_var.set(casque.download_progress)
         self.root.after(1000, self.update_progress_bars)  # Re-vérifier chaque seconde
 
     def create_progress_bar(self, item_frame):
@@ -497,12 +504,27 @@ class UI_Front:
     def update_connection_status(self):
         """
         Met à jour l'indicateur de statut de connexion.
+
+        La requête réseau est faite dans un thread séparé pour ne pas bloquer l'interface.
+        """
+        def check_and_display():
+            connected = self.check_connection()
+            if self.app.running:
+                self.root.after(0, self._display_connection_status, connected)
+
+        threading.Thread(target=check_and_display, daemon=True).start()
+        self.root.after(5000, self.update_connection_status)  # Vérifier à nouveau toutes les 5 secondes
+
+    def _display_connection_status(self, connected):
+        """
+        Affiche le statut de connexion à la plateforme Web.
+
+        Args:
+            connected (bool): True si la plateforme est joignable.
         """
-        connected = self.check_connection()
         status_text = "Succès connexion plateforme Web ●" if connected else "Echec connexion plateforme Web ●"
         color = "green" if connected else "red"
         self.connection_status_label.config(text=status_text, fg=color)
-        self.root.after(5000, self.update_connection_status)  # Vérifier à nouveau toutes les 5 secondes
 
     def check_connection(self):
         """
@@ -0,0 +1,149 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import casqueView
+from casque import Casque
+from casqueRow import CasqueRow
+from casquesManager import CasquesManager
+from ui_Front import UI_Front
+
+
+def make_casque(numero="1WMHH000000000"):
+    """
+    Construit un casque avec des valeurs en cache, sans passer par Config ni ADB.
+    """
+    casque = object.__new__(Casque)
+    casque.numero = numero
+    casque.name = "Quest 3 - 12"
+    casque.modele = "Quest 3"
+    casque.battery_level = 87
+    casque.version_apk = "2.4.1"
+    casque.wifi_connected = True
+    casque.wifi_ssid = "FIL"
+    casque.JSON_path = "/sdcard/Android/data/com.VRAI_Studio.Reverto/files/hardware.json"
+    casque.code = "ABCD"
+    casque.entreprise_association = "VRAI Studio"
+    casque.solutions_casque = [SimpleNamespace(sol_install_on_casque=True),
+                               SimpleNamespace(sol_install_on_casque=False)]
+    casque.download_progress = 42
+    casque.old_apk_installed = False
+    casque.refresh_lock = threading.Lock()
+    return casque
+
+
+def test_from_casque_reads_cached_values():
+    view = casqueView.from_casque(make_casque())
+
+    assert view.numero == "1WMHH000000000"
+    assert view.battery_level == 87
+    assert view.apk_installed
+    assert view.json_present
+    assert view.entreprise == "VRAI Studio"
+    assert (view.nb_solutions, view.nb_solutions_installees) == (2, 1)
+    assert view.download_progress == 42
+
+
+def test_from_casque_without_apk_nor_json():
+    casque = make_casque()
+    casque.version_apk = "X"
+    casque.JSON_path = "Fichier JSON inexistant"
+    casque.solutions_casque = []
+
+    view = casqueView.from_casque(casque)
+
+    assert not view.apk_installed
+    assert not view.json_present
+    assert view.nb_solutions == 0
+
+
+def test_get_vues_does_not_wait_for_a_refresh():
+    casques = [make_casque("A"), make_casque("B")]
+    manager = object.__new__(CasquesManager)
+    manager.liste_casques = casques
+    result = []
+
+    # Un rafraîchissement (lent) est en cours sur le premier casque
+    with casques[0].refresh_lock:
+        thread = threading.Thread(target=lambda: result.extend(manager.get_vues()), daemon=True)
+        thread.start()
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+
+    assert [view.numero for view in result] == ["A", "B"]
+
+
+class StubWidget:
+    """
+    Remplace un widget Tkinter : garde seulement le nombre de reconfigurations.
+    """
+
+    def __init__(self):
+        self.config_calls = 0
+
+    def config(self, **options):
+        self.config_calls += 1
+
+
+class StubVar:
+    """
+    Remplace une tk.DoubleVar.
+    """
+
+    def __init__(self, value=0):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+# Coût maximal de la mise à jour d'une ligne, en millisecondes
+ROW_UPDATE_BUDGET_MS = 2
+ROW_COUNT = 50
+
+
+def make_front(vues):
+    """
+    Construit l'interface avec une ligne de widgets factices par instantané, sans fenêtre Tkinter.
+    """
+    front = object.__new__(UI_Front)
+    front.widget_cache = {}
+    front.progress_bars = {}
+    for vue in vues:
+        row = CasqueRow(StubWidget())
+        for name in CasqueRow.cell_values(vue):
+            row.add_cell(name, StubWidget())
+        row.render(vue)
+        front.widget_cache[vue.numero] = row
+        front.progress_bars[vue.numero] = StubVar(vue.download_progress)
+    return front
+
+
+def time_per_row_ms(front, vues, passes=20):
+    start = time.perf_counter()
+    for _ in range(passes):
+        for index, vue in enumerate(vues):
+            front.update_casque_row(index, vue)
+    return (time.perf_counter() - start) * 1000 / (passes * len(vues))
+
+
+def test_update_casque_row_cost_per_row():
+    vues = [casqueView.from_casque(make_casque(f"SERIAL{i:03d}")) for i in range(ROW_COUNT)]
+    front = make_front(vues)
+
+    # Rien n'a changé : aucune reconfiguration
+    assert time_per_row_ms(front, vues) < ROW_UPDATE_BUDGET_MS
+    assert sum(front.update_casque_row(i, vue) for i, vue in enumerate(vues)) == 0
+
+    # La batterie et la progression changent sur chaque ligne à chaque passage
+    changing = [[vue._replace(battery_level=level, download_progress=level) for vue in vues] for level in range(20)]
+    start = time.perf_counter()
+    changed = sum(front.update_casque_row(i, vue) for batch in changing for i, vue in enumerate(batch))
+    per_row_ms = (time.perf_counter() - start) * 1000 / (len(changing) * ROW_COUNT)
+
+    assert per_row_ms < ROW_UPDATE_BUDGET_MS
+    # Seules la batterie et la barre de progression sont reconfigurées
+    assert changed == 2 * len(changing) * ROW_COUNT
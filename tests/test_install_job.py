@@ -0,0 +1,52 @@
+import subprocess
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import adbtools
+from casque import Casque
+from installJob import InstallJob
+from refreshScheduler import RefreshScheduler
+
+
+class InlineManager:
+    """
+    Gestionnaire minimal qui exécute l'installation de l'APK tout de suite, sans file de transferts.
+    """
+
+    def schedule_install_apk(self, casque, start_app=True, force=False):
+        future = Future()
+        future.set_result(casque.install_APK(start_app, force))
+        return future
+
+
+def make_casque_without_apk():
+    casque = object.__new__(Casque)
+    casque.numero = "1WMHH000000000"
+    casque.name = "Quest 3"
+    casque.version_apk = "X"
+    casque.streaming_install = False
+    casque.marque = SimpleNamespace(version_apk="2.4.1", APK_path="Reverto_2.4.1.apk")
+    casque.config = SimpleNamespace(adb_exe_path="adb", package_name="com.VRAI_Studio.Reverto",
+                                    json_file_path="/sdcard/hardware.json")
+    casque.scheduler = RefreshScheduler({"version_apk": None, "ppv1": None, "json": 30})
+    return casque
+
+
+def test_first_install_starts_the_app(monkeypatch):
+    started = []
+    # Constante propre à Windows, absente ailleurs
+    monkeypatch.setattr(subprocess, "CREATE_NO_WINDOW", 0, raising=False)
+    monkeypatch.setattr(subprocess, "run", lambda *args, **kwargs: None)
+    for name in ("grant_permissions", "wake_up_device", "stop_application"):
+        monkeypatch.setattr(adbtools, name, lambda *args: None)
+    monkeypatch.setattr(adbtools, "is_application_running", lambda *args: False)
+    monkeypatch.setattr(adbtools, "start_application", lambda *args: started.append(args[1]))
+    monkeypatch.setattr(adbtools, "run_shell", lambda *args, **kwargs: "")
+    casque = make_casque_without_apk()
+    job = InstallJob(casque, InlineManager(), "2.4.1")
+
+    assert job.stage_version() and job.needs_install
+    assert job.stage_install() is True
+    assert casque.version_apk == "2.4.1"
+    assert job.stage_start_app()
+    assert started == ["1WMHH000000000"]